@@ -16,7 +16,16 @@ from collections import defaultdict
 from itertools import repeat
 
 # modules
-from .grid import Grid
+from .adjacency import Adjacency
+from .render import blit_labels, write_png
+from .pair_index import PairIndex
+from .grid import Grid, GridPlane, WhitePairs
+from .validation import PairValidation, validate_pairs
+from .local_search import improve_pairs
+from .lower_bound import lower_bound, matching_duals, fit_matching_duals
+from .result_cache import ResultCache, default_cache_directory
+from .score_tracker import ScoreTracker
+from .tiled_grid import TiledGrid
 from .minimax_bot import Minimax_Bot
 from .mcts_bot import MCTS_Bot
 from .solver import Solver
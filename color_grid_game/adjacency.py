@@ -0,0 +1,204 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from color_grid_game import *
+
+class Adjacency:
+    """
+    Compressed sparse row (CSR) adjacency structure of the pairs allowed in a grid.
+
+    Cells are identified by their flat index i * m + j. Each allowed pair is an undirected
+    edge (u[k], v[k]) with u[k] < v[k], listed in the same order as in `Grid.all_pairs`.
+    The neighbors of a cell c are `indices[indptr[c]:indptr[c + 1]]`, in ascending order,
+    and `edge_ids` gives the edge of each of these entries.
+
+    Under the new rules the pairs involving a white cell are not stored in the CSR arrays:
+    they are left implicit in `white`, and consumers query them through its vectorized
+    per-value methods.
+
+    Attributes
+    ----------
+    n_cells : int
+        Number of cells of the grid.
+    m : int
+        Number of columns of the grid, used to convert flat indices back to (i, j).
+    u : np.ndarray
+        Flat index of the first cell of each edge.
+    v : np.ndarray
+        Flat index of the second cell of each edge.
+    cost : np.ndarray
+        Cost of each edge, i.e. the absolute difference between the values of its cells.
+    weight : np.ndarray
+        Score variation when the pair is selected: cost - value[u] - value[v].
+    indptr : np.ndarray
+        Offsets of the neighbor list of each cell in `indices`, of size n_cells + 1.
+    indices : np.ndarray
+        Concatenated neighbor lists.
+    edge_ids : np.ndarray
+        Edge index of each entry of `indices`.
+    white : WhitePairs or None
+        The implicit white pairs under the new rules, None under the original rules.
+    """
+
+    __slots__ = ("n_cells", "m", "u", "v", "cost", "weight", "indptr", "indices", "edge_ids", "white", "_components")
+
+    def __init__(self, n_cells: int, m: int, u: np.ndarray, v: np.ndarray, cost: np.ndarray, flat_value: np.ndarray,
+                 white: 'WhitePairs' = None):
+        """
+        Builds the CSR structure from the edge arrays of a grid.
+
+        Parameters
+        ----------
+        n_cells : int
+            Number of cells of the grid.
+        m : int
+            Number of columns of the grid.
+        u, v : np.ndarray
+            Flat indices of the cells of each edge, with u < v, sorted by (u, v).
+        cost : np.ndarray
+            Cost of each edge.
+        flat_value : np.ndarray
+            Values of the cells, indexed by flat index.
+        white : WhitePairs, optional
+            The implicit white pairs, kept out of the edge arrays. Default is None.
+
+        Time Complexity: O(E*log(E)) where E is the number of edges
+        """
+        self.n_cells = n_cells
+        self.m = m
+        self.white = white
+        self.u = u
+        self.v = v
+        self.cost = cost
+        flat_value = flat_value.astype(np.int64)
+        self.weight = cost - flat_value[u] - flat_value[v]
+
+        ends = np.concatenate((u, v))
+        others = np.concatenate((v, u))
+        edges = np.arange(u.size)
+        order = np.lexsort((others, ends))
+        self.indices = others[order]
+        self.edge_ids = np.concatenate((edges, edges))[order]
+        self.indptr = np.zeros(n_cells + 1, dtype=np.int64)
+        np.cumsum(np.bincount(ends, minlength=n_cells), out=self.indptr[1:])
+
+        for array in (self.u, self.v, self.cost, self.weight, self.indptr, self.indices, self.edge_ids):
+            array.flags.writeable = False
+        self._components = None
+
+    @classmethod
+    def from_grid(cls, grid: 'Grid', rules: str = "original rules") -> 'Adjacency':
+        """
+        Builds the adjacency structure of the pairs allowed in a grid.
+
+        Under the new rules only the pairs without a white cell are materialized; the white
+        pairs, O(W*N) of them for W white cells and N non-forbidden cells, stay implicit in
+        `white`.
+
+        Parameters
+        ----------
+        grid : Grid
+            The grid.
+        rules : str, optional
+            The rules to apply for determining allowed pairs. Default is "original rules".
+
+        Returns
+        -------
+        Adjacency
+            The adjacency structure.
+        """
+        u, v, cost = grid.edge_arrays(rules, implicit_white=True)
+        white = grid.white_pairs() if rules == "new rules" else None
+        return cls(grid.n * grid.m, grid.m, u, v, cost, grid.value.array.ravel(), white)
+
+    def __len__(self) -> int:
+        """
+        Returns the number of explicit edges, without the implicit white pairs.
+        """
+        return self.u.size
+
+    def degrees(self) -> np.ndarray:
+        """
+        Returns the number of explicit neighbors of each cell, indexed by flat index.
+        The implicit white pairs are counted by `white.degrees()`.
+        """
+        return np.diff(self.indptr)
+
+    def neighbors(self, cell: int) -> np.ndarray:
+        """
+        Returns the neighbors of a cell in ascending order.
+
+        Parameters
+        ----------
+        cell : int
+            Flat index of the cell.
+        """
+        return self.indices[self.indptr[cell]:self.indptr[cell + 1]]
+
+    def incident_edges(self, cell: int) -> np.ndarray:
+        """
+        Returns the edges containing a cell, in the order of its neighbors.
+
+        Parameters
+        ----------
+        cell : int
+            Flat index of the cell.
+        """
+        return self.edge_ids[self.indptr[cell]:self.indptr[cell + 1]]
+
+    def pairs(self) -> list[tuple[tuple[int, int], tuple[int, int]]]:
+        """
+        Returns the edges as a list of pairs of cells ((i1, j1), (i2, j2)).
+        """
+        i1, j1 = np.divmod(self.u, self.m)
+        i2, j2 = np.divmod(self.v, self.m)
+        return list(zip(zip(i1.tolist(), j1.tolist()), zip(i2.tolist(), j2.tolist())))
+
+    def components(self) -> tuple[int, np.ndarray]:
+        """
+        Labels the connected components of the pairing graph.
+
+        When there is at least one white pair, every non-forbidden cell can reach a white
+        cell, so all of them form a single component. Otherwise black cells and color
+        incompatibilities usually split the graph into many small independent components,
+        which can be solved separately. The labels are computed once with a vectorized
+        union-find: every edge hooks the larger of its two roots onto the smaller one, then
+        the labels are compressed by pointer jumping, until both ends of every edge share
+        the same root.
+
+        Returns
+        -------
+        n_components : int
+            Number of components with at least one edge.
+        labels : np.ndarray
+            Component of each cell, indexed by flat index, numbered from 0 in the order of
+            their smallest cell. Cells without any allowed pair are labelled -1.
+
+        Time Complexity: O(E*log(N)) where E is the number of edges and N the number of cells
+        """
+        if self._components is None and self.white is not None and len(self.white):
+            labels = np.full(self.n_cells, -1, dtype=np.int64)
+            labels[self.white.allowed] = 0
+            labels.flags.writeable = False
+            self._components = (1, labels)
+        if self._components is None:
+            roots = np.arange(self.n_cells)
+            while True:
+                root_u, root_v = roots[self.u], roots[self.v]
+                split = root_u != root_v
+                if not split.any():
+                    break
+                np.minimum.at(roots, np.maximum(root_u, root_v)[split], np.minimum(root_u, root_v)[split])
+                while True:
+                    jumped = roots[roots]
+                    if np.array_equal(jumped, roots):
+                        break
+                    roots = jumped
+
+            paired = self.degrees() > 0
+            labels = np.full(self.n_cells, -1, dtype=np.int64)
+            component_roots, labels[paired] = np.unique(roots[paired], return_inverse=True)
+            labels.flags.writeable = False
+            self._components = (component_roots.size, labels)
+        return self._components
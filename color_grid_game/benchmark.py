@@ -0,0 +1,59 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from color_grid_game import *
+
+def gradient_grid(n: int, m: int) -> Grid:
+    """
+    Builds a white grid whose values increase along the rows, from 1 to n*m.
+
+    The best pair of each cell is its successor, so the pairs of largest gain form a chain
+    across the whole grid, which exposes the scans whose cost is not linear in the edges.
+
+    Parameters
+    ----------
+    n : int
+        Number of rows.
+    m : int
+        Number of columns.
+
+    Returns
+    -------
+    Grid
+        The gradient grid.
+    """
+    return Grid(n, m, np.zeros((n, m), dtype=int), np.arange(1, n * m + 1).reshape(n, m))
+
+def time_solver(solver_class: type, grid: Grid, rules="original rules", repeat: int = 3) -> float:
+    """
+    Returns the best running time of a solver on a grid over several runs, in seconds,
+    without the result cache.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        solver = solver_class(grid, rules)
+        solver.result_cache = None
+        start = time.perf_counter()
+        solver.run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    # Set up argument parser
+    parser = argparse.ArgumentParser(description="Time the solvers on gradient grids.")
+    parser.add_argument('solvers', nargs='*', default=['Solver_Greedy_Sorted'], help='Names of the solvers to time')
+    parser.add_argument('--sizes', nargs='+', default=['1x20000', '150x150'], help='Sizes of the grids, as NxM')
+    parser.add_argument('--rules', nargs='+', default=['original rules', 'new rules'], help='Rules to time')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of runs, the best one being kept')
+    args = parser.parse_args()
+
+    solvers = {solver_class.__name__: solver_class for solver_class in solver_registry}
+    for size in args.sizes:
+        n, m = map(int, size.split('x'))
+        grid = gradient_grid(n, m)
+        for rules in args.rules:
+            for name in args.solvers:
+                print(f"{name} {size} {rules}: {time_solver(solvers[name], grid, rules, args.repeat):.3f} s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from color_grid_game import *
+
+def convert_grid_file(file_name: str, output_name: str = None) -> str:
+    """
+    Converts a text grid file (.in) to the binary grid format.
+
+    Parameters
+    ----------
+    file_name : str
+        Name of the text grid file, including its values.
+    output_name : str, optional
+        Name of the binary file to write. Default is `file_name` with a .bin extension.
+
+    Returns
+    -------
+    str
+        Name of the written binary file.
+    """
+    if output_name is None:
+        output_name = os.path.splitext(file_name)[0] + ".bin"
+    Grid.grid_from_file(file_name, read_values=True).to_binary(output_name)
+    return output_name
+
+def main():
+    # Set up argument parser
+    parser = argparse.ArgumentParser(description="Convert text grid files (.in) to the binary grid format (.bin).")
+    parser.add_argument('files', nargs='*', help='Grid files to convert. Default is every .in file of ./input/')
+    args = parser.parse_args()
+
+    files = args.files
+    if not files:
+        data_path: str = "./input/"
+        files = [os.path.join(data_path, f) for f in sorted(os.listdir(data_path)) if f.endswith(".in")]
+
+    for file_name in files:
+        output_name = convert_grid_file(file_name)
+        print(f"Converted {file_name} -> {output_name}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from color_grid_game import *
+
+def _box_blur(field: np.ndarray, radius: int, axis: int) -> np.ndarray:
+    """
+    Averages a field over windows of 2 * radius + 1 cells along one axis, with reflected borders.
+    """
+    pad = [(0, 0), (0, 0)]
+    pad[axis] = (radius + 1, radius)
+    sums = np.cumsum(np.pad(field, pad, mode="reflect"), axis=axis)
+    size = field.shape[axis]
+    upper = np.take(sums, np.arange(2 * radius + 1, 2 * radius + 1 + size), axis=axis)
+    lower = np.take(sums, np.arange(size), axis=axis)
+    return (upper - lower) / (2 * radius + 1)
+
+def _uniform_field(rng: np.random.Generator, n: int, m: int, correlation: int) -> np.ndarray:
+    """
+    Draws an (n, m) field of uniform values in [0, 1), spatially correlated over about `correlation` cells.
+
+    White noise is smoothed by two passes of a box blur along each axis, which approximates
+    a Gaussian filter, then turned back into uniform values through its ranks so that
+    thresholds on the field select exact proportions of cells.
+    """
+    field = rng.random((n, m))
+    if correlation <= 0:
+        return field
+    radius = max(1, correlation // 2)
+    for axis in (0, 1):
+        if field.shape[axis] > 2 * radius + 1:
+            field = _box_blur(_box_blur(field, radius, axis), radius, axis)
+    ranks = np.empty(n * m)
+    ranks[np.argsort(field, axis=None)] = np.arange(n * m)
+    return ((ranks + 0.5) / (n * m)).reshape(n, m)
+
+def generate_grid(n: int, m: int, seed: int = None, color_weights=(1, 1, 1, 1), black_density: float = 0.2,
+                  value_range: tuple[int, int] = (1, 10), correlation: int = 0) -> Grid:
+    """
+    Generates a random grid of any size without any Python loop over the cells.
+
+    The same parameters and seed always produce the same grid.
+
+    Parameters
+    ----------
+    n : int
+        Number of rows in the grid.
+    m : int
+        Number of columns in the grid.
+    seed : int, optional
+        Seed of the random generator. Default is a fresh, unpredictable seed.
+    color_weights : sequence of float, optional
+        Relative frequencies of the white, red, blue and green colors among the cells that
+        are not black. Default is (1, 1, 1, 1).
+    black_density : float, optional
+        Proportion of black cells, between 0 and 1. Default is 0.2.
+    value_range : tuple[int, int], optional
+        Smallest and largest cell values. Default is (1, 10).
+    correlation : int, optional
+        Typical size, in cells, of the patches of similar colors, black cells and values.
+        Default is 0, which draws every cell independently.
+
+    Returns
+    -------
+    Grid
+        The generated grid.
+
+    Raises
+    ------
+    ValueError
+        If a parameter is out of its range.
+
+    Time Complexity: O(n * m) for independent cells, O(n * m * log(n * m)) with correlation
+    """
+    if n <= 0 or m <= 0:
+        raise ValueError("Number of rows and columns must be positive integers.")
+    weights = np.asarray(color_weights, dtype=float)
+    if weights.shape != (4,) or (weights < 0).any() or weights.sum() <= 0:
+        raise ValueError("color_weights must be 4 non-negative weights with a positive sum.")
+    if not 0 <= black_density <= 1:
+        raise ValueError("black_density must be between 0 and 1.")
+    low, high = value_range
+    if low > high:
+        raise ValueError("value_range must be a (low, high) range with low <= high.")
+
+    rng = np.random.default_rng(seed)
+    thresholds = np.cumsum(weights[:-1]) / weights.sum()
+    color = np.searchsorted(thresholds, _uniform_field(rng, n, m, correlation), side="right")
+    color[_uniform_field(rng, n, m, correlation) < black_density] = 4
+    value = low + np.floor(_uniform_field(rng, n, m, correlation) * (high - low + 1)).astype(np.int64)
+    return Grid(n, m, color.astype(Grid.color_dtype), np.minimum(value, high))
+
+def write_grid(grid: Grid, base_name: str, formats=("in", "bin")) -> list[str]:
+    """
+    Writes a grid in several file formats.
+
+    Parameters
+    ----------
+    grid : Grid
+        The grid to write.
+    base_name : str
+        Name of the files to write, without extension.
+    formats : sequence of str, optional
+        The formats to write: "in" (text, `Grid.to_file`), "bin" (binary, `Grid.to_binary`)
+        and "tiles" (tiled, `TiledGrid.from_grid`). Default is ("in", "bin").
+
+    Returns
+    -------
+    list[str]
+        Names of the written files.
+
+    Raises
+    ------
+    ValueError
+        If a format is not recognized.
+    """
+    writers = {
+        "in": grid.to_file,
+        "bin": grid.to_binary,
+        "tiles": lambda file_name: TiledGrid.from_grid(grid, file_name),
+    }
+    for file_format in formats:
+        if file_format not in writers:
+            raise ValueError(f"Unrecognized format {file_format}.")
+
+    file_names = []
+    for file_format in formats:
+        file_name = f"{base_name}.{file_format}"
+        writers[file_format](file_name)
+        file_names.append(file_name)
+    return file_names
+
+def main():
+    # Set up argument parser
+    parser = argparse.ArgumentParser(description="Generate a random grid and write it to grid files.")
+    parser.add_argument('n', type=int, help='Number of rows')
+    parser.add_argument('m', type=int, help='Number of columns')
+    parser.add_argument('output', help='Name of the files to write, without extension')
+    parser.add_argument('--seed', type=int, default=None, help='Seed of the random generator')
+    parser.add_argument('--colors', type=float, nargs=4, default=[1, 1, 1, 1], metavar=('W', 'R', 'B', 'G'),
+                        help='Relative frequencies of the white, red, blue and green colors')
+    parser.add_argument('--black-density', type=float, default=0.2, help='Proportion of black cells')
+    parser.add_argument('--values', type=int, nargs=2, default=[1, 10], metavar=('LOW', 'HIGH'), help='Range of the cell values')
+    parser.add_argument('--correlation', type=int, default=0, help='Typical size of the patches of similar cells')
+    parser.add_argument('--formats', nargs='+', default=['in', 'bin'], choices=['in', 'bin', 'tiles'], help='File formats to write')
+    args = parser.parse_args()
+
+    grid = generate_grid(args.n, args.m, args.seed, args.colors, args.black_density, tuple(args.values), args.correlation)
+    for file_name in write_grid(grid, args.output, args.formats):
+        print(f"Wrote {file_name}")
+
+if __name__ == '__main__':
+    main()
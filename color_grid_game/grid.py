@@ -1,9 +1,674 @@
 import sys
 import os
+import hashlib
+import struct
+from bisect import bisect_left
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from color_grid_game import *
 
+def _equals(array: np.ndarray, other) -> bool:
+    """
+    Compares an array with another array-like as a whole, returning a single bool.
+    """
+    try:
+        other = np.asarray(other)
+    except (TypeError, ValueError):
+        return NotImplemented
+    return other.shape == array.shape and bool(np.array_equal(array, other))
+
+
+class GridPlane:
+    """
+    A 2D plane of cell attributes (colors or values) stored as a contiguous NumPy array.
+
+    The plane keeps the `plane[i][j]` access path of the historical list-of-lists
+    representation, and additionally supports NumPy style `plane[i, j]`, slice and
+    mask indexing. The underlying array is exposed as `plane.array` for vectorized code.
+
+    Every write made through the plane (`plane[i][j] = x`, `plane[i, j] = x`,
+    `plane[mask] = x`) increments `version`, which lets the owning grid invalidate the
+    structures it caches. Views returned by indexing are read-only. Code writing to
+    `array` directly must call `touch()` afterwards.
+
+    Attributes
+    ----------
+    array : np.ndarray
+        The (n, m) array holding the plane.
+    version : int
+        Number of modifications made to the plane.
+    """
+
+    __slots__ = ("array", "version", "_readonly")
+
+    def __init__(self, array: np.ndarray):
+        """
+        Wraps an existing two-dimensional array without copying it.
+
+        Parameters
+        ----------
+        array : np.ndarray
+            The (n, m) array to wrap.
+        """
+        self.array = array
+        self.version = 0
+        self._readonly = array.view()
+        self._readonly.flags.writeable = False
+
+    def __getstate__(self) -> tuple[np.ndarray, int]:
+        """
+        Returns the state pickled and deep-copied: the read-only view is not part of it,
+        since a copy of it would no longer share the memory of the copied array.
+        """
+        return self.array, self.version
+
+    def __setstate__(self, state: tuple[np.ndarray, int]) -> None:
+        """
+        Restores a plane from `__getstate__`, rebuilding the read-only view of its array.
+        """
+        array, version = state
+        self.__init__(array)
+        self.version = version
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """
+        Returns the shape (n, m) of the plane.
+        """
+        return self.array.shape
+
+    @property
+    def dtype(self) -> np.dtype:
+        """
+        Returns the dtype of the underlying array.
+        """
+        return self.array.dtype
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            return GridRow(self, key)
+        return self._readonly[key]
+
+    def __setitem__(self, key, item) -> None:
+        self.array[key] = item
+        self.version += 1
+
+    def touch(self) -> None:
+        """
+        Records a modification made directly to `array`.
+        """
+        self.version += 1
+
+    def __len__(self) -> int:
+        return self.array.shape[0]
+
+    def __iter__(self):
+        return (GridRow(self, i) for i in range(self.array.shape[0]))
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        if dtype is not None and dtype != self.array.dtype:
+            return self.array.astype(dtype)
+        return self.array.copy() if copy else self._readonly
+
+    def __eq__(self, other) -> bool:
+        """
+        Compares the plane with another plane or with a nested sequence.
+
+        Returns a single bool (not an element-wise mask) so that planes keep comparing
+        equal to the lists of lists they were built from.
+        """
+        return _equals(self.array, other)
+
+    def __ne__(self, other) -> bool:
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return repr(self.tolist())
+
+    def tolist(self) -> list[list[int]]:
+        """
+        Returns the plane as a list of lists of Python ints.
+        """
+        return self.array.tolist()
+
+    def copy(self) -> 'GridPlane':
+        """
+        Returns a deep copy of the plane.
+        """
+        return GridPlane(self.array.copy())
+
+
+class GridRow:
+    """
+    A row of a GridPlane, giving `plane[i][j]` read and write access.
+
+    Writes are forwarded to the plane so that they are tracked like `plane[i, j] = x`.
+    """
+
+    __slots__ = ("plane", "i")
+
+    def __init__(self, plane: GridPlane, i: int):
+        self.plane = plane
+        self.i = i
+
+    def __getitem__(self, j):
+        return self.plane._readonly[self.i, j]
+
+    def __setitem__(self, j, item) -> None:
+        self.plane[self.i, j] = item
+
+    def __len__(self) -> int:
+        return self.plane.array.shape[1]
+
+    def __iter__(self):
+        return iter(self.plane._readonly[self.i])
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        row = self.plane._readonly[self.i]
+        if dtype is not None and dtype != row.dtype:
+            return row.astype(dtype)
+        return row.copy() if copy else row
+
+    def __eq__(self, other) -> bool:
+        return _equals(self.plane.array[self.i], other)
+
+    def __ne__(self, other) -> bool:
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return repr(self.tolist())
+
+    def tolist(self) -> list[int]:
+        """
+        Returns the row as a list of Python ints.
+        """
+        return self.plane.array[self.i].tolist()
+
+    def copy(self) -> np.ndarray:
+        """
+        Returns a writable copy of the row, detached from the plane.
+        """
+        return self.plane.array[self.i].copy()
+
+
+class WhitePairs:
+    """
+    Implicit representation of the pairs involving a white cell under the new rules.
+
+    Under the new rules a white cell can be paired with any other non-forbidden cell,
+    which makes O(W*N) pairs for W white cells and N non-forbidden cells. Instead of
+    materializing them, this class only stores the W white and N non-forbidden flat cell
+    indices (i * m + j) and answers neighborhood and counting queries from them.
+    Each unordered pair is represented once.
+
+    The gain of a pair, the score decrease when it is selected, is twice the smaller value
+    of its cells. The partners of every cell are therefore ranked by value alone: the white
+    cells sorted by value serve the queries of the other cells, and the non-forbidden cells
+    sorted by value those of the white cells. `best_gains`, `min_costs`, `demands` and
+    `best_partners` answer them for every cell at once, and `partner_searches` finds the
+    best free partners while a pairing is built. The values are read when the set is built.
+
+    Attributes
+    ----------
+    grid : Grid
+        The grid the pairs belong to.
+    white : np.ndarray
+        Sorted flat indices of the white cells.
+    allowed : np.ndarray
+        Sorted flat indices of the non-forbidden cells.
+    """
+
+    __slots__ = ("grid", "white", "allowed", "_is_white", "_is_allowed", "_value", "_white_order", "_allowed_order")
+
+    def __init__(self, grid: 'Grid'):
+        """
+        Builds the implicit pair set of a grid.
+
+        Parameters
+        ----------
+        grid : Grid
+            The grid the pairs belong to.
+
+        Time Complexity: O(n*m)
+        """
+        flat_color = grid.color.array.ravel()
+        self.grid = grid
+        self._is_white = flat_color == 0
+        self._is_allowed = flat_color != 4
+        self.white = np.flatnonzero(self._is_white)
+        self.allowed = np.flatnonzero(self._is_allowed)
+        self.white.flags.writeable = False
+        self.allowed.flags.writeable = False
+        self._value = grid.value.array.ravel().astype(np.int64)
+        # White and non-forbidden cells sorted by value, ties by flat index
+        self._white_order = self.white[np.argsort(self._value[self.white], kind="stable")]
+        self._allowed_order = self.allowed[np.argsort(self._value[self.allowed], kind="stable")]
+
+    def __len__(self) -> int:
+        """
+        Returns the number of distinct unordered pairs involving a white cell.
+
+        Time Complexity: O(1)
+        """
+        w = self.white.size
+        return w * (self.allowed.size - 1) - w * (w - 1) // 2
+
+    def __contains__(self, pair: tuple[int, int]) -> bool:
+        """
+        Checks whether a pair of flat cell indices is a white pair.
+
+        Time Complexity: O(1)
+        """
+        u, v = pair
+        return (u != v and bool(self._is_allowed[u]) and bool(self._is_allowed[v])
+                and bool(self._is_white[u] or self._is_white[v]))
+
+    def __iter__(self):
+        """
+        Lazily yields every white pair once, as (u, v) flat indices with u < v.
+        """
+        for u_chunk, v_chunk, _ in self.iter_chunks():
+            yield from zip(u_chunk.tolist(), v_chunk.tolist())
+
+    def degree(self, cell: int) -> int:
+        """
+        Returns the number of white pairs containing a cell.
+
+        Parameters
+        ----------
+        cell : int
+            Flat index of the cell.
+
+        Returns
+        -------
+        int
+            N-1 for a white cell, W for another non-forbidden cell and 0 for a forbidden cell.
+
+        Time Complexity: O(1)
+        """
+        if self._is_white[cell]:
+            return self.allowed.size - 1
+        if self._is_allowed[cell]:
+            return self.white.size
+        return 0
+
+    def degrees(self) -> np.ndarray:
+        """
+        Returns the number of white pairs containing each cell, indexed by flat cell index.
+
+        Time Complexity: O(n*m)
+        """
+        degrees = np.where(self._is_allowed, self.white.size, 0)
+        degrees[self._is_white] = self.allowed.size - 1
+        return degrees
+
+    def neighbors(self, cell: int) -> np.ndarray:
+        """
+        Returns the cells that can be paired with a cell through a white pair.
+
+        Parameters
+        ----------
+        cell : int
+            Flat index of the cell.
+
+        Returns
+        -------
+        np.ndarray
+            Sorted flat indices of the partner cells. For a non-white cell this is a read-only
+            view of `white`, no copy is made.
+
+        Time Complexity: O(1) for a non-white cell, O(N) for a white cell
+        """
+        if self._is_white[cell]:
+            return self.allowed[self.allowed != cell]
+        if self._is_allowed[cell]:
+            return self.white
+        return self.white[:0]
+
+    def best_gains(self) -> np.ndarray:
+        """
+        Returns the largest gain of the white pairs of each cell, indexed by flat cell index.
+
+        The gain of a pair is -weight = 2 * min(value[u], value[v]). Cells without any
+        white pair get 0.
+
+        Time Complexity: O(n*m)
+        """
+        return np.maximum(self.demands(np.zeros(self._value.size)), 0).astype(np.int64)
+
+    def min_costs(self) -> np.ndarray:
+        """
+        Returns the smallest cost of the white pairs of each cell, indexed by flat cell index.
+
+        The partner of smallest cost has the closest value, so it is a neighbor of the cell
+        in the order of the values. Cells without any white pair get 0.
+
+        Time Complexity: O(n*m*log(n*m))
+        """
+        costs = np.zeros(self._value.size, dtype=np.int64)
+        others = self.allowed[~self._is_white[self.allowed]]
+        if self.white.size:
+            values = self._value[self._white_order]
+            a = self._value[others]
+            position = np.searchsorted(values, a)
+            above = values[np.minimum(position, values.size - 1)] - a
+            below = a - values[np.maximum(position - 1, 0)]
+            costs[others] = np.where(position == values.size, below,
+                                     np.where(position == 0, above, np.minimum(above, below)))
+        if self.allowed.size > 1:
+            # A white cell compares with its neighbors in the order of the non-forbidden cells
+            values = self._value[self._allowed_order]
+            gaps = np.diff(values)
+            white = self._is_white[self._allowed_order]
+            previous = np.concatenate(([np.iinfo(np.int64).max], gaps))
+            following = np.concatenate((gaps, [np.iinfo(np.int64).max]))
+            costs[self._allowed_order[white]] = np.minimum(previous, following)[white]
+        return costs
+
+    def demands(self, duals: np.ndarray) -> np.ndarray:
+        """
+        Returns, for each cell, the largest gain of its white pairs net of the dual value of
+        the partner: max over the white partners p of c of 2 * min(value[c], value[p]) - duals[p].
+
+        Splitting the partners at the value of the cell, those with a smaller value give
+        2 * value[p] - duals[p], a prefix maximum in the order of the values, and the others
+        2 * value[c] - duals[p], a suffix minimum of the duals. A white cell is not its own
+        partner: among the partners of its value, the smallest dual of the others is used.
+
+        Parameters
+        ----------
+        duals : np.ndarray
+            A value for each cell, indexed by flat cell index.
+
+        Returns
+        -------
+        np.ndarray
+            The demand of each cell, -inf for the cells without any white pair.
+
+        Time Complexity: O(n*m*log(n*m))
+        """
+        duals = np.asarray(duals, dtype=float)
+        demands = np.full(self._value.size, -np.inf)
+        others = self.allowed[~self._is_white[self.allowed]]
+        demands[others] = self._demands(self._value[others], self._white_order, duals)
+        demands[self.white] = self._demands(self._value[self.white], self._allowed_order, duals, self.white)
+        return demands
+
+    def _demands(self, a: np.ndarray, order: np.ndarray, duals: np.ndarray, exclude: np.ndarray = None) -> np.ndarray:
+        """
+        Returns max over the cells p of `order`, other than the excluded cell of each query,
+        of 2 * min(a, value[p]) - duals[p], for each query value a.
+        """
+        if order.size == 0:
+            return np.full(a.size, -np.inf)
+        values = self._value[order]
+        y = duals[order]
+        start = np.searchsorted(values, a, side="left")
+        end = np.searchsorted(values, a, side="right")
+        below = np.concatenate(([-np.inf], np.maximum.accumulate(2 * values - y)))[start]
+        suffix = np.concatenate((np.minimum.accumulate(y[::-1])[::-1], [np.inf]))
+        if exclude is None:
+            above = suffix[start]
+        else:
+            # Smallest and second smallest dual of each value, the query cell having the query value
+            group = np.searchsorted(values, values, side="left")
+            by_dual = np.lexsort((y, group))
+            first = np.full(values.size, -1)
+            second = np.full(values.size, -1)
+            leader = np.r_[True, group[by_dual][1:] != group[by_dual][:-1]]
+            first[group[by_dual][leader]] = by_dual[leader]
+            runner = np.r_[False, leader[:-1]] & ~leader
+            second[group[by_dual][runner]] = by_dual[runner]
+            rank = np.empty(self._value.size, dtype=np.int64)
+            rank[order] = np.arange(order.size)
+            own = rank[exclude]
+            other = np.where(first[start] == own, second[start], first[start])
+            same = np.where(other >= 0, y[np.maximum(other, 0)], np.inf)
+            above = np.minimum(same, suffix[end])
+        return np.maximum(below, 2 * a - above)
+
+    def best_partners(self, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the `k` white partners of each cell with the largest gains.
+
+        Ties are broken by the lowest cost: the partners with a value at least that of the
+        cell come first, from the closest value, then the others from the largest value.
+
+        Parameters
+        ----------
+        k : int
+            Maximum number of partners of each cell.
+
+        Returns
+        -------
+        indptr : np.ndarray
+            Offsets of the partners of each cell in `partners`, of size n*m + 1.
+        partners : np.ndarray
+            The flat indices of the partners, best first.
+
+        Time Complexity: O(n*m*k)
+        """
+        n_cells = self._value.size
+        counts = np.zeros(n_cells, dtype=np.int64)
+        rows, columns = [], []
+        others = self.allowed[~self._is_white[self.allowed]]
+        for cells, order, exclude in ((others, self._white_order, False), (self.white, self._allowed_order, True)):
+            if cells.size == 0 or order.size == 0:
+                continue
+            values = self._value[order]
+            width = k + exclude
+            steps = np.concatenate((np.arange(width), -1 - np.arange(width)))
+            # Blocks of cells bound the memory of the candidate matrices
+            for block in np.array_split(cells, max(1, cells.size * width >> 20)):
+                start = np.searchsorted(values, self._value[block], side="left")
+                position = start[:, None] + steps[None, :]
+                valid = (position >= 0) & (position < order.size)
+                candidates = order[np.clip(position, 0, order.size - 1)]
+                if exclude:
+                    valid &= candidates != block[:, None]
+                valid &= np.cumsum(valid, axis=1) <= k
+                row, column = np.nonzero(valid)
+                rows.append(block[row])
+                columns.append(candidates[row, column])
+                counts[block] = valid.sum(axis=1)
+        indptr = np.zeros(n_cells + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        if not rows:
+            return indptr, np.zeros(0, dtype=np.int64)
+        rows, columns = np.concatenate(rows), np.concatenate(columns)
+        # np.nonzero lists each row in order: a stable sort by cell keeps the ranking
+        return indptr, columns[np.argsort(rows, kind="stable")]
+
+    def partner_searches(self, used) -> tuple['PartnerSearch', 'PartnerSearch']:
+        """
+        Returns the searches of the free partners of the cells while a pairing is built.
+
+        Parameters
+        ----------
+        used : indexable of bool
+            Whether each cell is used, indexed by flat cell index, updated by the caller.
+
+        Returns
+        -------
+        tuple[PartnerSearch, PartnerSearch]
+            The search among the white cells, which serves the non-white cells, and the search
+            among the non-forbidden cells, which serves the white cells.
+        """
+        return PartnerSearch(self._white_order, self._value, used), PartnerSearch(self._allowed_order, self._value, used)
+
+    def iter_chunks(self, max_pairs: int = 1 << 20):
+        """
+        Lazily yields the white pairs in blocks of parallel arrays, each pair once with u < v.
+
+        Parameters
+        ----------
+        max_pairs : int, optional
+            Approximate maximum number of pairs per block, bounding the memory used at once.
+
+        Yields
+        ------
+        tuple[np.ndarray, np.ndarray, np.ndarray]
+            Flat indices u and v of the pairs of the block and their costs.
+        """
+        flat_value = self.grid.value.array.ravel().astype(np.int64)
+        allowed = self.allowed
+        non_white = allowed[~self._is_white[allowed]]
+        step = max(1, max_pairs // max(1, allowed.size))
+        for start in range(0, self.white.size, step):
+            whites = self.white[start:start + step]
+            # Pairs (w, x) with x > w for x non-forbidden, plus (x, w) with x < w for x non-white
+            u_parts, v_parts = [], []
+            for w in whites.tolist():
+                above = allowed[np.searchsorted(allowed, w, side="right"):]
+                below = non_white[:np.searchsorted(non_white, w)]
+                u_parts.append(np.full(above.size, w))
+                v_parts.append(above)
+                u_parts.append(below)
+                v_parts.append(np.full(below.size, w))
+            u = np.concatenate(u_parts)
+            v = np.concatenate(v_parts)
+            yield u, v, np.abs(flat_value[u] - flat_value[v])
+
+
+class PartnerSearch:
+    """
+    Finds free cells by value among a fixed set of cells, while a pairing is built.
+
+    The cells are grouped into levels of equal value, in ascending order. Each level keeps
+    the position of its first cell that may be free, in ascending flat index, and the
+    levels without any free cell left are skipped through path-compressed links to the
+    next level above and below. Cells are never freed again, so a pass of q queries over
+    N cells costs O((q + N) * log(N)).
+
+    Attributes
+    ----------
+    levels : list of int
+        The distinct values of the cells, in ascending order.
+    bounds : list of int
+        Offsets of the cells of each level in `cells`, of size len(levels) + 1.
+    cells : list of int
+        The flat indices of the cells, by level then ascending index.
+    used : indexable of bool
+        Whether each cell is used, indexed by flat cell index, updated by the caller.
+    """
+
+    __slots__ = ("levels", "bounds", "cells", "used", "_head", "_up", "_down")
+
+    def __init__(self, cells: np.ndarray, value: np.ndarray, used):
+        """
+        Builds the search over a set of cells, none of them being used yet in `used`.
+
+        Parameters
+        ----------
+        cells : np.ndarray
+            The flat indices of the cells, sorted by value then index.
+        value : np.ndarray
+            The value of each cell, indexed by flat cell index.
+        used : indexable of bool
+            Whether each cell is used, indexed by flat cell index.
+        """
+        levels, starts = np.unique(value[cells], return_index=True)
+        self.levels = levels.tolist()
+        self.bounds = starts.tolist() + [int(cells.size)]
+        self.cells = cells.tolist()
+        self.reset(used)
+
+    def reset(self, used) -> None:
+        """
+        Restarts the search with new usage flags, for another pass.
+
+        Time Complexity: O(N) for N cells
+        """
+        self.used = used
+        self._head = self.bounds[:-1]
+        self._up = list(range(len(self.levels) + 1))
+        # Shifted by one so that -1 stands for no level below
+        self._down = list(range(-1, len(self.levels)))
+
+    def _free(self, level: int) -> bool:
+        """
+        Moves the position of a level to its first free cell, and tells whether there is one.
+        """
+        head, end = self._head[level], self.bounds[level + 1]
+        cells, used = self.cells, self.used
+        while head < end and used[cells[head]]:
+            head += 1
+        self._head[level] = head
+        return head < end
+
+    def _above(self, level: int) -> int:
+        """
+        Returns the first level from `level` upwards with a free cell, or len(levels).
+        """
+        up, top = self._up, len(self.levels)
+        root = level
+        while root < top:
+            if up[root] != root:
+                root = up[root]
+            elif not self._free(root):
+                up[root] = root + 1
+            else:
+                break
+        while level != root:
+            up[level], level = root, up[level]
+        return root
+
+    def _below(self, level: int) -> int:
+        """
+        Returns the first level from `level` downwards with a free cell, or -1.
+        """
+        down = self._down
+        root = level
+        while root >= 0:
+            if down[root + 1] != root:
+                root = down[root + 1]
+            elif not self._free(root):
+                down[root + 1] = root - 1
+            else:
+                break
+        while level != root:
+            down[level + 1], level = root, down[level + 1]
+        return root
+
+    def closest(self, value: int) -> int:
+        """
+        Returns the free cell whose value is the closest to `value`, ties being broken by the
+        smallest flat index, or -1 if every cell is used.
+        """
+        split = bisect_left(self.levels, value)
+        above, below = self._above(split), self._below(split - 1)
+        best = -1
+        if above < len(self.levels):
+            best, cost = self.cells[self._head[above]], self.levels[above] - value
+        if below >= 0:
+            cell = self.cells[self._head[below]]
+            if best < 0 or value - self.levels[below] < cost or (value - self.levels[below] == cost and cell < best):
+                best = cell
+        return best
+
+    def ceiling(self, value: int) -> int:
+        """
+        Returns a free cell of the smallest value at least `value`, of smallest flat index
+        among them, or -1 if there is none.
+        """
+        level = self._above(bisect_left(self.levels, value))
+        return self.cells[self._head[level]] if level < len(self.levels) else -1
+
+    def highest(self) -> int:
+        """
+        Returns a free cell of the largest value, of smallest flat index among them, or -1
+        if every cell is used.
+        """
+        level = self._below(len(self.levels) - 1)
+        return self.cells[self._head[level]] if level >= 0 else -1
+
+
 class Grid:
     """
     A class representing a grid with cells that have colors and values.
@@ -14,16 +679,38 @@ class Grid:
         Number of rows in the grid.
     m : int
         Number of columns in the grid.
-    color : list[list[int]]
+    color : GridPlane
         The color of each grid cell. `color[i][j]` is the color value in the cell (i, j).
         Lines are numbered from 0 to n-1, and columns from 0 to m-1.
-    value : list[list[int]]
+        Stored as a contiguous int8 array, available as `color.array`.
+    value : GridPlane
         The value of each grid cell. `value[i][j]` is the value in the cell (i, j).
         Lines are numbered from 0 to n-1, and columns from 0 to m-1.
+        Stored as a contiguous int32 array, available as `value.array`.
     colors_list : list[str]
         The mapping between the value of `color[i][j]` and the corresponding color.
     """
 
+    __slots__ = ("n", "m", "_color", "_value", "colors_list", "_cache", "_cache_state")
+
+    color_dtype = np.int8
+    value_dtype = np.int32
+
+    # Binary file layout: magic, format version, n, m, color dtype, value dtype, then the
+    # raw color plane and the raw value plane, each starting on an 8-byte boundary.
+    binary_magic = b"CGRD"
+    binary_version = 1
+    binary_header = struct.Struct("<4sHxxQQ4s4s")
+
+    # color_compatibility[c1, c2] is True when a cell of color c1 can be paired with a cell of color c2
+    color_compatibility = np.array([
+        [True,  True,  True,  True,  False],  # white can pair with all except black
+        [True,  True,  True,  False, False],  # red can pair with white, blue, red
+        [True,  True,  True,  False, False],  # blue can pair with white, blue, red
+        [True,  False, False, True,  False],  # green can pair with white, green
+        [False, False, False, False, False],  # black cannot be paired
+    ], dtype=bool)
+
     def __init__(self, n: int, m: int, color: list[list[int]] = None, value: list[list[int]] = None):
         """
         Initializes the grid.
@@ -34,29 +721,127 @@ class Grid:
             Number of rows in the grid.
         m : int
             Number of columns in the grid.
-        color : list[list[int]], optional
+        color : list[list[int]] or array_like, optional
             The grid cells colors. Default is empty, which initializes each cell with color 0 (white).
-        value : list[list[int]], optional
+        value : list[list[int]] or array_like, optional
             The grid cells values. Default is empty, which initializes each cell with value 1.
 
         Raises
         ------
         ValueError
-            If `n` or `m` is not a positive integer.
+            If `n` or `m` is not a positive integer, or if `color` or `value` is not of shape (n, m).
         """
         if n <= 0 or m <= 0:
             raise ValueError("Number of rows and columns must be positive integers.")
 
         self.n = n
         self.m = m
+        self._cache = {}
+        self._cache_state = None
         if color is None or len(color) == 0:
-            color = [[0 for _ in range(m)] for _ in range(n)]
+            color = np.zeros((n, m), dtype=self.color_dtype)
         self.color = color
         if value is None or len(value) == 0:
-            value = [[1 for _ in range(m)] for _ in range(n)]
+            value = np.ones((n, m), dtype=self.value_dtype)
         self.value = value
         self.colors_list = ['w', 'r', 'b', 'g', 'k']
 
+    @property
+    def color(self) -> GridPlane:
+        """
+        The color plane of the grid.
+        """
+        return self._color
+
+    @color.setter
+    def color(self, color) -> None:
+        self._color = self._as_plane(color, self.color_dtype)
+        self._cache.clear()
+
+    @property
+    def value(self) -> GridPlane:
+        """
+        The value plane of the grid.
+        """
+        return self._value
+
+    @value.setter
+    def value(self, value) -> None:
+        self._value = self._as_plane(value, self.value_dtype)
+        self._cache.clear()
+
+    def _as_plane(self, data, dtype) -> GridPlane:
+        """
+        Converts plane data into a GridPlane of shape (n, m) and of the given dtype.
+
+        A GridPlane that already has the right shape and dtype is shared, not copied.
+        """
+        if isinstance(data, GridPlane) and data.shape == (self.n, self.m) and data.dtype == dtype:
+            return data
+        return GridPlane(self._as_plane_array(data, dtype))
+
+    def _cached(self, key, build: Callable):
+        """
+        Returns a structure derived from the grid, building it on the first call.
+
+        Cached structures are dropped as soon as the color or value plane is modified.
+
+        Parameters
+        ----------
+        key : hashable
+            The key identifying the structure.
+        build : Callable
+            A function without arguments building the structure.
+        """
+        state = (self._color.version, self._value.version)
+        if self._cache_state != state:
+            self._cache.clear()
+            self._cache_state = state
+        if key not in self._cache:
+            self._cache[key] = build()
+        return self._cache[key]
+
+    def _has_cached(self, key) -> bool:
+        """
+        Checks if a structure built by `_cached` is available and up to date.
+        """
+        return self._cache_state == (self._color.version, self._value.version) and key in self._cache
+
+    def _as_plane_array(self, data, dtype) -> np.ndarray:
+        """
+        Converts a nested sequence or an array into a contiguous (n, m) array of the given dtype.
+
+        Parameters
+        ----------
+        data : array_like
+            The plane data, e.g. a list of lists, a NumPy array or a GridPlane.
+        dtype : np.dtype
+            The dtype of the resulting array.
+
+        Returns
+        -------
+        np.ndarray
+            A C-contiguous array of shape (n, m). Arrays that already have the right
+            dtype and layout are used without copying.
+
+        Raises
+        ------
+        ValueError
+            If the data is not of shape (n, m).
+        """
+        if isinstance(data, np.ndarray) and data.size and not np.can_cast(data.dtype, dtype):
+            # Casting arrays wraps around silently, unlike converting Python ints
+            info = np.iinfo(dtype)
+            if data.min() < info.min or data.max() > info.max:
+                raise ValueError(f"Grid plane values must fit in {np.dtype(dtype).name}.")
+        try:
+            array = np.ascontiguousarray(data, dtype=dtype)
+        except ValueError:
+            raise ValueError(f"Grid planes must be of shape ({self.n}, {self.m}).")
+        if array.shape != (self.n, self.m):
+            raise ValueError(f"Grid planes must be of shape ({self.n}, {self.m}).")
+        return array
+
     def _is_within_bounds(self, i: int, j: int) -> bool:
         """
         Checks if a cell index is within the grid boundaries.
@@ -86,10 +871,10 @@ class Grid:
         """
         output = f"The grid is {self.n} x {self.m}. It has the following colors:\n"
         for i in range(self.n):
-            output += f"{[self.colors_list[self.color[i][j]] for j in range(self.m)]}\n"
+            output += f"{[self.colors_list[c] for c in self.color[i].tolist()]}\n"
         output += "and the following values:\n"
         for i in range(self.n):
-            output += f"{self.value[i]}\n"
+            output += f"{self.value[i].tolist()}\n"
         return output
 
     def __repr__(self) -> str:
@@ -106,22 +891,160 @@ class Grid:
         """
         return f"<grid.Grid: n={self.n}, m={self.m}>"
 
-    def plot(self) -> None:
+    def __eq__(self, other) -> bool:
+        """
+        Checks if two grids describe the same puzzle, i.e. have the same dimensions, colors and values.
+
+        Parameters
+        ----------
+        other : object
+            The object to compare with.
+
+        Returns
+        -------
+        bool
+            True if `other` is a Grid with the same dimensions, colors and values.
+
+        Time Complexity: O(n * m), or O(1) when both fingerprints are cached and differ
+        Space Complexity: O(1)
+        """
+        if not isinstance(other, Grid):
+            return NotImplemented
+        if self is other:
+            return True
+        if (self.n, self.m) != (other.n, other.m):
+            return False
+        if self._has_cached("fingerprint") and other._has_cached("fingerprint"):
+            return self.fingerprint() == other.fingerprint()
+        return (np.array_equal(self._color.array, other._color.array)
+                and np.array_equal(self._value.array, other._value.array))
+
+    def __hash__(self) -> int:
+        """
+        Returns a hash of the grid content, derived from its fingerprint.
+
+        Like the fingerprint, the hash changes when the grid is modified, so a grid
+        must not be mutated while it is used as a dictionary key or set member.
+
+        Returns
+        -------
+        int
+            The hash of the grid.
+
+        Time Complexity: O(n * m) for the first call after a modification, O(1) afterwards
+        Space Complexity: O(1)
+        """
+        return hash(self.fingerprint())
+
+    def fingerprint(self) -> str:
+        """
+        Returns a stable fingerprint of the grid content.
+
+        The fingerprint is a BLAKE2b digest of the dimensions, the plane dtypes and the
+        raw color and value buffers (in little-endian byte order). It is the same across
+        processes, sessions and machines for grids with equal content, whether they were
+        loaded from a text file, a binary file or built in memory, which makes it suitable
+        as a key for persistent caches. It is computed once and recomputed only after the
+        grid has been modified.
+
+        Returns
+        -------
+        str
+            The fingerprint, as a 32-character hexadecimal string.
+
+        Time Complexity: O(n * m) for the first call after a modification, O(1) afterwards
+        Space Complexity: O(1)
+        """
+        return self._cached("fingerprint", self._fingerprint)
+
+    def _fingerprint(self) -> str:
+        """
+        Computes the digest returned by `fingerprint`.
+        """
+        digest = hashlib.blake2b(digest_size=16, person=b"color-grid")
+        digest.update(struct.pack("<QQ", self.n, self.m))
+        for plane in (self._color, self._value):
+            array = plane.array
+            array = array.astype(array.dtype.newbyteorder("<"), copy=False)
+            digest.update(array.dtype.str.encode("ascii"))
+            digest.update(memoryview(np.ascontiguousarray(array)).cast("B"))
+        return digest.hexdigest()
+
+    def to_rgb(self, scale: int = 1, labels: bool = False) -> np.ndarray:
+        """
+        Renders the grid as an RGB image, one square of `scale` pixels per cell.
+
+        Parameters
+        ----------
+        scale : int, optional
+            The size of a cell in pixels. Default is 1.
+        labels : bool, optional
+            Whether to draw the value of each cell, from the bitmap glyph atlas of the
+            render module. Values are only drawn where they fit. Default is False.
+
+        Returns
+        -------
+        np.ndarray
+            The (n * scale, m * scale, 3) uint8 image.
+
+        Time Complexity: O(n * m * scale^2)
+        """
+        palette = np.array([matplotlib.colors.to_rgb(color) for color in self.colors_list])
+        palette = np.round(palette * 255).astype(np.uint8)
+        rgb = palette[self.color.array]
+        if scale > 1:
+            rgb = rgb.repeat(scale, axis=0).repeat(scale, axis=1)
+        if labels:
+            blit_labels(rgb, self.value.array, scale)
+        return rgb
+
+    def to_png(self, file_name: str, scale: int = 1, labels: bool = None) -> None:
+        """
+        Writes an image of the grid to a PNG file, without going through matplotlib.
+
+        Parameters
+        ----------
+        file_name : str
+            Name of the file to write.
+        scale : int, optional
+            The size of a cell in pixels. Default is 1.
+        labels : bool, optional
+            Whether to draw the value of each cell. Default is to draw them when cells are
+            at least 7 pixels wide, which is the smallest legible size.
+        """
+        if labels is None:
+            labels = scale >= 7
+        write_png(file_name, self.to_rgb(scale, labels))
+
+    def plot(self, labels: bool = None) -> None:
         """
         Plots a visual representation of the grid using matplotlib.
 
+        The colors are drawn with a single `imshow` call on the RGB image of the grid.
+        Drawing one text artist per value is what makes plots slow, so the values are only
+        drawn when they are legible at the figure size.
+
+        Parameters
+        ----------
+        labels : bool, optional
+            Whether to draw the value of each cell. Default is to draw them when a cell is
+            at least 12 points wide.
+
         Raises
         ------
         ImportError
             If matplotlib is not installed.
         """
-        plt.figure(figsize=(8, 8))
-        plt.imshow(self.color, cmap=matplotlib.colors.ListedColormap(self.colors_list), interpolation='nearest')
-        for i in range(self.n):
-            for j in range(self.m):
-                color_idx = self.color[i][j]
-                val = self.value[i][j]
-                plt.text(j, i, str(val), ha='center', va='center', fontsize=14)
+        size = 8
+        cell_points = size * 72 / max(self.n, self.m)
+        if labels is None:
+            labels = cell_points >= 12
+        plt.figure(figsize=(size, size))
+        plt.imshow(self.to_rgb(), interpolation='nearest')
+        if labels:
+            fontsize = min(14, cell_points / 2)
+            for (i, j), val in np.ndenumerate(self.value.array):
+                plt.text(j, i, str(val), ha='center', va='center', fontsize=fontsize)
         plt.xticks([])
         plt.yticks([])
         plt.show()
@@ -149,101 +1072,256 @@ class Grid:
         """
         if not self._is_within_bounds(i, j):
             raise IndexError("Cell index out of grid boundaries.")
-        return self.color[i][j] == 4
+        return bool(self.color.array[i, j] == 4)
 
-    def cost(self, pair: tuple[tuple[int, int], tuple[int, int]]) -> int:
+    def cost(self, pair) -> int | np.ndarray:
         """
-        Returns the cost of a pair of cells.
+        Returns the cost of a pair of cells, or of every pair of an array of pairs.
 
         Parameters
         ----------
-        pair : tuple[tuple[int, int], tuple[int, int]]
-            A pair of cells in the format ((i1, j1), (i2, j2)).
+        pair : tuple[tuple[int, int], tuple[int, int]] or tuple[int, int] or np.ndarray
+            A pair of cells in the format ((i1, j1), (i2, j2)), a pair of flat cell indices
+            (c1, c2) where c = i * m + j, or a (k, 2) array of pairs of flat cell indices.
 
         Returns
         -------
-        int
+        int or np.ndarray
             The cost of the pair, defined as the absolute value of the difference between their values.
+            For an array of pairs, the (k,) array of the costs of the pairs.
 
         Raises
         ------
         ValueError
             If the pair does not contain valid cell indices.
         """
-        (i1, j1), (i2, j2) = pair
+        if isinstance(pair, np.ndarray) and pair.ndim == 2:
+            values = self.value.array.ravel()[self.pairs_to_array(pair)].astype(np.int64)
+            return np.abs(values[:, 0] - values[:, 1])
+        first, second = pair
+        if isinstance(first, (int, np.integer)):
+            if not (0 <= first < self.n * self.m and 0 <= second < self.n * self.m):
+                raise ValueError("Pair contains invalid cell indices.")
+            first, second = divmod(int(first), self.m), divmod(int(second), self.m)
+        (i1, j1), (i2, j2) = first, second
         if not (self._is_within_bounds(i1, j1) and self._is_within_bounds(i2, j2)):
             raise ValueError("Pair contains invalid cell indices.")
-        return abs(self.value[i1][j1] - self.value[i2][j2])
+        return abs(int(self.value.array[i1, j1]) - int(self.value.array[i2, j2]))
 
-    def all_pairs(self, rules="original rules") -> list[tuple[tuple[int, int], tuple[int, int]]]:
+    def pairs_to_array(self, pairs) -> np.ndarray:
         """
-        Returns all allowed pairs of neighboring cells.
+        Converts pairs of cells to an array of pairs of flat cell indices.
+
+        Parameters
+        ----------
+        pairs : list[tuple[tuple[int, int], tuple[int, int]]] or array_like
+            Pairs of cells in the format ((i1, j1), (i2, j2)), or an array of pairs of flat
+            cell indices, which is only validated.
+
+        Returns
+        -------
+        np.ndarray
+            The (k, 2) int32 array of the flat indices i * m + j of the cells of each pair.
+
+        Raises
+        ------
+        ValueError
+            If a pair contains invalid cell indices.
+        """
+        if isinstance(pairs, np.ndarray):
+            array = pairs.astype(np.int32, copy=False).reshape(-1, 2)
+            if array.size and (array.min() < 0 or array.max() >= self.n * self.m):
+                raise ValueError("Pair contains invalid cell indices.")
+            return array
+        cells = np.array(pairs, dtype=np.int64).reshape(-1, 2, 2)
+        i, j = cells[:, :, 0], cells[:, :, 1]
+        if ((i < 0) | (i >= self.n) | (j < 0) | (j >= self.m)).any():
+            raise ValueError("Pair contains invalid cell indices.")
+        return (i * self.m + j).astype(np.int32)
+
+    def array_to_pairs(self, array: np.ndarray) -> list[tuple[tuple[int, int], tuple[int, int]]]:
+        """
+        Converts an array of pairs of flat cell indices to pairs of cells.
+
+        Parameters
+        ----------
+        array : np.ndarray
+            A (k, 2) array of the flat indices i * m + j of the cells of each pair.
+
+        Returns
+        -------
+        list[tuple[tuple[int, int], tuple[int, int]]]
+            The pairs in the format ((i1, j1), (i2, j2)), in the same order.
+        """
+        i, j = np.divmod(np.asarray(array, dtype=np.int64).reshape(-1, 2), self.m)
+        return list(zip(zip(i[:, 0].tolist(), j[:, 0].tolist()), zip(i[:, 1].tolist(), j[:, 1].tolist())))
+
+    def edge_arrays(self, rules="original rules", implicit_white: bool = False) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns all allowed pairs of cells as parallel arrays of flat cell indices.
+
+        The arrays are read-only. Except for the dense new rules arrays (`implicit_white=False`),
+        they are cached on the grid until its colors or values are modified.
+
+        A cell (i, j) is identified by its flat index i * m + j. The k-th allowed pair is
+        (u[k], v[k]) and its cost is cost[k]. Pairs are listed in the same order as in `all_pairs`.
+
+        Under the original rules, the adjacency masks are computed on shifted views of the color
+        plane and checked against the `color_compatibility` lookup table, without any Python loop.
 
         Parameters
         ----------
         rules : str, optional
             The rules to apply for determining allowed pairs. Default is "original rules".
+        implicit_white : bool, optional
+            Under the new rules, leaves out every pair involving a white cell. These pairs are
+            then only available through `white_pairs`, which avoids materializing O(W*N) pairs.
+            Default is False.
 
         Returns
         -------
-        list[tuple[tuple[int, int], tuple[int, int]]]
-            A list of pairs of neighboring cells that are allowed to be paired.
+        u : np.ndarray
+            Flat index of the first cell of each pair.
+        v : np.ndarray
+            Flat index of the second cell of each pair.
+        cost : np.ndarray
+            Cost of each pair, i.e. the absolute difference between the values of its cells.
 
         Raises
         ------
         ValueError
             If the rules parameter is not recognized.
+
+        Time Complexity: O(n*m*log(n*m)) for the original rules
         """
         if rules not in ["original rules", "new rules"]:
             raise ValueError("Unrecognized rules parameter.")
+        if rules == "new rules" and not implicit_white:
+            return self._edge_arrays(rules, implicit_white)
+        return self._cached(("edge_arrays", rules), lambda: self._edge_arrays(rules, implicit_white))
 
-        res = []
-        allowed = {
-            0: {0, 1, 2, 3},  # white can pair with all except black
-            1: {0, 1, 2},     # red can pair with white, blue, red
-            2: {0, 1, 2},     # blue can pair with white, blue, red
-            3: {0, 3}         # green can pair with white, green
-        }
-        directions = [(0, 1), (1, 0)]
-
-        if rules == "original rules":
-            for i in range(self.n):
-                for j in range(self.m):
-                    if self.is_forbidden(i, j):
-                        continue
-                    c1 = self.color[i][j]
-                    for dx, dy in directions:
-                        k, l = i + dx, j + dy
-                        if self._is_within_bounds(k, l):  # Check grid boundaries
-                            if self.is_forbidden(k, l):
-                                continue
-                            c2 = self.color[k][l]
-                            if c2 in allowed[c1] and c1 in allowed[c2]:
-                                res.append(((i, j), (k, l)))
-            return sorted(res)
+    def _edge_arrays(self, rules: str, implicit_white: bool) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Computes the arrays returned by `edge_arrays`.
+        """
+        color = self.color.array
+        ids = np.arange(self.n * self.m).reshape(self.n, self.m)
 
+        # Horizontal pairs (i, j)-(i, j+1) and vertical pairs (i, j)-(i+1, j)
+        right = self.color_compatibility[color[:, :-1], color[:, 1:]]
+        down = self.color_compatibility[color[:-1, :], color[1:, :]]
+        u_right = ids[:, :-1][right]
+        u_down = ids[:-1, :][down]
+        u = np.concatenate((u_right, u_down))
+        v = np.concatenate((u_right + 1, u_down + self.m))
+
+        if rules == "new rules" and implicit_white:
+            flat_color = color.ravel()
+            keep = (flat_color[u] != 0) & (flat_color[v] != 0)
+            u, v = u[keep], v[keep]
         elif rules == "new rules":
-            for i in range(self.n):
-                for j in range(self.m):
-                    if self.is_forbidden(i, j):
-                        continue
-                    c1 = self.color[i][j]
-                    if c1 == 0:  # White cell can pair with any non-forbidden cell
-                        for k in range(self.n):
-                            for l in range(self.m):
-                                if (i == k and j == l) or self.is_forbidden(k, l):
-                                    continue
-                                res.append(((i, j), (k, l)))
-                    else:  # Non-white cells follow original adjacency rules
-                        for dx, dy in directions:
-                            k, l = i + dx, j + dy
-                            if self._is_within_bounds(k, l):
-                                if self.is_forbidden(k, l):
-                                    continue
-                                c2 = self.color[k][l]
-                                if c2 in allowed[c1] and c1 in allowed[c2]:
-                                    res.append(((i, j), (k, l)))
-            return sorted(res)
+            # Non-white cells keep the adjacency rules, white cells can pair with any non-forbidden cell
+            flat_color = color.ravel()
+            keep = flat_color[u] != 0
+            u, v = u[keep], v[keep]
+            white = np.flatnonzero(flat_color == 0)
+            allowed = np.flatnonzero(flat_color != 4)
+            u_white = np.repeat(white, allowed.size)
+            v_white = np.tile(allowed, white.size)
+            keep = u_white != v_white
+            u = np.concatenate((u, u_white[keep]))
+            v = np.concatenate((v, v_white[keep]))
+
+        order = np.lexsort((v, u))
+        u, v = u[order], v[order]
+        flat_value = self.value.array.ravel().astype(np.int64)
+        cost = np.abs(flat_value[u] - flat_value[v])
+        for array in (u, v, cost):
+            array.flags.writeable = False
+        return u, v, cost
+
+    def adjacency(self, rules="original rules") -> Adjacency:
+        """
+        Returns the compressed sparse row adjacency structure of the allowed pairs.
+
+        The structure is built once per rule set and shared by every solver and bot working
+        on the grid. It is rebuilt after the colors or values of the grid are modified.
+
+        Parameters
+        ----------
+        rules : str, optional
+            The rules to apply for determining allowed pairs. Default is "original rules".
+
+        Returns
+        -------
+        Adjacency
+            The adjacency structure, with edge costs and weights.
+
+        Raises
+        ------
+        ValueError
+            If the rules parameter is not recognized.
+        """
+        if rules not in ["original rules", "new rules"]:
+            raise ValueError("Unrecognized rules parameter.")
+        return self._cached(("adjacency", rules), lambda: Adjacency.from_grid(self, rules))
+
+    def pair_index(self, rules="original rules") -> PairIndex:
+        """
+        Returns a new live index of the available pairs, with no blocked cell.
+
+        Parameters
+        ----------
+        rules : str, optional
+            The rules to apply for determining allowed pairs. Default is "original rules".
+
+        Returns
+        -------
+        PairIndex
+            The index, supporting `block_cell` and `unblock_cell` in O(degree).
+        """
+        return PairIndex(self, rules)
+
+    def white_pairs(self) -> WhitePairs:
+        """
+        Returns the implicit set of pairs involving a white cell under the new rules.
+
+        Together with `edge_arrays("new rules", implicit_white=True)`, it describes every
+        allowed pair under the new rules exactly once, without materializing them.
+
+        Returns
+        -------
+        WhitePairs
+            The implicit white pair set.
+        """
+        return WhitePairs(self)
+
+    def all_pairs(self, rules="original rules") -> list[tuple[tuple[int, int], tuple[int, int]]]:
+        """
+        Returns all allowed pairs of neighboring cells.
+
+        This is a compatibility wrapper around `edge_arrays` that converts flat cell indices
+        back to (i, j) tuples.
+
+        Parameters
+        ----------
+        rules : str, optional
+            The rules to apply for determining allowed pairs. Default is "original rules".
+
+        Returns
+        -------
+        list[tuple[tuple[int, int], tuple[int, int]]]
+            A sorted list of pairs of neighboring cells that are allowed to be paired.
+
+        Raises
+        ------
+        ValueError
+            If the rules parameter is not recognized.
+        """
+        u, v, _ = self.edge_arrays(rules)
+        i1, j1 = np.divmod(u, self.m)
+        i2, j2 = np.divmod(v, self.m)
+        return list(zip(zip(i1.tolist(), j1.tolist()), zip(i2.tolist(), j2.tolist())))
 
     def vois(self, i: int, j: int) -> list[tuple[int, int]]:
         """
@@ -305,30 +1383,204 @@ class Grid:
             If the file format is incorrect or contains invalid color values.
         """
         try:
-            with open(file_name, "r") as file:
-                n, m = map(int, file.readline().split())
-                color = [[] for _ in range(n)]
-                for i_line in range(n):
-                    line_color = list(map(int, file.readline().split()))
-                    if len(line_color) != m:
-                        raise ValueError("Incorrect format")
-                    for j in range(m):
-                        if line_color[j] not in range(5):
-                            raise ValueError("Invalid color")
-                    color[i_line] = line_color
-
-                if read_values:
-                    value = [[] for _ in range(n)]
-                    for i_line in range(n):
-                        line_value = list(map(int, file.readline().split()))
-                        if len(line_value) != m:
-                            raise ValueError("Incorrect format")
-                        value[i_line] = line_value
-                else:
-                    value = []
-
-                grid = Grid(n, m, color, value)
+            with open(file_name, "rb") as file:
+                content = file.read()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"The file {file_name} does not exist.")
+
+        first_line, _, content = content.partition(b"\n")
+        n, m = map(int, first_line.split())
+        if n <= 0 or m <= 0:
+            raise ValueError("Number of rows and columns must be positive integers.")
+
+        # Parse all the needed lines at once, rows before the first malformed line are kept
+        rows = cls._parse_rows(content, 2 * n if read_values else n, m)
+        color = rows[:n]
+        if ((color < 0) | (color > 4)).any():
+            raise ValueError("Invalid color")
+        if len(rows) < (2 * n if read_values else n):
+            raise ValueError("Incorrect format")
+        value = rows[n:] if read_values else []
+
+        return Grid(n, m, color, value)
+
+    @staticmethod
+    def _parse_rows(content: bytes, n_rows: int, m: int) -> np.ndarray:
+        """
+        Parses the first lines of a text buffer as rows of m whitespace-separated integers.
+
+        The number of integers on each line is counted with vectorized operations on the raw
+        bytes, and the integers are converted from the whitespace-separated tokens in a
+        single call to NumPy.
+
+        Parameters
+        ----------
+        content : bytes
+            The text to parse.
+        n_rows : int
+            The number of lines to parse.
+        m : int
+            The number of integers expected on each line.
+
+        Returns
+        -------
+        np.ndarray
+            An int64 array of shape (k, m) holding the first k lines, where k <= n_rows is the
+            number of leading lines that are well-formed (k < n_rows if a line has a wrong
+            number of integers or is missing).
+
+        Raises
+        ------
+        ValueError
+            If one of the well-formed lines contains something other than integers.
+        """
+        buffer = np.frombuffer(content, dtype=np.uint8)
+        newlines = np.flatnonzero(buffer == 10)[:n_rows]
+        block = buffer[:newlines[-1]] if newlines.size == n_rows else buffer
+
+        # Count the tokens (starts of non-whitespace runs) on each line
+        space = np.isin(block, np.frombuffer(b" \t\n\r\x0b\x0c", dtype=np.uint8))
+        starts = np.flatnonzero(~space & np.concatenate(([True], space[:-1])))
+        counts = np.bincount(np.searchsorted(newlines, starts), minlength=n_rows)[:n_rows]
+        malformed = np.flatnonzero(counts != m)
+        n_valid = int(malformed[0]) if malformed.size else n_rows
+
+        if n_valid == 0:
+            end = 0
+        elif n_valid <= newlines.size:
+            end = int(newlines[n_valid - 1])
+        else:
+            end = block.size  # The last parsed line has no trailing newline
+        rows = np.array(content[:end].split(), dtype=np.int64)
+        if rows.size != n_valid * m:
+            raise ValueError("Incorrect format")
+        return rows.reshape(n_valid, m)
+
+    def to_file(self, file_name: str) -> None:
+        """
+        Writes the grid to a text file in the format read by `grid_from_file`, values included.
+
+        Parameters
+        ----------
+        file_name : str
+            Name of the file to write.
+        """
+        # Blocks of about one million cells bound the memory used by the text buffers
+        block_rows = max(1, (1 << 20) // self.m)
+        with open(file_name, "wb") as file:
+            file.write(f"{self.n} {self.m}\n".encode("ascii"))
+            for plane in (self.color.array, self.value.array):
+                for i in range(0, self.n, block_rows):
+                    file.write(self._format_rows(plane[i:i + block_rows]))
+
+    @staticmethod
+    def _format_rows(rows: np.ndarray) -> bytes:
+        """
+        Formats a 2D integer array as lines of space-separated integers, without a Python loop over the cells.
+
+        Every integer is written with the same number of digits, after a sign column and
+        before a separator column, in a character array whose leading zeros and unused
+        signs are then masked out.
+        """
+        flat = rows.ravel().astype(np.int64)
+        magnitude = np.abs(flat)
+        width = len(str(int(magnitude.max())))
+        n_digits = np.ones(flat.size, dtype=np.int64)
+        for k in range(1, width):
+            n_digits += magnitude >= 10 ** k
+
+        chars = np.empty((flat.size, width + 2), dtype=np.uint8)
+        chars[:, 0] = ord("-")
+        for k in range(width):
+            chars[:, 1 + k] = magnitude // 10 ** (width - 1 - k) % 10 + ord("0")
+        chars[:, -1] = ord(" ")
+        chars[rows.shape[1] - 1::rows.shape[1], -1] = ord("\n")
+
+        keep = np.ones(chars.shape, dtype=bool)
+        keep[:, 0] = flat < 0
+        keep[:, 1:-1] = np.arange(width) >= width - n_digits[:, None]
+        return chars[keep].tobytes()
+
+    def to_binary(self, file_name: str) -> None:
+        """
+        Writes the grid to a file in the binary grid format.
+
+        The file starts with a 32-byte header (magic number, format version, n, m and the
+        dtypes of both planes) followed by the raw C-ordered color and value planes, so that
+        it can be loaded back with `from_binary` without any parsing.
+
+        Parameters
+        ----------
+        file_name : str
+            Name of the file to write.
+        """
+        header = self.binary_header.pack(
+            self.binary_magic, self.binary_version, self.n, self.m,
+            self.color.dtype.str.encode("ascii"), self.value.dtype.str.encode("ascii"))
+        color_offset, value_offset = self._binary_offsets(self.n, self.m, self.color.dtype)
+        with open(file_name, "wb") as file:
+            file.write(header)
+            file.write(b"\0" * (color_offset - len(header)))
+            file.write(self.color.array.tobytes())
+            file.write(b"\0" * (value_offset - color_offset - self.color.array.nbytes))
+            file.write(self.value.array.tobytes())
+
+    @classmethod
+    def _binary_offsets(cls, n: int, m: int, color_dtype: np.dtype) -> tuple[int, int]:
+        """
+        Returns the byte offsets of the color and value planes in a binary grid file.
+        """
+        color_offset = cls.binary_header.size
+        value_offset = color_offset + n * m * np.dtype(color_dtype).itemsize
+        return color_offset, (value_offset + 7) // 8 * 8
+
+    @classmethod
+    def from_binary(cls, file_name: str, mode: str = "r") -> 'Grid':
+        """
+        Creates a Grid object from a file in the binary grid format written by `to_binary`.
+
+        The planes are memory-mapped with `np.memmap`, so no data is copied or parsed:
+        pages are read lazily and shared between processes loading the same file.
+
+        Parameters
+        ----------
+        file_name : str
+            Name of the file to load.
+        mode : str, optional
+            The `np.memmap` mode. Default is "r" (read-only grid). Use "c" for a
+            copy-on-write grid that can be modified in memory, or "r+" to write changes
+            back to the file.
+
+        Returns
+        -------
+        Grid
+            The initialized Grid object, backed by the memory-mapped file.
+
+        Raises
+        ------
+        FileNotFoundError
+            If the file does not exist.
+        ValueError
+            If the file is not a valid binary grid file.
+        """
+        try:
+            with open(file_name, "rb") as file:
+                header = file.read(cls.binary_header.size)
+                file_size = os.fstat(file.fileno()).st_size
         except FileNotFoundError:
             raise FileNotFoundError(f"The file {file_name} does not exist.")
 
-        return grid
+        if len(header) != cls.binary_header.size:
+            raise ValueError("Incorrect format")
+        magic, version, n, m, color_dtype, value_dtype = cls.binary_header.unpack(header)
+        if magic != cls.binary_magic or version != cls.binary_version:
+            raise ValueError("Incorrect format")
+        color_dtype = np.dtype(color_dtype.rstrip(b"\0").decode("ascii"))
+        value_dtype = np.dtype(value_dtype.rstrip(b"\0").decode("ascii"))
+        color_offset, value_offset = cls._binary_offsets(n, m, color_dtype)
+        if n <= 0 or m <= 0 or file_size < value_offset + n * m * value_dtype.itemsize:
+            raise ValueError("Incorrect format")
+
+        color = np.memmap(file_name, dtype=color_dtype, mode=mode, offset=color_offset, shape=(n, m))
+        value = np.memmap(file_name, dtype=value_dtype, mode=mode, offset=value_offset, shape=(n, m))
+        return cls(n, m, color, value)
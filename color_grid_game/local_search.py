@@ -0,0 +1,180 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from color_grid_game import *
+
+def improve_pairs(grid: Grid, pairs, rules="original rules", max_length: int = 5,
+                  should_stop: Callable = None, max_neighbors: int = 8) -> np.ndarray:
+    """
+    Improves a set of pairs by local search over short alternating paths and cycles.
+
+    An alternating path alternates pairs that are not selected and selected pairs; flipping
+    it selects the former and drops the latter. Around each cell, the paths of at most
+    `max_length` pairs that can be flipped are enumerated: they start and end at a free cell
+    or with a selected pair, or close into a cycle, e.g. around a 2x2 square. Their score
+    deltas are accumulated pair by pair, the neighbors of each cell being tried from the
+    most profitable pair so that the paths that cannot beat the best delta are cut, and the
+    most improving path is flipped. Sweeps over the cells are repeated until no flip
+    improves the score.
+
+    A path only leaves a cell through one of its `max_neighbors` most profitable pairs,
+    which bounds the branching of the search when cells have many allowed pairs, as white
+    cells under the new rules. The gain of a pair, the score decrease when it is selected,
+    is twice the smaller value of its cells, so it is computed from the values directly,
+    and the candidates among the implicit white pairs are given by `WhitePairs.best_partners`.
+
+    Parameters
+    ----------
+    grid : Grid
+        The grid.
+    pairs : list[tuple[tuple[int, int], tuple[int, int]]] or np.ndarray
+        Legal pairs of the grid, in the format ((i1, j1), (i2, j2)), or as a (k, 2) array of
+        flat cell indices.
+    rules : str, optional
+        The rules to apply for determining allowed pairs. Default is "original rules".
+    max_length : int, optional
+        Maximum number of pairs of a flipped path. Default is 5.
+    should_stop : Callable, optional
+        A function without arguments called between two sweeps, which stops the search when
+        it returns True. Default is None.
+    max_neighbors : int, optional
+        Number of most profitable pairs of each cell that a path may use. Default is 8.
+
+    Returns
+    -------
+    np.ndarray
+        The (k, 2) int32 array of the flat cell indices of the improved pairs.
+
+    Raises
+    ------
+    ValueError
+        If the rules parameter is not recognized or if a pair is not legal.
+
+    Time Complexity: O(n*m * k^(max_length // 2)) per sweep, where k is `max_neighbors`
+    """
+    validation = validate_pairs(grid, pairs, rules)
+    validation.check()
+    adjacency = grid.adjacency(rules)
+    n_cells = adjacency.n_cells
+
+    # The `max_neighbors` most profitable neighbors of each cell by descending gain -weight;
+    # lists are faster than arrays for the scalar accesses of the search
+    # Ties are broken by cost: the pairs of a cell with a larger value keep its gain, the
+    # closest values leave the largest ones to the other cells
+    cells = np.repeat(np.arange(n_cells), np.diff(adjacency.indptr))
+    others = adjacency.indices
+    if adjacency.white is not None:
+        # Only the best white partners of each cell are candidates, the others being cut anyway
+        white_indptr, white_partners = adjacency.white.best_partners(max_neighbors)
+        cells = np.concatenate((cells, np.repeat(np.arange(n_cells), np.diff(white_indptr))))
+        others = np.concatenate((others, white_partners))
+    flat_value = grid.value.array.ravel().astype(np.int64)
+    gain = 2 * np.minimum(flat_value[cells], flat_value[others])
+    order = np.lexsort((np.abs(flat_value[cells] - flat_value[others]), -gain, cells))
+    counts = np.bincount(cells, minlength=n_cells)
+    rank = np.arange(order.size) - (np.cumsum(counts) - counts)[cells[order]]
+    order = order[rank < max_neighbors]
+    indptr = np.zeros(n_cells + 1, dtype=np.int64)
+    np.cumsum(np.bincount(cells[order], minlength=n_cells), out=indptr[1:])
+    indptr = indptr.tolist()
+    neighbors = others[order].tolist()
+    gains = gain[order].tolist()
+    max_gain = int(gain.max()) if gain.size else 0
+    value = flat_value.tolist()
+
+    mate = [-1] * n_cells
+    mate_gain = [0] * n_cells
+
+    def pair_gain(a, b):
+        # cost - value[a] - value[b] = -2 * min(value[a], value[b])
+        return 2 * min(value[a], value[b])
+
+    for a, b in validation.pairs.tolist():
+        mate[a], mate[b] = b, a
+        mate_gain[a] = mate_gain[b] = pair_gain(a, b)
+
+    def best_flip(start):
+        """
+        Returns the most improving path flip around a cell, as (delta, cells) where cells
+        lists the cells of the path in order, or (0, None).
+        """
+        best = [0, None]
+        if mate[start] == -1:
+            path, delta = [start], 0
+        else:
+            path, delta = [start, mate[start]], -mate_gain[start]
+        on_path = set(path)
+
+        def search(delta, length):
+            # The path ends with a selected pair or at a free start: it continues with a pair
+            # that is not selected
+            last = path[-1]
+            # Largest gain of the pairs that may follow the next one
+            future = (max_length - length - 1) // 2 * max_gain
+            for entry in range(indptr[last], indptr[last + 1]):
+                total = delta + gains[entry]
+                if total + future <= best[0]:
+                    break
+                other = neighbors[entry]
+                if other == mate[last]:
+                    continue
+                if other == start:
+                    # Closes a cycle through the selected pair of the start
+                    if length >= 3 and mate[start] == path[1] and total > best[0]:
+                        best[:] = total, path + [start]
+                    continue
+                if other in on_path:
+                    continue
+                if mate[other] == -1:
+                    if total > best[0]:
+                        best[:] = total, path + [other]
+                    continue
+                end = mate[other]
+                if length + 2 > max_length or end in on_path:
+                    continue
+                # Continue with the selected pair of the other cell, which may end the path
+                total -= mate_gain[other]
+                path.extend((other, end))
+                on_path.update((other, end))
+                if total > best[0]:
+                    best[:] = total, list(path)
+                if length + 2 < max_length:
+                    search(total, length + 2)
+                on_path.difference_update((other, end))
+                del path[-2:]
+
+        if len(path) - 1 < max_length:
+            search(delta, len(path) - 1)
+        return best
+
+    def flip(path):
+        """
+        Selects the pairs of a path that are not selected and drops the others.
+        """
+        steps = list(zip(path[:-1], path[1:]))
+        selected = [mate[a] == b for a, b in steps]
+        for (a, b), was_selected in zip(steps, selected):
+            if was_selected:
+                mate[a] = mate[b] = -1
+                mate_gain[a] = mate_gain[b] = 0
+        for (a, b), was_selected in zip(steps, selected):
+            if not was_selected:
+                mate[a], mate[b] = b, a
+                mate_gain[a] = mate_gain[b] = pair_gain(a, b)
+
+    active = [cell for cell in range(n_cells) if indptr[cell + 1] > indptr[cell]]
+    improved = True
+    while improved:
+        if should_stop is not None and should_stop():
+            break
+        improved = False
+        for cell in active:
+            delta, path = best_flip(cell)
+            if path is not None:
+                flip(path)
+                improved = True
+
+    mate = np.array(mate, dtype=np.int64)
+    first = np.flatnonzero(mate > np.arange(n_cells))
+    return np.stack((first, mate[first]), axis=1).astype(np.int32)
@@ -0,0 +1,230 @@
+import sys
+import os
+import math
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from color_grid_game import *
+
+def _best_demand(adjacency: Adjacency, duals: np.ndarray, paired: np.ndarray) -> np.ndarray:
+    """
+    Returns, for each cell, the smallest dual value keeping every pair of the cell feasible
+    given the duals of the other cells, and 0 for the cells without any allowed pair.
+    The implicit white pairs of the new rules are included through `WhitePairs.demands`.
+    """
+    demand = -adjacency.weight[adjacency.edge_ids] - duals[adjacency.indices]
+    best = np.zeros(adjacency.n_cells)
+    best[paired] = np.maximum.reduceat(demand, adjacency.indptr[:-1][paired])
+    if adjacency.white is not None:
+        best = np.maximum(best, adjacency.white.demands(duals))
+    return np.maximum(best, 0)
+
+def matching_duals(grid: Grid, rules="original rules", passes: int = 20) -> np.ndarray:
+    """
+    Computes a feasible solution of the dual of the linear relaxation of the pairing problem.
+
+    Selecting the pair (u, v) changes the score by its weight cost - value[u] - value[v],
+    which is never positive. Duals y >= 0 with y[u] + y[v] >= -weight for every allowed pair
+    bound the score change of any pairing from below by -sum(y). The duals start from the
+    best-neighbor relaxation, in which each cell claims half of its best pair, and are then
+    lowered by coordinate descent. Under the original rules the pairs join cells of opposite
+    parities, so each parity class is lowered at once, which is exact for that class. Under
+    the new rules every cell moves halfway towards its smallest feasible value, which keeps
+    every pair feasible. The white pairs of the new rules are never materialized: the
+    best gain and the demand of each cell over its white pairs are computed by value.
+
+    Parameters
+    ----------
+    grid : Grid
+        The grid.
+    rules : str, optional
+        The rules to apply for determining allowed pairs. Default is "original rules".
+    passes : int, optional
+        Maximum number of descent passes. Default is 20.
+
+    Returns
+    -------
+    np.ndarray
+        The dual value of each cell, indexed by flat index.
+
+    Time Complexity: O(passes * (n*m*log(n*m) + E)) where E is the number of explicit edges
+    """
+    adjacency = grid.adjacency(rules)
+    paired = adjacency.degrees() > 0
+    duals = np.zeros(adjacency.n_cells)
+    duals[paired] = np.maximum.reduceat(-adjacency.weight[adjacency.edge_ids], adjacency.indptr[:-1][paired]) / 2
+    if adjacency.white is not None:
+        duals = np.maximum(duals, adjacency.white.best_gains() / 2)
+
+    i, j = np.divmod(np.arange(adjacency.n_cells), grid.m)
+    parities = [(i + j) % 2 == parity for parity in (0, 1)]
+    for _ in range(passes):
+        previous = duals.copy()
+        if rules == "original rules":
+            for parity in parities:
+                duals[parity] = _best_demand(adjacency, duals, paired)[parity]
+        else:
+            duals = (duals + _best_demand(adjacency, duals, paired)) / 2
+        if np.allclose(duals, previous, rtol=0, atol=1e-9):
+            break
+    return duals
+
+def fit_matching_duals(grid: Grid, pairs: np.ndarray) -> tuple[np.ndarray, np.ndarray, bool]:
+    """
+    Fits duals of the pairing problem under the original rules to a given set of pairs.
+
+    The pairs join even cells (i + j even) to odd cells. The duals y >= 0 must satisfy
+    y[u] + y[v] >= -weight for every allowed pair, with equality on the given pairs, so
+    that each given pair fixes the dual of its odd cell from the dual of its even cell.
+    The smallest duals of the even cells are then the longest paths of a difference
+    constraint system, computed by vectorized Bellman-Ford passes, the duals of the
+    unpaired odd cells being 0. The pairs whose even cell cannot be fitted, i.e. whose odd
+    cell would need a negative dual, which happens around improving alternating paths and
+    cycles, are dropped and the fit is restarted.
+    After a small edit of a grid whose pairs were optimal, only the pairs around the edit
+    are dropped.
+
+    Parameters
+    ----------
+    grid : Grid
+        The grid.
+    pairs : np.ndarray
+        The (k, 2) array of flat cell indices of allowed pairs, no cell being used twice.
+
+    Returns
+    -------
+    duals : np.ndarray
+        The dual value of each cell, indexed by flat index. They are feasible for every
+        allowed pair of a fitted even cell, and so are the duals of the odd cells that are
+        not paired with a fitted even cell.
+    fitted : np.ndarray
+        Whether each pair was fitted, i.e. is tight with respect to the duals.
+    optimal : bool
+        Whether the duals prove that the pairs are optimal: every pair is fitted and the
+        duals of the unpaired cells are 0.
+
+    Time Complexity: O(L * (n*m + E)) for L Bellman-Ford passes, where E is the number of edges
+    """
+    adjacency = grid.adjacency("original rules")
+    n_cells = adjacency.n_cells
+    u_is_even = (adjacency.u // grid.m + adjacency.u % grid.m) % 2 == 0
+    even_ends = np.where(u_is_even, adjacency.u, adjacency.v)
+    odd_ends = np.where(u_is_even, adjacency.v, adjacency.u)
+    gain = -adjacency.weight.astype(float)
+
+    pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+    first_is_even = (pairs[:, 0] // grid.m + pairs[:, 0] % grid.m) % 2 == 0
+    pair_even = np.where(first_is_even, pairs[:, 0], pairs[:, 1])
+    pair_odd = np.where(first_is_even, pairs[:, 1], pairs[:, 0])
+    value = grid.value.array.ravel().astype(float)
+    # Even cell paired with each odd cell, and gain of the pair of each even cell
+    partner = np.full(n_cells, -1, dtype=np.int64)
+    partner[pair_odd] = pair_even
+    pair_gain = np.zeros(n_cells)
+    pair_gain[pair_even] = value[pair_even] + value[pair_odd] - np.abs(value[pair_even] - value[pair_odd])
+
+    fitted = np.zeros(n_cells, dtype=bool)
+    fitted[pair_even] = True
+    # Constraint y[i] >= gain[i, j] - pair_gain[k] + y[k] for the even cell k paired with j
+    source = partner[odd_ends]
+    arcs = (source >= 0) & (source != even_ends)
+    arc_even, arc_source = even_ends[arcs], source[arcs]
+    arc_length = gain[arcs] - pair_gain[np.maximum(arc_source, 0)]
+    # Constraint y[i] >= gain[i, j] for the unpaired odd cells j, whose dual is 0
+    unpaired_odd = np.ones(n_cells, dtype=bool)
+    unpaired_odd[pair_odd] = False
+    unpaired_odd[pair_even] = False
+    to_unpaired = unpaired_odd[odd_ends]
+
+    while True:
+        active = fitted[arc_even] & fitted[arc_source]
+        duals = np.zeros(n_cells)
+        edges = to_unpaired & fitted[even_ends]
+        np.maximum.at(duals, even_ends[edges], gain[edges])
+        while True:
+            raised = duals.copy()
+            np.maximum.at(raised, arc_even[active], arc_length[active] + duals[arc_source[active]])
+            # A dual above the gain of its pair makes the dual of the odd cell negative
+            overflow = fitted & (raised > pair_gain + 1e-9)
+            if overflow.any() or np.array_equal(raised, duals):
+                break
+            duals = raised
+        if not overflow.any():
+            break
+        fitted[overflow] = False
+
+    pair_fitted = fitted[pair_even]
+    duals[~fitted] = 0
+    duals[pair_odd[pair_fitted]] = pair_gain[pair_even[pair_fitted]] - duals[pair_even[pair_fitted]]
+    # Odd cells not paired with a fitted even cell get the smallest feasible dual
+    free_odd = np.ones(n_cells, dtype=bool)
+    free_odd[pair_odd[pair_fitted]] = False
+    edges = fitted[even_ends] & free_odd[odd_ends]
+    np.maximum.at(duals, odd_ends[edges], gain[edges] - duals[even_ends[edges]])
+
+    # Unpaired even cells must keep a zero dual against the pairs of their neighbors
+    unpaired_even = np.ones(n_cells, dtype=bool)
+    unpaired_even[pair_even] = False
+    edges = unpaired_even[even_ends]
+    optimal = bool(pair_fitted.all()) and \
+        not (gain[edges] > duals[odd_ends[edges]] + 1e-9).any() and \
+        not (duals[unpaired_odd] > 1e-9).any()
+    return duals, pair_fitted, optimal
+
+def lower_bound(grid: Grid, rules="original rules", iterations: int = 200) -> int:
+    """
+    Computes a lower bound on the score of every pairing of a grid.
+
+    For any multipliers y >= 0 on the cells, a pairing cannot lower the score with no pair,
+    i.e. the sum of the values of the cells that are not black, by more than
+    sum(y) + sum(max(0, -weight[u, v] - y[u] - y[v])) over the allowed pairs (u, v). This
+    Lagrangian bound is minimized by subgradient descent starting from the `matching_duals`,
+    keeping the best bound found. Under the original rules it approaches the optimal score;
+    under the new rules the pairs with white cells form odd cycles, which weakens the bound.
+    The white pairs are kept out of the sum instead of being materialized: after each step
+    the duals of the white cells are raised to their `WhitePairs.demands`, which makes every
+    white pair feasible, so that only the explicit pairs can have a positive slack. The
+    bound is computed once per grid, rule set and number of iterations.
+
+    Parameters
+    ----------
+    grid : Grid
+        The grid.
+    rules : str, optional
+        The rules to apply for determining allowed pairs. Default is "original rules".
+    iterations : int, optional
+        Number of subgradient steps. Default is 200.
+
+    Returns
+    -------
+    int
+        A score that no pairing of the grid can beat.
+
+    Time Complexity: O(iterations * (n*m*log(n*m) + E)) where E is the number of explicit edges
+    """
+    def build():
+        adjacency = grid.adjacency(rules)
+        gain = -adjacency.weight.astype(float)
+        u, v = adjacency.u, adjacency.v
+        n_cells = adjacency.n_cells
+        white = adjacency.white
+        duals = matching_duals(grid, rules)
+        best = duals.sum()
+        step = gain.max() / 4 if gain.size else 0.0
+        if white is not None:
+            step = max(step, white.best_gains().max() / 4 if n_cells else 0.0)
+        for k in range(iterations):
+            if white is not None:
+                duals[white.white] = np.maximum(duals, white.demands(duals))[white.white]
+            slack = gain - duals[u] - duals[v]
+            violated = slack > 0
+            best = min(best, duals.sum() + slack[violated].sum())
+            # Subgradient of the bound, projected on y >= 0
+            gradient = 1.0 - np.bincount(u[violated], minlength=n_cells) - np.bincount(v[violated], minlength=n_cells)
+            gradient[(duals <= 0) & (gradient > 0)] = 0
+            duals = np.maximum(duals - step / math.sqrt(k + 1) * gradient, 0)
+
+        free = grid.color.array != 4
+        unpaired_value = int(grid.value.array.sum(where=free, dtype=np.int64))
+        # Scores are integers, the tolerance absorbs the rounding errors of the duals
+        return math.ceil(unpaired_value - best - 1e-6)
+    return grid._cached(("lower_bound", rules, iterations), build)
@@ -7,7 +7,11 @@ def main():
     # Set up argument parser
     parser = argparse.ArgumentParser(description="Solve color grid game with specified rules.")
     parser.add_argument('--rules', choices=['original', 'new'], default='original', help='Choose the rule set: original or new')
+    parser.add_argument('--budget', type=float, default=None, help='Time available per grid in seconds, exact solvers only when omitted')
+    parser.add_argument('--cache-dir', default=None,
+                        help='Directory where the solver results are cached and read back, no cache when omitted')
     args = parser.parse_args()
+    Solver.result_cache = None if args.cache_dir is None else ResultCache(args.cache_dir)
 
     data_path: str = "./input/"
     grid_files = [f for f in os.listdir(data_path) if f.endswith(".in")]
@@ -19,25 +23,15 @@ def main():
 
         grid = Grid.grid_from_file(full_file_path, read_values=True)
         rules = "original rules" if args.rules == 'original' else "new rules"
-        solver_blossom = Solver_Blossom(grid, rules)
-        solver_hungarian = Solver_Hungarian(grid, rules)
+        solver_class = select_solver(grid, rules, args.budget)
+        estimate = solver_class.estimate_time(grid, rules)
 
-        start_blossom = time.time()
-        solver_blossom.run()
-        end_blossom = time.time()
+        start = time.time()
+        solver = solver_class(grid, rules)
+        solver.run()
+        end = time.time()
 
-        start_hungarian = time.time()
-        solver_hungarian.run()
-        end_hungarian = time.time()
-
-        blossom_score = solver_blossom.score()
-        hungarian_score = solver_hungarian.score()
-
-        time_blossom = end_blossom - start_blossom
-        time_hungarian = end_hungarian - start_hungarian
-
-        print(f"  Solver_Blossom {rules.capitalize()} score: {blossom_score},  Time : {time_blossom:.4f} seconds")
-        print(f"  Solver_Hungarian {rules.capitalize()} score: {hungarian_score},  Time : {time_hungarian:.4f} seconds\n")
+        print(f"  {solver_class.__name__} {rules.capitalize()} score: {solver.score()},  Time : {end - start:.4f} seconds (estimated {estimate:.4f})\n")
 
 if __name__ == '__main__':
     main()
@@ -16,7 +16,7 @@ class Minimax_Bot:
     """
     
     @staticmethod
-    def move_to_play(grid: Grid, rules: str):
+    def move_to_play(grid: Grid, rules: str, pair_index: PairIndex = None):
         """
         Choose the best pair considering that the opponent is playing greedy and
         will choose the best possible pair with a one-turn prediction.
@@ -27,6 +27,9 @@ class Minimax_Bot:
             The grid of the turn to be solved.
         rules : str
             The game rules chosen by the player.
+        pair_index : PairIndex, optional
+            Live index of the game, whose blocked cells are the cells already played.
+            It is left unchanged. Default is a new index of `grid` with no blocked cell.
             
         Returns
         --------
@@ -36,34 +39,27 @@ class Minimax_Bot:
     
         Complexity : O(n*m * log(n*m))
         """ 
-    
-        pairs = grid.all_pairs(rules)  # O(n*m)
+        if pair_index is None:
+            pair_index = grid.pair_index(rules)
+
+        pairs = pair_index.available_pairs()  # O(n*m)
         if not pairs:
             return None
     
-        # 1) We sort all pairs by cost (from smallest to largest)
-        pairs_sorted = sorted(pairs, key=lambda p: grid.cost(p))  # O(n*m * log(n*m))
-    
         best_score = float('inf')
         best_pair_for_us = None
     
         # We iterate over all possible pairs (O(n*m) iterations)
         for pair in pairs:
             # We "block" the two cells in this pair
-            used_cells = {pair[0], pair[1]}  
+            pair_index.block_pair(pair)
     
-            # 2) Find the best possible pair for the opponent
-            #    by going through pairs_sorted
-            choice_adversaire = None
-            for candidate in pairs_sorted:  # In practice, we skip quickly if adjacency is limited
-                c0, c1 = candidate
-                if c0 not in used_cells and c1 not in used_cells:
-                    # This pair is free in the modified grid
-                    choice_adversaire = candidate
-                    break
+            # Find the best possible pair for the opponent, scanning the pairs by increasing cost
+            choice_adversaire = pair_index.min_cost_pair()
+            pair_index.unblock_pair(pair)
+
             # If we didn't find any free pair => the opponent can't play
             # We can set cost=0 or "no impact from the opponent"
-            
             if choice_adversaire is None:
                 # The opponent does not play
                 score = grid.cost(pair)
@@ -78,7 +74,7 @@ class Minimax_Bot:
         return best_pair_for_us
     
     @staticmethod
-    def move_to_play2(grid: Grid, rules: str) -> tuple[tuple[int, int], tuple[int, int]] | None:
+    def move_to_play2(grid: Grid, rules: str, pair_index: PairIndex = None) -> tuple[tuple[int, int], tuple[int, int]] | None:
         """
         Choose the best pair by:
         1. Minimizing the current move's cost for the bot.
@@ -90,6 +86,9 @@ class Minimax_Bot:
             The grid of the turn to be solved.
         rules : str
             The game rules chosen by the player.
+        pair_index : PairIndex, optional
+            Live index of the game, whose blocked cells are the cells already played.
+            It is left unchanged. Default is a new index of `grid` with no blocked cell.
 
         Returns
         -------
@@ -100,7 +99,10 @@ class Minimax_Bot:
         ----------
         O((n*m)²)
         """
-        pairs = grid.all_pairs(rules)
+        if pair_index is None:
+            pair_index = grid.pair_index(rules)
+
+        pairs = pair_index.available_pairs()
 
         # If no pairs are available, return None
         if not pairs:
@@ -114,28 +116,22 @@ class Minimax_Bot:
         best_score = float('inf')
 
         for pair in pairs:
-            # Create a copy of the grid to simulate the move
-            grid_copy = Grid(grid.n, grid.m, [row.copy() for row in grid.color], [row.copy() for row in grid.value])
-
-            # Mark the current pair's cells as forbidden (black)
-            grid_copy.color[pair[0][0]][pair[0][1]] = 4
-            grid_copy.color[pair[1][0]][pair[1][1]] = 4
+            # Simulate the move by blocking the current pair's cells
+            pair_index.block_pair(pair)
 
-            # Get remaining pairs after this move
-            remaining_pairs = grid_copy.all_pairs(rules)
+            # Find the opponent's best (minimum cost) move among the remaining pairs
+            opponent_best_pair = pair_index.min_cost_pair()
+            pair_index.unblock_pair(pair)
 
             # If no pairs remain after this move, skip it
-            if not remaining_pairs:
+            if opponent_best_pair is None:
                 continue
 
-            # Find the opponent's best (minimum cost) move
-            opponent_best_pair = min(remaining_pairs, key=lambda x: grid_copy.cost(x))
-
             # Calculate the score:
             # - Minimize our current move's cost
             # - Maximize the opponent's best move's cost
             current_move_cost = grid.cost(pair)
-            opponent_best_move_cost = grid_copy.cost(opponent_best_pair)
+            opponent_best_move_cost = grid.cost(opponent_best_pair)
 
             # Score combines our move cost and opponent's potential move cost
             # Lower score is better (penalizes both our move cost and opponent's potential low-cost move)
@@ -148,5 +144,3 @@ class Minimax_Bot:
 
         # If no suitable pair found, return the first pair or None
         return best_pair if best_pair is not None else pairs[0]
-
-    
\ No newline at end of file
@@ -0,0 +1,336 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from color_grid_game import *
+
+class PairIndex:
+    """
+    Live index of the pairs still available while a game is in progress.
+
+    Cells already played are blocked instead of being painted black on a copy of the grid.
+    Blocking or unblocking a cell updates the set of available pairs in O(degree) and is
+    undone exactly by the opposite operation, so bots can explore moves without copying
+    the grid or recomputing its pairs. Syncing the index with the k cells played so far
+    with `set_blocked` costs O(k) on top of the cells that change.
+
+    Under the new rules the white pairs stay implicit: they are counted from the numbers of
+    free white and free non-forbidden cells, and the cheapest one is computed from the free
+    cells sorted by value. It is kept while the cells blocked are not its own, and restored
+    when the cells are unblocked in the reverse order, as in a search.
+
+    Attributes
+    ----------
+    grid : Grid
+        The grid of the game.
+    rules : str
+        The rules of the game.
+    adjacency : Adjacency
+        The pairs allowed on the empty grid, shared with the grid's cache.
+    blocked : np.ndarray
+        Whether each cell is blocked, indexed by flat index i * m + j.
+    """
+
+    __slots__ = ("grid", "rules", "adjacency", "blocked", "_blocked", "_blocked_cells", "_blocked_ends",
+                 "_blocked_ends_array", "_available", "_by_cost", "_indptr", "_incident", "_free_white",
+                 "_free_allowed", "_white_best", "_white_undo")
+
+    # Cells of degree up to this bound are updated with a Python loop, larger ones with NumPy
+    small_degree = 32
+
+    def __init__(self, grid: 'Grid', rules: str = "original rules"):
+        """
+        Builds the index of a grid with no blocked cell.
+
+        Parameters
+        ----------
+        grid : Grid
+            The grid of the game.
+        rules : str, optional
+            The rules of the game. Default is "original rules".
+        """
+        self.grid = grid
+        self.rules = rules
+        self.adjacency = grid.adjacency(rules)
+        # Byte buffers give fast scalar access, NumPy views of them give vectorized access
+        self._blocked = bytearray(self.adjacency.n_cells)
+        self.blocked = np.frombuffer(self._blocked, dtype=bool)
+        # Flat indices of the blocked cells, so that `set_blocked` does not scan the grid
+        self._blocked_cells = set()
+        # Number of blocked cells of each pair, a pair is available when it has none
+        self._blocked_ends = bytearray(len(self.adjacency))
+        self._blocked_ends_array = np.frombuffer(self._blocked_ends, dtype=np.uint8)
+        self._available = len(self.adjacency)
+        # Pairs by increasing cost, ties in the order of Grid.all_pairs
+        self._by_cost = np.argsort(self.adjacency.cost, kind="stable")
+        self._indptr = memoryview(self.adjacency.indptr)
+        self._incident = memoryview(self.adjacency.edge_ids)
+        white = self.adjacency.white
+        self._free_white = white.white.size if white is not None else 0
+        self._free_allowed = white.allowed.size if white is not None else 0
+        # Cheapest white pair (cost, u, v), () when there is none, None when it is unknown,
+        # and the cached values to restore when the cells are unblocked in reverse order
+        self._white_best = None
+        self._white_undo = []
+
+    def __len__(self) -> int:
+        """
+        Returns the number of available pairs.
+
+        Time Complexity: O(1)
+        """
+        w, a = self._free_white, self._free_allowed
+        return self._available + w * (a - 1) - w * (w - 1) // 2
+
+    def _flat(self, cell: tuple[int, int]) -> int:
+        i, j = cell
+        if not self.grid._is_within_bounds(i, j):
+            raise IndexError("Cell index out of grid boundaries.")
+        return i * self.grid.m + j
+
+    def _pair(self, edge: int) -> tuple[tuple[int, int], tuple[int, int]]:
+        return (divmod(int(self.adjacency.u[edge]), self.grid.m), divmod(int(self.adjacency.v[edge]), self.grid.m))
+
+    def block_cell(self, cell: tuple[int, int]) -> None:
+        """
+        Blocks a cell, making every pair containing it unavailable.
+
+        Parameters
+        ----------
+        cell : tuple[int, int]
+            The cell (i, j).
+
+        Raises
+        ------
+        ValueError
+            If the cell is already blocked.
+
+        Time Complexity: O(degree)
+        """
+        c = self._flat(cell)
+        if self._blocked[c]:
+            raise ValueError("Cell is already blocked.")
+        self._blocked[c] = True
+        self._blocked_cells.add(c)
+        self._update_ends(c, 1)
+        if self.adjacency.white is not None:
+            self._update_white(c, -1)
+            self._white_undo.append((c, self._white_best))
+            # Blocking other cells only removes pairs more expensive than the cheapest one
+            if self._white_best and c in self._white_best[1:]:
+                self._white_best = None
+
+    def unblock_cell(self, cell: tuple[int, int]) -> None:
+        """
+        Unblocks a cell, making available again the pairs whose other cell is not blocked.
+
+        Parameters
+        ----------
+        cell : tuple[int, int]
+            The cell (i, j).
+
+        Raises
+        ------
+        ValueError
+            If the cell is not blocked.
+
+        Time Complexity: O(degree)
+        """
+        c = self._flat(cell)
+        if not self._blocked[c]:
+            raise ValueError("Cell is not blocked.")
+        self._blocked[c] = False
+        self._blocked_cells.discard(c)
+        self._update_ends(c, -1)
+        if self.adjacency.white is not None:
+            self._update_white(c, 1)
+            if self._white_undo and self._white_undo[-1][0] == c:
+                self._white_best = self._white_undo.pop()[1]
+            else:
+                self._white_undo.clear()
+                self._white_best = None
+
+    def _update_white(self, c: int, delta: int) -> None:
+        """
+        Adds delta to the numbers of free white and free non-forbidden cells, for the cell c.
+        """
+        white = self.adjacency.white
+        if white._is_allowed[c]:
+            self._free_allowed += delta
+            if white._is_white[c]:
+                self._free_white += delta
+
+    def _update_ends(self, c: int, delta: int) -> None:
+        """
+        Adds delta to the number of blocked cells of every pair containing the cell c.
+        """
+        start, end = self._indptr[c], self._indptr[c + 1]
+        # A pair changes availability when its count goes from 0 to 1 or from 1 to 0
+        changing = 0 if delta > 0 else 1
+        if end - start <= self.small_degree:
+            ends = self._blocked_ends
+            for k in range(start, end):
+                edge = self._incident[k]
+                if ends[edge] == changing:
+                    self._available -= delta
+                ends[edge] += delta
+        else:
+            edges = self.adjacency.edge_ids[start:end]
+            ends = self._blocked_ends_array[edges]
+            self._available -= delta * int(np.count_nonzero(ends == changing))
+            self._blocked_ends_array[edges] = ends + 1 if delta > 0 else ends - 1
+
+    def block_pair(self, pair: tuple[tuple[int, int], tuple[int, int]]) -> None:
+        """
+        Blocks both cells of a pair, as when the pair is played.
+        """
+        self.block_cell(pair[0])
+        self.block_cell(pair[1])
+
+    def unblock_pair(self, pair: tuple[tuple[int, int], tuple[int, int]]) -> None:
+        """
+        Unblocks both cells of a pair, undoing `block_pair`.
+        """
+        self.unblock_cell(pair[1])
+        self.unblock_cell(pair[0])
+
+    def set_blocked(self, cells) -> None:
+        """
+        Blocks exactly the given cells, unblocking every other cell.
+
+        The cells given are compared with the set of blocked cells kept by `block_cell` and
+        `unblock_cell`, and only the cells whose state changes are updated. Keeping the index
+        in sync with a list of played pairs thus costs O(k) for the k cells given plus
+        O(degree) per new move, instead of a scan of the grid.
+
+        Parameters
+        ----------
+        cells : iterable of tuple[int, int]
+            The cells (i, j) to block.
+
+        Time Complexity: O(k + b) for k cells given and b cells blocked, plus O(degree) per
+        cell that changes
+        """
+        target = set(self._flat(cell) for cell in cells)
+        current = self._blocked_cells
+        for c in current - target:
+            self.unblock_cell(divmod(c, self.grid.m))
+        for c in target - current:
+            self.block_cell(divmod(c, self.grid.m))
+
+    def is_available(self, pair: tuple[tuple[int, int], tuple[int, int]]) -> bool:
+        """
+        Checks whether a pair is allowed by the rules and has no blocked cell.
+
+        Time Complexity: O(log(degree))
+        """
+        u, v = self._flat(pair[0]), self._flat(pair[1])
+        if self.adjacency.white is not None and (u, v) in self.adjacency.white:
+            return not self._blocked[u] and not self._blocked[v]
+        neighbors = self.adjacency.neighbors(u)
+        k = int(np.searchsorted(neighbors, v))
+        if k == neighbors.size or neighbors[k] != v:
+            return False
+        return self._blocked_ends[int(self.adjacency.incident_edges(u)[k])] == 0
+
+    def available_pairs(self) -> list[tuple[tuple[int, int], tuple[int, int]]]:
+        """
+        Returns the available pairs, in the order of `Grid.all_pairs`.
+
+        Under the new rules the available white pairs are generated block by block and merged
+        with the explicit ones.
+
+        Time Complexity: O(E) where E is the number of pairs of the empty grid
+        """
+        edges = np.flatnonzero(self._blocked_ends_array == 0)
+        if self.adjacency.white is None:
+            return [self._pair(edge) for edge in edges.tolist()]
+        u, v = [self.adjacency.u[edges]], [self.adjacency.v[edges]]
+        for chunk_u, chunk_v, _ in self.adjacency.white.iter_chunks():
+            free = ~(self.blocked[chunk_u] | self.blocked[chunk_v])
+            u.append(chunk_u[free])
+            v.append(chunk_v[free])
+        u, v = np.concatenate(u), np.concatenate(v)
+        order = np.lexsort((v, u))
+        i1, j1 = np.divmod(u[order], self.grid.m)
+        i2, j2 = np.divmod(v[order], self.grid.m)
+        return list(zip(zip(i1.tolist(), j1.tolist()), zip(i2.tolist(), j2.tolist())))
+
+    def min_cost_pair(self) -> tuple[tuple[int, int], tuple[int, int]] | None:
+        """
+        Returns the available pair of minimum cost, or None if no pair is available.
+
+        Ties are broken in the order of `Grid.all_pairs`. The pairs are scanned by increasing
+        cost in blocks of doubling size, so the cost is proportional to the number of cheaper
+        pairs that are blocked. Under the new rules the cheapest white pair competes with
+        the cheapest explicit one.
+        """
+        edge = self._min_cost_edge()
+        best = () if edge is None else (int(self.adjacency.cost[edge]), int(self.adjacency.u[edge]),
+                                         int(self.adjacency.v[edge]))
+        if self.adjacency.white is not None:
+            if self._white_best is None:
+                self._white_best = self._min_cost_white_pair()
+            if self._white_best and (not best or self._white_best < best):
+                best = self._white_best
+        if not best:
+            return None
+        return divmod(best[1], self.grid.m), divmod(best[2], self.grid.m)
+
+    def _min_cost_edge(self) -> int | None:
+        """
+        Returns the available explicit edge of minimum cost, or None if there is none.
+        """
+        # The cheapest pairs are usually available: check them one by one first
+        ends = self._blocked_ends
+        for edge in self._by_cost[:64].tolist():
+            if ends[edge] == 0:
+                return edge
+        start, step = 64, 64
+        while start < self._by_cost.size:
+            block = self._by_cost[start:start + step]
+            free = np.flatnonzero(self._blocked_ends_array[block] == 0)
+            if free.size:
+                return int(block[free[0]])
+            start += step
+            step *= 2
+        return None
+
+    def _min_cost_white_pair(self) -> tuple:
+        """
+        Returns the available white pair of minimum cost as (cost, u, v) with u < v, ties being
+        broken by (u, v), or () if there is none.
+
+        Sorted by value, the closest partner of a white cell is next to it, so the minimum cost
+        is the smallest gap between consecutive free cells, one of them being white. Each
+        free white cell then offers, among its partners at that cost, the one of smallest index.
+
+        Time Complexity: O(N log(N)) for N non-forbidden cells
+        """
+        white = self.adjacency.white
+        cells = white._allowed_order[~self.blocked[white._allowed_order]]
+        values = white._value[cells]
+        is_white = white._is_white[cells]
+        touching = is_white[:-1] | is_white[1:]
+        if not touching.any():
+            return ()
+        cost = int(np.diff(values)[touching].min())
+        # Smallest and second smallest free cell of each value
+        levels, starts = np.unique(values, return_index=True)
+        ends = np.append(starts[1:], cells.size)
+        first = cells[starts]
+        second = np.where(starts + 1 < ends, cells[np.minimum(starts + 1, cells.size - 1)], -1)
+        whites = cells[is_white]
+        partner = np.full(whites.size, np.iinfo(np.int64).max)
+        for target in {-cost, cost}:
+            wanted = white._value[whites] + target
+            level = np.minimum(np.searchsorted(levels, wanted), levels.size - 1)
+            found = levels[level] == wanted
+            other = np.where(first[level] == whites, second[level], first[level])
+            found &= other >= 0
+            partner[found] = np.minimum(partner[found], other[found])
+        valid = partner < np.iinfo(np.int64).max
+        u = np.minimum(whites, partner)[valid]
+        v = np.maximum(whites, partner)[valid]
+        k = np.lexsort((v, u))[0]
+        return cost, int(u[k]), int(v[k])
@@ -0,0 +1,130 @@
+import sys
+import os
+import struct
+import zlib
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from color_grid_game import *
+
+# 3x5 bitmap font of the characters used in value labels, one string of 3 pixels per row
+glyph_rows = {
+    "0": ["###", "#.#", "#.#", "#.#", "###"],
+    "1": [".#.", "##.", ".#.", ".#.", "###"],
+    "2": ["###", "..#", "###", "#..", "###"],
+    "3": ["###", "..#", "###", "..#", "###"],
+    "4": ["#.#", "#.#", "###", "..#", "..#"],
+    "5": ["###", "#..", "###", "..#", "###"],
+    "6": ["###", "#..", "###", "#.#", "###"],
+    "7": ["###", "..#", "..#", "..#", "..#"],
+    "8": ["###", "#.#", "###", "#.#", "###"],
+    "9": ["###", "#.#", "###", "..#", "###"],
+    "-": ["...", "...", "###", "...", "..."],
+}
+
+# Glyph atlas: glyph_atlas[glyph_index[char]] is the (5, 3) boolean bitmap of char
+glyph_index = {char: k for k, char in enumerate(glyph_rows)}
+glyph_atlas = np.array([[[pixel == "#" for pixel in row] for row in rows] for rows in glyph_rows.values()])
+
+def label_bitmap(label: str, scale: int) -> np.ndarray | None:
+    """
+    Renders a label centered in a square cell of `scale` pixels, using the glyph atlas.
+
+    Glyphs are upscaled by the largest integer factor that fits the cell with a one
+    pixel margin.
+
+    Parameters
+    ----------
+    label : str
+        The label, made of digits and minus signs.
+    scale : int
+        The size of the cell in pixels.
+
+    Returns
+    -------
+    np.ndarray or None
+        A (scale, scale) boolean mask of the label pixels, or None if the label does not
+        fit in the cell.
+    """
+    glyphs = np.concatenate([np.pad(glyph_atlas[glyph_index[char]], ((0, 0), (0, 1))) for char in label], axis=1)[:, :-1]
+    factor = min((scale - 2) // glyphs.shape[0], (scale - 2) // glyphs.shape[1])
+    if factor < 1:
+        return None
+    glyphs = glyphs.repeat(factor, axis=0).repeat(factor, axis=1)
+    top = (scale - glyphs.shape[0]) // 2
+    left = (scale - glyphs.shape[1]) // 2
+    mask = np.zeros((scale, scale), dtype=bool)
+    mask[top:top + glyphs.shape[0], left:left + glyphs.shape[1]] = glyphs
+    return mask
+
+def blit_labels(rgb: np.ndarray, values: np.ndarray, scale: int) -> np.ndarray:
+    """
+    Draws the value of every cell on an RGB image of a grid, in place.
+
+    Cells sharing a value are drawn in one vectorized assignment, so the cost depends on
+    the number of distinct values and not on the number of cells. Labels are drawn in
+    black, or in white on dark cells. Values whose label does not fit in a cell are skipped.
+
+    Parameters
+    ----------
+    rgb : np.ndarray
+        The (n * scale, m * scale, 3) uint8 image of the grid.
+    values : np.ndarray
+        The (n, m) values of the cells.
+    scale : int
+        The size of a cell in pixels.
+
+    Returns
+    -------
+    np.ndarray
+        The image `rgb`.
+    """
+    n, m = values.shape
+    # View of the image as an (n, m) array of (scale, scale, 3) cells
+    cells = rgb.reshape(n, scale, m, scale, 3).swapaxes(1, 2)
+    background = cells[:, :, 0, 0, :].astype(np.int64)
+    dark = background @ np.array([299, 587, 114]) < 128 * 1000
+    for value in np.unique(values).tolist():
+        mask = label_bitmap(str(value), scale)
+        if mask is None:
+            continue
+        selected = values == value
+        for ink, on in ((0, ~dark), (255, dark)):
+            where = selected & on
+            if where.any():
+                block = cells[where]
+                block[:, mask] = ink
+                cells[where] = block
+    return rgb
+
+def write_png(file_name: str, rgb: np.ndarray, compression: int = 6) -> None:
+    """
+    Writes an RGB image to a PNG file, straight from its pixel buffer.
+
+    Parameters
+    ----------
+    file_name : str
+        Name of the file to write.
+    rgb : np.ndarray
+        The (height, width, 3) uint8 image.
+    compression : int, optional
+        The zlib compression level, from 0 (fastest) to 9 (smallest). Default is 6.
+
+    Raises
+    ------
+    ValueError
+        If `rgb` is not an (height, width, 3) image.
+    """
+    if rgb.ndim != 3 or rgb.shape[2] != 3:
+        raise ValueError("The image must be of shape (height, width, 3).")
+    height, width, _ = rgb.shape
+    # Every scanline starts with its filter type, 0 (none)
+    scanlines = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+    scanlines[:, 1:] = rgb.reshape(height, width * 3)
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+    with open(file_name, "wb") as file:
+        file.write(b"\x89PNG\r\n\x1a\n")
+        file.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        file.write(chunk(b"IDAT", zlib.compress(scanlines.tobytes(), compression)))
+        file.write(chunk(b"IEND", b""))
@@ -0,0 +1,233 @@
+import sys
+import os
+import struct
+import zlib
+import hashlib
+import tempfile
+from collections import OrderedDict
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from color_grid_game import *
+
+def default_cache_directory() -> str:
+    """
+    Returns the directory of the on-disk result cache: $COLOR_GRID_CACHE when set,
+    otherwise color_grid_game in the user cache directory.
+    """
+    if os.environ.get("COLOR_GRID_CACHE"):
+        return os.environ["COLOR_GRID_CACHE"]
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "color_grid_game")
+
+class ResultCache:
+    """
+    Cache of the pairs found by the solvers, keyed by grid fingerprint, rules and solver.
+
+    The cache has two layers: an in-memory LRU of the most recently used results, and an
+    optional on-disk store shared between processes and runs. Each stored result is one file
+    holding the zlib-compressed int32 flat cell indices of the pairs. When the files exceed
+    `max_bytes`, the least recently used ones are evicted.
+
+    Attributes
+    ----------
+    directory : str or None
+        Directory of the on-disk store, or None for an in-memory cache only.
+    max_entries : int
+        Maximum number of results kept in memory.
+    max_bytes : int
+        Maximum total size of the files of the on-disk store.
+    hits : int
+        Number of lookups answered by the cache.
+    misses : int
+        Number of lookups not answered by the cache.
+    """
+
+    # Header of the files: magic, version, number of pairs
+    header_format = "<4sHxxQ"
+    magic = b"CGRP"
+    version = 1
+    suffix = ".pairs"
+
+    def __init__(self, directory: str = None, max_entries: int = 32, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Creates a cache, and its directory when given.
+
+        Parameters
+        ----------
+        directory : str, optional
+            Directory of the on-disk store. Default is an in-memory cache only.
+        max_entries : int, optional
+            Maximum number of results kept in memory. Default is 32.
+        max_bytes : int, optional
+            Maximum total size of the files of the on-disk store. Default is 64 MiB.
+        """
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(grid: Grid, rules: str, solver_name: str) -> str:
+        """
+        Returns the key of a result, as a hexadecimal string usable as a file name.
+
+        Parameters
+        ----------
+        grid : Grid
+            The solved grid.
+        rules : str
+            The rules used by the solver.
+        solver_name : str
+            The name identifying the solver and its parameters.
+        """
+        digest = hashlib.blake2b(digest_size=16, person=b"color-grid-res")
+        for part in (grid.fingerprint(), rules, solver_name):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.suffix)
+
+    def _remember(self, key: str, pairs: np.ndarray) -> None:
+        """
+        Stores a result in the memory layer, evicting the least recently used ones.
+        """
+        self._memory[key] = pairs
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, grid: Grid, rules: str, solver_name: str) -> np.ndarray | None:
+        """
+        Looks up the pairs found by a solver on a grid.
+
+        Parameters
+        ----------
+        grid : Grid
+            The grid.
+        rules : str
+            The rules used by the solver.
+        solver_name : str
+            The name identifying the solver and its parameters.
+
+        Returns
+        -------
+        np.ndarray or None
+            The read-only (k, 2) int32 array of the flat cell indices of the pairs, or None
+            if the result is not cached.
+        """
+        key = self.key(grid, rules, solver_name)
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return self._memory[key]
+
+        pairs = self._read(key) if self.directory is not None else None
+        if pairs is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._remember(key, pairs)
+        return pairs
+
+    def put(self, grid: Grid, rules: str, solver_name: str, pairs: np.ndarray) -> None:
+        """
+        Stores the pairs found by a solver on a grid.
+
+        Parameters
+        ----------
+        grid : Grid
+            The grid.
+        rules : str
+            The rules used by the solver.
+        solver_name : str
+            The name identifying the solver and its parameters.
+        pairs : np.ndarray
+            The (k, 2) array of the flat cell indices of the pairs.
+        """
+        key = self.key(grid, rules, solver_name)
+        pairs = np.array(pairs, dtype=np.int32).reshape(-1, 2)
+        pairs.flags.writeable = False
+        self._remember(key, pairs)
+        if self.directory is not None:
+            self._write(key, pairs)
+            self._evict()
+
+    def _read(self, key: str) -> np.ndarray | None:
+        """
+        Reads a result from the on-disk store, or returns None if it is missing or unreadable.
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+            magic, version, n_pairs = struct.unpack_from(self.header_format, data)
+            if magic != self.magic or version != self.version:
+                return None
+            pairs = np.frombuffer(zlib.decompress(data[struct.calcsize(self.header_format):]), dtype="<i4")
+            pairs = pairs.astype(np.int32).reshape(n_pairs, 2)
+            # Marks the file as recently used for the eviction
+            os.utime(path)
+        except (OSError, ValueError, struct.error, zlib.error):
+            return None
+        pairs.flags.writeable = False
+        return pairs
+
+    def _write(self, key: str, pairs: np.ndarray) -> None:
+        """
+        Writes a result to the on-disk store, atomically so that concurrent readers never
+        see a partial file.
+        """
+        data = struct.pack(self.header_format, self.magic, self.version, pairs.shape[0])
+        data += zlib.compress(pairs.astype("<i4").tobytes())
+        fd, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(temporary, self._path(key))
+        except OSError:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+
+    def _evict(self) -> None:
+        """
+        Removes the least recently used files until the store fits in `max_bytes`.
+        """
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(self.suffix):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self) -> None:
+        """
+        Removes every result, in memory and on disk.
+        """
+        self._memory.clear()
+        if self.directory is not None:
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(self.suffix):
+                    os.remove(entry.path)
+
+    def __len__(self) -> int:
+        """
+        Returns the number of results kept in memory.
+        """
+        return len(self._memory)
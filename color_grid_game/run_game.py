@@ -65,7 +65,7 @@ class UIManager:
         Draws the line between the centers of two cells.
     draw_pair_frame(pair, color, cell_size, top_margin)
         Draws a frame around a pair of cells.
-    draw_score(solver, window_size, cell_size, player1_score, player2_score, game_mode, player_timers, current_player)
+    draw_score(score, window_size, cell_size, player1_score, player2_score, game_mode, player_timers, current_player)
         Draws the score on the screen.
     draw_turn_indicator(current_player, window_size, top_margin, game_mode)
         Draws the turn indicator on the screen.
@@ -480,14 +480,14 @@ class UIManager:
 
         pygame.draw.rect(self.screen, color, (frame_x, frame_y, frame_width, frame_height), 4)
 
-    def draw_score(self, solver, window_size, cell_size, player1_score, player2_score, game_mode, player_timers, current_player, player1_bot_type, player2_bot_type):
+    def draw_score(self, score, window_size, cell_size, player1_score, player2_score, game_mode, player_timers, current_player, player1_bot_type, player2_bot_type):
         """
         Draws the score on the screen.
 
         Parameters
         ----------
-        solver : Solver
-            The solver for the game.
+        score : int
+            The score of the one player game.
         window_size : tuple
             The size of the window (width, height).
         cell_size : int
@@ -514,7 +514,7 @@ class UIManager:
 
         if game_mode == 'one':
             time_str = format_time(player_timers[0])
-            text = font.render(f"Score: {solver.score()} | Timer: {time_str}", True, (0, 0, 0))
+            text = font.render(f"Score: {score} | Timer: {time_str}", True, (0, 0, 0))
             self.screen.blit(text, (5, window_size[1] - cell_size - 45))
         else:
             time1 = format_time(player_timers[0])
@@ -964,10 +964,15 @@ class SolverManager:
     ----------
     solver : Solver
         The solver for the game.
-    solver_general : Solver_Hungarian or Solver_Blossom
-        The general solver for the game.
+    solver_general : Solver
+        The fastest exact solver of the grid, chosen by `select_solver`, whose score is the
+        target of the one player game.
     general_score : int
-        The score of the general solver.
+        The score of the general solver, the optimal score of the grid.
+    pair_index : PairIndex
+        Live index of the pairs still available, whose blocked cells are the occupied cells.
+    score_tracker : ScoreTracker
+        Running score of the pairs of the one player game, kept in sync with solver.pairs.
     """
 
     def __init__(self, grid, rules):
@@ -982,15 +987,16 @@ class SolverManager:
             The rules to use for the solver.
         """
         self.solver = Solver(grid)
-        if rules == "original rules":
-            self.solver_general = Solver_Hungarian(grid, rules)
-        elif rules == "new rules":
-            self.solver_general = Solver_Blossom(grid, rules)
-        else:
+        if rules not in ["original rules", "new rules"]:
             raise ValueError("Unknown rules specified")
 
+        # The score to beat must be the optimum: a heuristic is never chosen here, and the
+        # run is not given a deadline, which would leave the pairs of an interrupted run
+        self.solver_general = select_solver(grid, rules, exact=True)(grid, rules)
         self.solver_general.run()
         self.general_score = self.solver_general.score()
+        self.pair_index = grid.pair_index(rules)
+        self.score_tracker = ScoreTracker(grid, rules)
 
     def can_pair(self, color1, color2):
         """
@@ -1016,6 +1022,30 @@ class SolverManager:
         }
         return color2 in allowed.get(color1, set()) and color1 in allowed.get(color2, set())
 
+    def add_player_pair(self, pair):
+        """
+        Adds a pair of the one player game, if it is valid.
+
+        The pair is added to the score tracker first, which validates it, and only then to
+        the pairs of the solver, so that both stay in sync when the pair is rejected.
+
+        Parameters
+        ----------
+        pair : tuple
+            The pair, in the format ((i1, j1), (i2, j2)).
+
+        Returns
+        -------
+        bool
+            Whether the pair was added.
+        """
+        try:
+            self.score_tracker.add_pair(pair)
+        except ValueError:
+            return False
+        self.solver.pairs.append(pair)
+        return True
+
     def pair_is_valid(self, pair, existing_pairs, grid, player_pairs, rules):
         """
         Checks if a pair is valid.
@@ -1043,13 +1073,8 @@ class SolverManager:
             return False
         if (i1, j1) == (i2, j2):
             return False
-        if (i1, j1) in [cell for pair in existing_pairs for cell in pair]:
-            return False
-        if (i2, j2) in [cell for pair in existing_pairs for cell in pair]:
-            return False
-        if (i1, j1) in [cell for pair in player_pairs[0] for cell in pair] or (i2, j2) in [cell for pair in player_pairs[0] for cell in pair]:
-            return False
-        if (i1, j1) in [cell for pair in player_pairs[1] for cell in pair] or (i2, j2) in [cell for pair in player_pairs[1] for cell in pair]:
+        occupied = self.occupied_cells(existing_pairs, player_pairs)
+        if (i1, j1) in occupied or (i2, j2) in occupied:
             return False
 
         if rules == "original rules":
@@ -1063,6 +1088,63 @@ class SolverManager:
 
         return False
 
+    def occupied_cells(self, existing_pairs, player_pairs):
+        """
+        Returns the cells used by the given pairs.
+
+        Parameters
+        ----------
+        existing_pairs : list
+            List of existing pairs.
+        player_pairs : list
+            List of player pairs.
+
+        Returns
+        -------
+        set
+            The occupied cells.
+        """
+        return set(cell for pairs in (existing_pairs, player_pairs[0], player_pairs[1])
+                   for pair in pairs for cell in pair)
+
+    def sync_pair_index(self, existing_pairs, player_pairs):
+        """
+        Blocks exactly the occupied cells in the pair index, updating only the cells played
+        or removed since the last call.
+
+        Parameters
+        ----------
+        existing_pairs : list
+            List of existing pairs.
+        player_pairs : list
+            List of player pairs.
+
+        Returns
+        -------
+        PairIndex
+            The synchronized pair index.
+        """
+        self.pair_index.set_blocked(self.occupied_cells(existing_pairs, player_pairs))
+        return self.pair_index
+
+    def has_valid_pair(self, existing_pairs, player_pairs):
+        """
+        Checks if at least one valid pair can still be played.
+
+        Parameters
+        ----------
+        existing_pairs : list
+            List of existing pairs.
+        player_pairs : list
+            List of player pairs.
+
+        Returns
+        -------
+        bool
+            Whether a valid pair remains.
+        """
+        return len(self.sync_pair_index(existing_pairs, player_pairs)) > 0
+
     def calculate_player_score(self, player_pairs, grid):
         """
         Calculates the score for a player.
@@ -1079,10 +1161,7 @@ class SolverManager:
         int
             The calculated score.
         """
-        paired_cells = set(cell for pair in player_pairs for cell in pair)
-        score = sum(abs(grid.value[i1][j1] - grid.value[i2][j2]) for (i1, j1), (i2, j2) in player_pairs)
-        score += sum(grid.value[i][j] for i in range(grid.n) for j in range(grid.m) if (i, j) not in paired_cells and grid.color[i][j] != 4)
-        return score
+        return ScoreTracker(grid, self.score_tracker.rules, player_pairs).score
 
     def calculate_two_player_score(self, player_pairs, grid):
         """
@@ -1551,12 +1630,13 @@ class Game:
             current_time = pygame.time.get_ticks()
             if not self.game_over:
                 if self.current_player == 1 and self.player1_bot_type is not None:
-                    grid_copy = self.create_grid_copy(grid, self.player_pairs)
                     if self.player1_bot_type == 'mcts':
+                        grid_copy = self.create_grid_copy(grid, self.player_pairs)
                         bot = MCTS_Bot(grid_copy, simulations_per_move=20, epsilon=0.1)
                         bot_pair = bot.mcts_move()
                     elif self.player1_bot_type == 'minimax':
-                        bot_pair = Minimax_Bot.move_to_play(grid_copy, self.selected_rules)
+                        pair_index = solver_manager.sync_pair_index([], self.player_pairs)
+                        bot_pair = Minimax_Bot.move_to_play(grid, self.selected_rules, pair_index)
                     if bot_pair is not None:
                         valid = solver_manager.pair_is_valid(bot_pair, [], grid, self.player_pairs, self.selected_rules)
                         if valid:
@@ -1579,12 +1659,13 @@ class Game:
                     else:
                         self.game_over = True
                 elif self.current_player == 2 and self.player2_bot_type is not None:
-                    grid_copy = self.create_grid_copy(grid, self.player_pairs)
                     if self.player2_bot_type == 'mcts':
+                        grid_copy = self.create_grid_copy(grid, self.player_pairs)
                         bot = MCTS_Bot(grid_copy, simulations_per_move=20, epsilon=0.1)
                         bot_pair = bot.mcts_move()
                     elif self.player2_bot_type == 'minimax':
-                        bot_pair = Minimax_Bot.move_to_play(grid_copy, self.selected_rules)
+                        pair_index = solver_manager.sync_pair_index([], self.player_pairs)
+                        bot_pair = Minimax_Bot.move_to_play(grid, self.selected_rules, pair_index)
                     if bot_pair is not None:
                         valid = solver_manager.pair_is_valid(bot_pair, [], grid, self.player_pairs, self.selected_rules)
                         if valid:
@@ -1643,7 +1724,12 @@ class Game:
                                 for pair in solver_manager.solver.pairs:
                                     if (i, j) in pair:
                                         solver_manager.solver.pairs.remove(pair)
+                                        solver_manager.score_tracker.remove_pair(pair)
                                         break
+                            elif (i, j) in self.selected_cells:
+                                # A cell cannot be paired with itself
+                                self.ui_manager.draw_error_message("Invalid pair!", window_size, self.player_mode, cell_size)
+                                self.selected_cells = []
                             elif (i, j) not in [cell for pair in solver_manager.solver.pairs for cell in pair]:
                                 self.selected_cells.append((i, j))
                                 if len(self.selected_cells) == 2:
@@ -1652,6 +1738,7 @@ class Game:
                                     color2 = grid.color[i2][j2]
                                     are_adjacent = (i2, j2) in grid.vois(i1, j1)
                                     valid_non_adjacent = (self.selected_rules == "new rules"
+                                                        and (i1, j1) != (i2, j2)
                                                         and (color1 == 0 or color2 == 0)
                                                         and color1 != 4 and color2 != 4)
                                     if are_adjacent or valid_non_adjacent:
@@ -1659,7 +1746,8 @@ class Game:
                                         color2 = grid.color[self.selected_cells[1][0]][self.selected_cells[1][1]]
                                         if solver_manager.can_pair(color1, color2):
                                             if self.player_mode == 'one':
-                                                solver_manager.solver.pairs.append((self.selected_cells[0], self.selected_cells[1]))
+                                                if not solver_manager.add_player_pair((self.selected_cells[0], self.selected_cells[1])):
+                                                    self.ui_manager.draw_error_message("Invalid pair!", window_size, self.player_mode, cell_size)
                                             elif self.player_mode in ['bot', 'deepblue']:
                                                 valid = solver_manager.pair_is_valid((self.selected_cells[0], self.selected_cells[1]), [], grid, self.player_pairs, self.selected_rules)
                                                 if valid:
@@ -1712,6 +1800,7 @@ class Game:
 
                             if self.pressed_button == 'reset':
                                 solver_manager.solver.pairs = []
+                                solver_manager.score_tracker.clear()
                                 self.selected_cells = []
                                 self.game_over = False
                                 self.show_solution = False
@@ -1729,6 +1818,7 @@ class Game:
                                 self.start_times = [pygame.time.get_ticks(), 0]
                             elif self.pressed_button == 'solution':
                                 solver_manager.solver.pairs = solver_manager.solver_general.pairs
+                                solver_manager.score_tracker.reset(solver_manager.solver.pairs)
                                 self.show_solution = True
                             elif self.pressed_button == 'menu':
                                 self.reset_game_state()
@@ -1746,7 +1836,7 @@ class Game:
                     top_margin = 50 if self.player_mode in ['two', 'bot', 'botvs', 'deepblue'] else 0
                     self.ui_manager.draw_grid(grid, solver_manager.solver, cell_size, self.selected_cells, self.player_mode, self.player_pairs, top_margin, new_rules)
                     self.ui_manager.draw_score(
-                        solver_manager.solver,
+                        solver_manager.score_tracker.score,
                         window_size,
                         cell_size,
                         self.player_scores[0],
@@ -1802,7 +1892,7 @@ class Game:
             self.screen.fill((220, 220, 220))
             self.ui_manager.draw_grid(grid, solver_manager.solver, cell_size, self.selected_cells, self.player_mode, self.player_pairs, top_margin, new_rules)
             self.ui_manager.draw_score(
-                solver_manager.solver,
+                solver_manager.score_tracker.score,
                 window_size,
                 cell_size,
                 self.player_scores[0],
@@ -1831,9 +1921,7 @@ class Game:
             self.ui_manager.draw_menu_button(window_size, self.pressed_button == 'menu')
             pygame.display.flip()
 
-            if not self.show_solution and not any(
-            solver_manager.pair_is_valid(pair, solver_manager.solver.pairs, grid, self.player_pairs, self.selected_rules)
-            for pair in grid.all_pairs(self.selected_rules)):
+            if not self.show_solution and not solver_manager.has_valid_pair(solver_manager.solver.pairs, self.player_pairs):
                 if not self.game_over:
                     current_time = pygame.time.get_ticks()
                     elapsed = (current_time - self.start_times[self.current_player - 1]) / 1000.0
@@ -1842,7 +1930,7 @@ class Game:
 
                     self.game_over = True
                     if self.player_mode == 'one':
-                        if solver_manager.solver.score() <= general_score:
+                        if solver_manager.score_tracker.score <= general_score:
                             self.ui_manager.win_sound.play()
                             self.ui_manager.draw_end_screen("You won!", (0, 200, 0), window_size)
                         else:
@@ -1852,6 +1940,7 @@ class Game:
                         self.player_time_used = [0.0, 0.0]
                         self.start_times = [pygame.time.get_ticks(), 0]
                         solver_manager.solver.pairs = []
+                        solver_manager.score_tracker.clear()
                         self.selected_cells = []
                         self.game_over = False
 
@@ -2072,5 +2161,7 @@ class Game:
         self.main()
 
 if __name__ == "__main__":
+    # Grids that were already opened are not solved again
+    Solver.result_cache = ResultCache(default_cache_directory())
     game = Game()
     game.main()
\ No newline at end of file
@@ -0,0 +1,231 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from color_grid_game import *
+
+class ScoreTracker:
+    """
+    Running score of a set of pairs being built on a grid, updated in constant time per move.
+
+    The score follows the definition of `Solver.score`: the sum of the costs of the pairs
+    plus the sum of the values of the unpaired cells that are not black. Adding or removing
+    a pair only changes the terms of its two cells, so it never rescans the grid.
+
+    The values and colors of the grid are read once, when the tracker is built or reset.
+
+    Attributes
+    ----------
+    grid : Grid
+        The grid of the game.
+    rules : str
+        The rules used to validate the pairs.
+    score : int
+        The current score.
+    unpaired_value : int
+        The sum of the values of the unpaired cells that are not black.
+    occupied : np.ndarray
+        Whether each cell is paired, indexed by flat index i * m + j.
+    """
+
+    __slots__ = ("grid", "rules", "score", "unpaired_value", "occupied", "_occupied", "_partner",
+                 "_value", "_color", "_n_pairs")
+
+    def __init__(self, grid: 'Grid', rules: str = "original rules", pairs=()):
+        """
+        Builds a tracker holding the given pairs.
+
+        Parameters
+        ----------
+        grid : Grid
+            The grid of the game.
+        rules : str, optional
+            The rules used to validate the pairs. Default is "original rules".
+        pairs : iterable, optional
+            The initial pairs, in the format ((i1, j1), (i2, j2)) or (c1, c2) with flat
+            cell indices. Default is no pair.
+
+        Raises
+        ------
+        ValueError
+            If the rules parameter is not recognized or if an initial pair is invalid.
+        """
+        if rules not in ["original rules", "new rules"]:
+            raise ValueError("Unrecognized rules parameter.")
+        self.grid = grid
+        self.rules = rules
+        self.reset(pairs)
+
+    def reset(self, pairs=()) -> None:
+        """
+        Removes every pair, reads the grid again and adds the given pairs.
+
+        Parameters
+        ----------
+        pairs : iterable, optional
+            The pairs to add. Default is no pair.
+
+        Raises
+        ------
+        ValueError
+            If a pair is invalid.
+
+        Time Complexity: O(n*m + k) for k pairs
+        """
+        self._value = self.grid.value.array.ravel().tolist()
+        self._color = self.grid.color.array.ravel().tolist()
+        # Byte buffer for fast scalar access, NumPy view of it for vectorized access
+        self._occupied = bytearray(len(self._value))
+        self.occupied = np.frombuffer(self._occupied, dtype=bool)
+        self._partner = {}
+        self._n_pairs = 0
+        free = self.grid.color.array != 4
+        self.unpaired_value = int(self.grid.value.array.sum(where=free, dtype=np.int64))
+        self.score = self.unpaired_value
+        for pair in pairs:
+            self.add_pair(pair)
+
+    def clear(self) -> None:
+        """
+        Removes every pair.
+
+        Time Complexity: O(n*m)
+        """
+        self.reset()
+
+    def __len__(self) -> int:
+        """
+        Returns the number of pairs.
+
+        Time Complexity: O(1)
+        """
+        return self._n_pairs
+
+    def _flat(self, cell) -> int:
+        """
+        Returns the flat index of a cell given as (i, j) or as a flat index.
+
+        Raises
+        ------
+        ValueError
+            If the cell is out of the grid boundaries.
+        """
+        if isinstance(cell, (int, np.integer)):
+            flat = int(cell)
+            if not 0 <= flat < len(self._value):
+                raise ValueError("Pair contains invalid cell indices.")
+            return flat
+        i, j = cell
+        if not self.grid._is_within_bounds(i, j):
+            raise ValueError("Pair contains invalid cell indices.")
+        return i * self.grid.m + j
+
+    def _is_allowed(self, c1: int, c2: int) -> bool:
+        """
+        Checks if two cells can be paired under the rules, ignoring occupancy.
+        """
+        color1, color2 = self._color[c1], self._color[c2]
+        if color1 == 4 or color2 == 4 or c1 == c2:
+            return False
+        if self.rules == "new rules" and (color1 == 0 or color2 == 0):
+            return True
+        (i1, j1), (i2, j2) = divmod(c1, self.grid.m), divmod(c2, self.grid.m)
+        return abs(i1 - i2) + abs(j1 - j2) == 1 and bool(Grid.color_compatibility[color1, color2])
+
+    def is_occupied(self, cell) -> bool:
+        """
+        Checks if a cell is paired.
+
+        Parameters
+        ----------
+        cell : tuple[int, int] or int
+            The cell, as (i, j) or as a flat index.
+
+        Time Complexity: O(1)
+        """
+        return bool(self._occupied[self._flat(cell)])
+
+    def add_pair(self, pair) -> int:
+        """
+        Adds a pair and updates the score.
+
+        Parameters
+        ----------
+        pair : tuple
+            The pair, in the format ((i1, j1), (i2, j2)) or (c1, c2) with flat cell indices.
+
+        Returns
+        -------
+        int
+            The new score.
+
+        Raises
+        ------
+        ValueError
+            If a cell is out of the grid or already paired, or if the pair is not allowed by the rules.
+
+        Time Complexity: O(1)
+        """
+        c1, c2 = self._flat(pair[0]), self._flat(pair[1])
+        if not self._is_allowed(c1, c2):
+            raise ValueError("Pair is not allowed by the rules.")
+        if self._occupied[c1] or self._occupied[c2]:
+            raise ValueError("Pair contains a cell that is already paired.")
+        value1, value2 = self._value[c1], self._value[c2]
+        self._occupied[c1] = self._occupied[c2] = 1
+        self._partner[c1], self._partner[c2] = c2, c1
+        self._n_pairs += 1
+        self.unpaired_value -= value1 + value2
+        self.score += abs(value1 - value2) - value1 - value2
+        return self.score
+
+    def remove_pair(self, pair) -> int:
+        """
+        Removes a pair and updates the score.
+
+        Parameters
+        ----------
+        pair : tuple
+            The pair, in either order, in the format ((i1, j1), (i2, j2)) or (c1, c2) with flat cell indices.
+
+        Returns
+        -------
+        int
+            The new score.
+
+        Raises
+        ------
+        ValueError
+            If the pair is not held by the tracker.
+
+        Time Complexity: O(1)
+        """
+        c1, c2 = self._flat(pair[0]), self._flat(pair[1])
+        if self._partner.get(c1) != c2:
+            raise ValueError("Pair is not in the tracker.")
+        value1, value2 = self._value[c1], self._value[c2]
+        self._occupied[c1] = self._occupied[c2] = 0
+        del self._partner[c1], self._partner[c2]
+        self._n_pairs -= 1
+        self.unpaired_value += value1 + value2
+        self.score -= abs(value1 - value2) - value1 - value2
+        return self.score
+
+    def partner(self, cell) -> tuple[int, int] | None:
+        """
+        Returns the cell paired with a cell.
+
+        Parameters
+        ----------
+        cell : tuple[int, int] or int
+            The cell, as (i, j) or as a flat index.
+
+        Returns
+        -------
+        tuple[int, int] or None
+            The (i, j) cell paired with `cell`, or None if `cell` is unpaired.
+
+        Time Complexity: O(1)
+        """
+        other = self._partner.get(self._flat(cell))
+        return None if other is None else divmod(other, self.grid.m)
@@ -1,9 +1,22 @@
 import sys
 import os
+from concurrent.futures import ProcessPoolExecutor
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from color_grid_game import *
 
+def _run_component(solver_class, grid, rules, deadline=None, cancel=None, initial_pairs=None):
+    """
+    Solves a component grid as a single problem, from the initial pairs of the component.
+
+    Returns the pairs as an array of flat cell indices, and whether the solver was interrupted.
+    """
+    solver = solver_class(grid, rules)
+    solver.decompose = False
+    # Only the result of the whole grid is cached
+    solver.result_cache = None
+    return solver.run_array(deadline, cancel, initial_pairs), solver.interrupted
+
 class Solver:
     """
     A solver class for finding optimal pairs in a grid.
@@ -14,10 +27,60 @@ class Solver:
         The grid to be solved.
     pairs : list[tuple[tuple[int, int], tuple[int, int]]]
         A list of pairs, each being a tuple ((i1, j1), (i2, j2)) representing paired cells.
+    pairs_array : np.ndarray
+        The same pairs as a (k, 2) int32 array of flat cell indices i * m + j. Solvers that
+        produce this form directly only build the list of tuples when `pairs` is accessed.
     rules : str
         The rules to apply for solving the grid. Default is "original rules".
+    deadline : float or None
+        The `time.monotonic()` time at which the current run must stop, or None.
+    cancel : threading.Event or None
+        The cancellation token of the current run, or None. Any object with an `is_set`
+        method can be used.
+    interrupted : bool
+        Whether the last run stopped early because of its deadline or cancellation token.
+        Its pairs are then the best found so far.
+    optimal : bool or None
+        Whether the pairs of the last run are proven to be optimal, None before any run.
+    initial_pairs : np.ndarray or None
+        The (k, 2) array of flat cell indices of the legal initial pairs of the current run,
+        from which the exact solvers start, or None.
+    decompose : bool
+        Whether `run` solves each connected component of the pairing graph separately.
+    workers : int or None
+        Maximum number of worker processes solving large components. None uses one process
+        per CPU and 1 solves every component in the current process.
+    parallel_threshold : int
+        Minimum number of cells of a component for it to be solved in a worker process.
+    supported_rules : tuple[str, ...]
+        The rules under which `solve` may select the solver.
+    exact_rules : tuple[str, ...]
+        The rules under which the solver finds a pairing of minimum score. Under the other
+        supported rules it is a heuristic.
+    quality : int
+        Rank of the solver among the heuristics, the higher the better.
+    cost_model : dict
+        Empirical model of the running time of `run` under each rule set, mapping feature
+        names of `cost_features` to their coefficient in seconds.
+    result_cache : ResultCache or None
+        Cache consulted by `run` before solving and filled after solving. None, the default,
+        disables caching: the applications enable it explicitly, e.g. with
+        `Solver.result_cache = ResultCache(directory)`.
+    cacheable : bool
+        Whether the pairs found depend only on the grid, the rules and `cache_name`, so
+        that they can be cached.
     """
 
+    decompose = False
+    workers = None
+    parallel_threshold = 2000
+    supported_rules = ()
+    exact_rules = ()
+    quality = 0
+    cost_model = {}
+    result_cache = None
+    cacheable = True
+
     def __init__(self, grid: Grid, rules="original rules"):
         """
         Initializes the solver with a grid.
@@ -36,15 +99,393 @@ class Solver:
         """
 
         self.grid = grid
-        self.pairs = []
+        self._pairs = []
+        self._pairs_array = None
         self.rules = rules
+        self.deadline = None
+        self.cancel = None
+        self.interrupted = False
+        self.optimal = None
+        self.initial_pairs = None
+
+    @property
+    def pairs(self) -> list[tuple[tuple[int, int], tuple[int, int]]]:
+        """
+        The pairs found, as a list of pairs of cells ((i1, j1), (i2, j2)).
+        """
+        if self._pairs is None:
+            # The list becomes the reference form, as it may be modified in place
+            self._pairs = self.grid.array_to_pairs(self._pairs_array)
+            self._pairs_array = None
+        return self._pairs
+
+    @pairs.setter
+    def pairs(self, pairs: list[tuple[tuple[int, int], tuple[int, int]]]) -> None:
+        self._pairs = pairs
+        self._pairs_array = None
+
+    @property
+    def pairs_array(self) -> np.ndarray:
+        """
+        The pairs found, as a (k, 2) int32 array of flat cell indices i * m + j.
+        """
+        if self._pairs is not None:
+            return self.grid.pairs_to_array(self._pairs)
+        return self._pairs_array
+
+    @pairs_array.setter
+    def pairs_array(self, pairs_array: np.ndarray) -> None:
+        self._pairs_array = self.grid.pairs_to_array(np.asarray(pairs_array))
+        self._pairs = None
+
+    def cache_name(self) -> str:
+        """
+        Returns the name identifying the solver and its parameters in the result cache.
+        """
+        return type(self).__name__
+
+    def should_stop(self) -> bool:
+        """
+        Checks if the current run must stop, because its deadline has passed or because it
+        was cancelled. Solvers call it between two steps, e.g. between two augmentations,
+        and then return the best pairs found so far.
+
+        Returns
+        -------
+        bool
+            Whether the run must stop. The run is then marked as interrupted.
+        """
+        if (self.cancel is not None and self.cancel.is_set()) or \
+                (self.deadline is not None and time.monotonic() >= self.deadline):
+            self.interrupted = True
+        return self.interrupted
+
+    def _solve(self, deadline: float = None, cancel=None, initial_pairs=None) -> None:
+        """
+        Runs the solver and stores the pairs found, in the form produced by the solver.
+
+        The result cache is looked up first. When `decompose` is set, the connected
+        components of the pairing graph are solved independently with `run_by_components`,
+        otherwise the whole grid is solved at once with `run_single`. Interrupted runs are
+        not cached. The initial pairs that are not legal in the grid, e.g. after a cell was
+        blackened, are dropped with `validate_pairs`.
+        """
+        self.deadline = deadline
+        self.cancel = cancel
+        self.interrupted = False
+        self.initial_pairs = None
+        if initial_pairs is not None:
+            validation = validate_pairs(self.grid, initial_pairs, self.rules)
+            legal = np.ones(len(validation.pairs), dtype=bool)
+            legal[validation.invalid] = False
+            self.initial_pairs = validation.pairs[legal].astype(np.int32)
+        cache = self.result_cache if self.cacheable else None
+        if cache is not None:
+            pairs = cache.get(self.grid, self.rules, self.cache_name())
+            if pairs is not None:
+                self.pairs_array = pairs
+                self.optimal = self.rules in self.exact_rules
+                return
+
+        pairs = self.run_by_components() if self.decompose else self.run_single()
+        if isinstance(pairs, np.ndarray):
+            self.pairs_array = pairs
+        elif pairs is not None:
+            self.pairs = pairs
+        self.optimal = not self.interrupted and self.rules in self.exact_rules
+        if cache is not None and not self.interrupted:
+            cache.put(self.grid, self.rules, self.cache_name(), self.pairs_array)
+
+    def run(self, deadline: float = None, cancel=None,
+            initial_pairs=None) -> list[tuple[tuple[int, int], tuple[int, int]]]:
+        """
+        Runs the solver and stores the pairs found in self.pairs.
+
+        Parameters
+        ----------
+        deadline : float, optional
+            The `time.monotonic()` time at which the solver stops and keeps the best pairs
+            found so far. Default is no deadline.
+        cancel : threading.Event, optional
+            A token that stops the solver in the same way once set, e.g. from another thread.
+            Default is no token.
+        initial_pairs : list of tuple or np.ndarray, optional
+            Pairs to start from, typically the result of a previous run on a slightly
+            different grid, as pairs of cells ((i1, j1), (i2, j2)) or as an array of flat
+            cell indices. The exact solvers reuse them, which makes re-solving after a small
+            edit much cheaper. Default is to start from scratch.
+
+        Returns
+        -------
+        list of tuple
+            A list of pairs of cells, each represented as a tuple of tuples.
+        """
+        self._solve(deadline, cancel, initial_pairs)
+        return self.pairs
+
+    def run_array(self, deadline: float = None, cancel=None, initial_pairs=None) -> np.ndarray:
+        """
+        Runs the solver and returns the pairs found as an array of flat cell indices.
+
+        No tuple is allocated for the solvers producing this form directly.
+
+        Parameters
+        ----------
+        deadline : float, optional
+            The `time.monotonic()` time at which the solver stops and keeps the best pairs
+            found so far. Default is no deadline.
+        cancel : threading.Event, optional
+            A token that stops the solver in the same way once set. Default is no token.
+        initial_pairs : list of tuple or np.ndarray, optional
+            Pairs to start from, see `run`. Default is to start from scratch.
+
+        Returns
+        -------
+        np.ndarray
+            The (k, 2) int32 array of the flat indices i * m + j of the cells of each pair.
+        """
+        self._solve(deadline, cancel, initial_pairs)
+        return self.pairs_array
+
+    def run_single(self) -> list[tuple[tuple[int, int], tuple[int, int]]] | np.ndarray:
+        """
+        Solves the whole grid as a single problem. Implemented by the subclasses.
+
+        Returns
+        -------
+        list of tuple or np.ndarray
+            The pairs found, either as a list of pairs of cells or as a (k, 2) array of flat
+            cell indices. None keeps the pairs stored by the method itself.
+        """
+        raise NotImplementedError
+
+    def component_grids(self):
+        """
+        Yields one grid per connected component of the pairing graph.
+
+        Each component grid is the bounding box of the component, in which every cell that
+        does not belong to the component is black. It is widened by one column or row when
+        needed so that its cells keep the parity of their coordinates, which orients the
+        bipartite solvers.
+
+        Yields
+        ------
+        tuple[int, int, int, Grid]
+            (i0, j0, size, grid), where (i0, j0) is the position of the top-left cell of the
+            component grid in the grid and size is the number of cells of the component.
+        """
+        n_components, labels = self.grid.adjacency(self.rules).components()
+        color = self.grid.color.array
+        value = self.grid.value.array
+        # Cells grouped by component, unpaired cells (label -1) first
+        cells = np.argsort(labels, kind="stable")[np.count_nonzero(labels < 0):]
+        sizes = np.bincount(labels[cells], minlength=n_components)
+
+        for component in np.split(cells, np.cumsum(sizes)[:-1]):
+            i, j = np.divmod(component, self.grid.m)
+            i0, j0 = int(i.min()), int(j.min())
+            if (i0 + j0) % 2 == 1:
+                if j0 > 0:
+                    j0 -= 1
+                else:
+                    i0 -= 1
+            shape = (int(i.max()) - i0 + 1, int(j.max()) - j0 + 1)
+            component_color = np.full(shape, 4, dtype=Grid.color_dtype)
+            component_color[i - i0, j - j0] = color[i, j]
+            component_value = np.zeros(shape, dtype=Grid.value_dtype)
+            component_value[i - i0, j - j0] = value[i, j]
+            yield i0, j0, component.size, Grid(*shape, component_color, component_value)
+
+    def run_by_components(self) -> list[tuple[tuple[int, int], tuple[int, int]]]:
+        """
+        Solves each connected component of the pairing graph independently.
+
+        Black cells and color incompatibilities split the grid into independent problems,
+        whose pairs can be computed separately and merged: solving many small problems is
+        much cheaper than one large one for the super-linear solvers. Components of at least
+        `parallel_threshold` cells are solved in a process pool of up to `workers` processes
+        when there are several of them, the others in the current process.
+
+        The deadline and the initial pairs of each component are passed to its solver. The
+        cancellation token is checked between the components solved in the current process.
+        When the run stops, the components that were not solved yet are left unpaired.
+
+        Returns
+        -------
+        np.ndarray
+            The (k, 2) array of the flat cell indices of the pairs of every component,
+            component after component.
+        """
+        n_components, _ = self.grid.adjacency(self.rules).components()
+        if n_components <= 1:
+            return self.run_single()
+        empty = (np.zeros((0, 2), dtype=np.int32), False)
+
+        components = list(self.component_grids())
+        initial = [None] * len(components)
+        if self.initial_pairs is not None:
+            # Initial pairs of each component, in flat indices of the component grid
+            _, labels = self.grid.adjacency(self.rules).components()
+            pair_labels = labels[self.initial_pairs[:, 0]]
+            for k, (i0, j0, _, grid) in enumerate(components):
+                i, j = np.divmod(self.initial_pairs[pair_labels == k].astype(np.int64), self.grid.m)
+                initial[k] = ((i - i0) * grid.m + j - j0).astype(np.int32)
+        large = [k for k, (_, _, size, _) in enumerate(components) if size >= self.parallel_threshold]
+        workers = os.cpu_count() if self.workers is None else self.workers
+        results = [None] * len(components)
+
+        if workers > 1 and len(large) > 1:
+            with ProcessPoolExecutor(min(workers, len(large))) as executor:
+                futures = {k: executor.submit(_run_component, type(self), components[k][3], self.rules, self.deadline,
+                                              None, initial[k])
+                           for k in large}
+                for k, (_, _, _, grid) in enumerate(components):
+                    if k not in futures:
+                        results[k] = empty if self.should_stop() else _run_component(type(self), grid, self.rules,
+                                                                                     self.deadline, self.cancel, initial[k])
+                for k, future in futures.items():
+                    results[k] = future.result()
+        else:
+            for k, (_, _, _, grid) in enumerate(components):
+                results[k] = empty if self.should_stop() else _run_component(type(self), grid, self.rules,
+                                                                             self.deadline, self.cancel, initial[k])
+        if any(interrupted for _, interrupted in results):
+            self.interrupted = True
+
+        # Move the flat indices of every component grid back to the grid
+        arrays = []
+        for (i0, j0, _, grid), (component_pairs, _) in zip(components, results):
+            i, j = np.divmod(component_pairs.astype(np.int64), grid.m)
+            arrays.append((i + i0) * self.grid.m + j + j0)
+        return np.concatenate(arrays).astype(np.int32)
+
+    @property
+    def lower_bound(self) -> int:
+        """
+        A lower bound on the score of every pairing of the grid, computed by `lower_bound`.
+        """
+        return lower_bound(self.grid, self.rules)
+
+    @property
+    def gap(self) -> int:
+        """
+        The difference between the score of the pairs found and the lower bound. A gap of 0
+        proves that the pairs are optimal.
+        """
+        return self.score() - self.lower_bound
+
+    def improve(self, max_length: int = 5, max_neighbors: int = 8) -> list[tuple[tuple[int, int], tuple[int, int]]]:
+        """
+        Improves the pairs found by local search with `improve_pairs`, and stores the result.
+
+        The search stops with the deadline and cancellation token of the last run.
+
+        Parameters
+        ----------
+        max_length : int, optional
+            Maximum number of pairs changed at once. Default is 5.
+        max_neighbors : int, optional
+            Number of most profitable pairs of each cell tried by the search. Default is 8.
+
+        Returns
+        -------
+        list of tuple
+            A list of pairs of cells, each represented as a tuple of tuples.
+        """
+        pairs = self._pairs_array if self._pairs is None else self._pairs
+        self.pairs_array = improve_pairs(self.grid, pairs, self.rules, max_length, self.should_stop, max_neighbors)
+        return self.pairs
+
+    def validate(self) -> PairValidation:
+        """
+        Checks that the pairs found form a legal solution of the grid.
+
+        Returns
+        -------
+        PairValidation
+            The offending pairs, by violated rule.
+        """
+        pairs = self._pairs_array if self._pairs is None else self._pairs
+        return validate_pairs(self.grid, pairs, self.rules)
+
+    @staticmethod
+    def cost_features(grid: Grid, rules="original rules") -> dict[str, float]:
+        """
+        Computes the size features of a grid used by the cost models of the solvers.
+
+        The features are read from the adjacency structure of the grid and from its
+        connected components, which are built once and shared with the solvers. The white
+        pairs of the new rules are counted without being materialized.
+
+        Parameters
+        ----------
+        grid : Grid
+            The grid to be solved.
+        rules : str, optional
+            The rules to apply for determining allowed pairs. Default is "original rules".
+
+        Returns
+        -------
+        dict[str, float]
+            "cells", "edges" and "components" count the cells of the grid, the allowed pairs
+            and the connected components of the pairing graph. "cells^2" and "cells*edges"
+            are the products of the counts over the whole grid, "component_cells^2" and
+            "component_cells*edges" their sums over the components.
+
+        Time Complexity: O(n*m + E) where E is the number of explicit edges
+        """
+        adjacency = grid.adjacency(rules)
+        n_components, labels = adjacency.components()
+        cells = np.bincount(labels[labels >= 0], minlength=n_components).astype(float)
+        edges = np.bincount(labels[adjacency.u], minlength=n_components).astype(float)
+        n_cells, n_edges = float(adjacency.n_cells), float(len(adjacency))
+        if adjacency.white is not None and len(adjacency.white):
+            # The implicit white pairs all belong to the single component of the grid
+            edges[0] += len(adjacency.white)
+            n_edges += len(adjacency.white)
+        return {
+            "cells": n_cells,
+            "edges": n_edges,
+            "components": float(n_components),
+            "cells^2": n_cells * n_cells,
+            "cells*edges": n_cells * n_edges,
+            "component_cells^2": float(cells @ cells),
+            "component_cells*edges": float(cells @ edges),
+        }
+
+    @classmethod
+    def estimate_time(cls, grid: Grid, rules="original rules", features: dict[str, float] = None) -> float:
+        """
+        Estimates the running time of `run` on a grid with the cost model of the solver.
+
+        Parameters
+        ----------
+        grid : Grid
+            The grid to be solved.
+        rules : str, optional
+            The rules to apply for solving the grid. Default is "original rules".
+        features : dict[str, float], optional
+            The `cost_features` of the grid, when already computed.
+
+        Returns
+        -------
+        float
+            The estimated time in seconds, or infinity when the solver does not support the rules.
+        """
+        if rules not in cls.supported_rules or rules not in cls.cost_model:
+            return float("inf")
+        if features is None:
+            features = cls.cost_features(grid, rules)
+        return sum(coefficient * features[name] for name, coefficient in cls.cost_model[rules].items())
 
     def score(self) -> int:
         """
-        Computes the score of the list of pairs in self.pairs.
+        Computes the score of the pairs in self.pairs, or in self.pairs_array when the solver produced an array.
 
         The score is calculated as the sum of the values of unpaired cells
         excluding black cells, plus the sum of the cost of each pair of cells.
+        The paired cells are scattered into a boolean mask of the grid, so that both sums
+        are computed with a few array operations.
 
         Returns
         -------
@@ -55,11 +496,63 @@ class Solver:
         ------
         ValueError
             If any cell in pairs is invalid.
+
+        Time Complexity: O(n*m + k) for k pairs
         """
-        # Add all paired cells to the set and calculate the cost of each pair
-        score = sum(self.grid.cost(pair) for pair in self.pairs)
-        taken = set([cell for pair in self.pairs for cell in pair])
-        score += sum(self.grid.value[i][j] for i in range(self.grid.n)
-                     for j in range(self.grid.m)
-                     if (i, j) not in taken and not self.grid.is_forbidden(i, j))
-        return score
+        pairs = self._pairs_array if self._pairs is None else self.grid.pairs_to_array(self._pairs)
+        unpaired = self.grid.color.array.ravel() != 4
+        unpaired[pairs.ravel()] = False
+        unpaired_sum = self.grid.value.array.ravel().sum(where=unpaired, dtype=np.int64)
+        return int(self.grid.cost(pairs).sum()) + int(unpaired_sum)
+
+    def score_batch(self, pairings) -> np.ndarray:
+        """
+        Computes the scores of many candidate pairings of the grid at once.
+
+        The pair costs of every pairing are summed with one segmented reduction, and the
+        paired cells are scattered into one boolean mask row per pairing, processed in
+        chunks of pairings so that the masks stay small.
+
+        Parameters
+        ----------
+        pairings : sequence
+            The pairings to score, each being a list of pairs of cells ((i1, j1), (i2, j2))
+            or a (k, 2) array of flat cell indices. A (b, k, 2) array holds b pairings of k pairs.
+
+        Returns
+        -------
+        np.ndarray
+            The int64 score of each pairing, equal to the `score` of a solver holding it.
+
+        Raises
+        ------
+        ValueError
+            If any cell in the pairings is invalid.
+
+        Time Complexity: O(b*n*m + K) for b pairings of K pairs in total
+        """
+        arrays = [self.grid.pairs_to_array(pairs) for pairs in pairings]
+        n_pairings = len(arrays)
+        sizes = np.array([array.shape[0] for array in arrays], dtype=np.int64)
+        ends = np.cumsum(sizes)
+        starts = ends - sizes
+        pairs = np.concatenate(arrays) if arrays else np.zeros((0, 2), dtype=np.int32)
+
+        # Pairs are grouped by pairing, so the costs are summed with a segmented reduction
+        costs = self.grid.cost(pairs)
+        scores = np.zeros(n_pairings, dtype=np.int64)
+        nonempty = sizes > 0
+        if costs.size:
+            scores[nonempty] = np.add.reduceat(costs, starts[nonempty])
+
+        # Values of the unpaired cells, black cells being never counted
+        n_cells = self.grid.n * self.grid.m
+        cell_value = np.where(self.grid.color.array.ravel() != 4, self.grid.value.array.ravel(), 0).astype(np.int64)
+        chunk = max(1, (1 << 22) // n_cells)
+        for first in range(0, n_pairings, chunk):
+            last = min(first + chunk, n_pairings)
+            taken = np.zeros((last - first, n_cells), dtype=bool)
+            rows = np.repeat(np.arange(last - first), sizes[first:last] * 2)
+            taken[rows, pairs[starts[first]:ends[last - 1]].ravel()] = True
+            scores[first:last] += np.where(taken, 0, cell_value).sum(axis=1)
+        return scores
@@ -5,8 +5,9 @@ Solvers used in the color_grid_game package
 from .solver_empty import Solver_Empty
 from .solver_greedy import Solver_Greedy
 from .solver_greedy_upgraded import Solver_Greedy_Upgraded
+from .solver_greedy_sorted import Solver_Greedy_Sorted
 from .solver_ford_fulkerson import Solver_Ford_Fulkerson
 from .solver_hungarian import Solver_Hungarian
 from .solver_blossom import Solver_Blossom
-
+from .registry import solver_registry, register_solver, select_solver, solve, calibrate_cost_models
 
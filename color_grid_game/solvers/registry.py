@@ -0,0 +1,228 @@
+import sys
+import os
+import time
+from scipy.optimize import nnls
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from color_grid_game import *
+from .solver_greedy import Solver_Greedy
+from .solver_greedy_upgraded import Solver_Greedy_Upgraded
+from .solver_greedy_sorted import Solver_Greedy_Sorted
+from .solver_ford_fulkerson import Solver_Ford_Fulkerson
+from .solver_hungarian import Solver_Hungarian
+from .solver_blossom import Solver_Blossom
+
+# Solvers among which `solve` chooses, in order of preference between equal estimates
+solver_registry = [Solver_Greedy, Solver_Greedy_Sorted, Solver_Ford_Fulkerson, Solver_Greedy_Upgraded, Solver_Hungarian, Solver_Blossom]
+
+def register_solver(solver_class: type) -> type:
+    """
+    Adds a solver to the registry used by `solve`. Can be used as a class decorator.
+
+    Parameters
+    ----------
+    solver_class : type
+        A subclass of Solver declaring its `supported_rules`, `exact_rules` and `cost_model`.
+
+    Returns
+    -------
+    type
+        The solver class.
+
+    Raises
+    ------
+    ValueError
+        If the solver has no cost model for one of its supported rules.
+    """
+    if any(rules not in solver_class.cost_model for rules in solver_class.supported_rules):
+        raise ValueError(f"{solver_class.__name__} has no cost model for one of its supported rules.")
+    if solver_class not in solver_registry:
+        solver_registry.append(solver_class)
+    return solver_class
+
+def _estimate_times(grid: Grid, rules: str) -> dict:
+    """
+    Estimates the running time of every registered solver supporting the rules, in registry order.
+
+    Raises
+    ------
+    ValueError
+        If the rules parameter is not recognized or if no registered solver supports the rules.
+    """
+    if rules not in ["original rules", "new rules"]:
+        raise ValueError("Unrecognized rules parameter.")
+    candidates = [solver_class for solver_class in solver_registry if rules in solver_class.supported_rules]
+    if not candidates:
+        raise ValueError("No registered solver supports the rules.")
+    features = Solver.cost_features(grid, rules)
+    return {solver_class: solver_class.estimate_time(grid, rules, features) for solver_class in candidates}
+
+def select_solver(grid: Grid, rules="original rules", budget: float = None, exact: bool = False) -> type:
+    """
+    Chooses the solver to run on a grid from the estimates of the cost models.
+
+    The fastest exact solver is chosen when no budget is given or when one fits in the
+    budget. Otherwise the best heuristic that fits in the budget is chosen, and when none
+    fits, the fastest solver. With `exact`, the fastest exact solver is chosen whatever
+    the budget, for the callers that need the optimal score.
+
+    Parameters
+    ----------
+    grid : Grid
+        The grid to be solved.
+    rules : str, optional
+        The rules to apply for solving the grid. Default is "original rules".
+    budget : float, optional
+        The time available for solving, in seconds. Default is no limit.
+    exact : bool, optional
+        Whether only the exact solvers may be chosen. Default is False.
+
+    Returns
+    -------
+    type
+        The chosen solver class.
+
+    Raises
+    ------
+    ValueError
+        If the rules parameter is not recognized, if no registered solver supports the rules,
+        or if `exact` is set and no registered solver is exact under the rules.
+    """
+    estimates = _estimate_times(grid, rules)
+    candidates = list(estimates)
+    exact_solvers = [solver_class for solver_class in candidates if rules in solver_class.exact_rules]
+    if exact and not exact_solvers:
+        raise ValueError("No registered solver is exact under the rules.")
+    if exact_solvers:
+        fastest_exact = min(exact_solvers, key=estimates.get)
+        if exact or budget is None or estimates[fastest_exact] <= budget:
+            return fastest_exact
+    heuristics = [solver_class for solver_class in candidates
+                  if rules not in solver_class.exact_rules and (budget is None or estimates[solver_class] <= budget)]
+    if heuristics:
+        return max(heuristics, key=lambda solver_class: solver_class.quality)
+    return min(candidates, key=estimates.get)
+
+def solve(grid: Grid, rules="original rules", budget: float = None, validate: bool = True,
+          tolerance: float = None, deadline: float = None, cancel=None, improve: bool = True) -> Solver:
+    """
+    Solves a grid with the fastest adequate registered solver.
+
+    With a tolerance, the fastest heuristic is run first and its pairs are kept when their
+    `gap` to the lower bound of the grid is within the tolerance, which proves them close
+    enough to optimal without running a slower solver.
+
+    With a deadline, the time left is used as the budget when none is given, and the
+    solvers stop at the deadline with the best pairs found so far, see `Solver.run`.
+
+    The pairs of the heuristic solvers are improved by local search with `Solver.improve`,
+    which closes most of their gap to the optimum for a fraction of the cost of an exact
+    solver.
+
+    Parameters
+    ----------
+    grid : Grid
+        The grid to be solved.
+    rules : str, optional
+        The rules to apply for solving the grid. Default is "original rules".
+    budget : float, optional
+        The time available for solving, in seconds. Default is no limit, which always
+        selects an exact solver.
+    validate : bool, optional
+        Whether the pairs found are checked with `validate_pairs`. Default is True.
+    tolerance : float, optional
+        Largest accepted gap of the heuristic pairs, relative to their score. Default is
+        to run the selected solver only.
+    deadline : float, optional
+        The `time.monotonic()` time at which solving stops. Default is no deadline.
+    cancel : threading.Event, optional
+        A token that stops solving once set. Default is no token.
+    improve : bool, optional
+        Whether the pairs of a heuristic solver are improved by local search. Default is True.
+
+    Returns
+    -------
+    Solver
+        The solver that was run, holding the pairs found.
+
+    Raises
+    ------
+    ValueError
+        If the rules parameter is not recognized, if no registered solver supports the rules
+        or if the solver returned invalid pairs.
+    """
+    heuristic = None
+    if tolerance is not None:
+        estimates = _estimate_times(grid, rules)
+        heuristics = [solver_class for solver_class in estimates if rules not in solver_class.exact_rules]
+        if heuristics:
+            heuristic = min(heuristics, key=estimates.get)(grid, rules)
+            heuristic.run(deadline, cancel)
+            if improve:
+                heuristic.improve()
+    if heuristic is not None and heuristic.gap <= tolerance * heuristic.score():
+        solver = heuristic
+    else:
+        if budget is None and deadline is not None:
+            budget = max(0.0, deadline - time.monotonic())
+        solver = select_solver(grid, rules, budget)(grid, rules)
+        solver.run(deadline, cancel)
+        if improve and rules not in solver.exact_rules:
+            solver.improve()
+        # An interrupted solver may do worse than the heuristic already run
+        if heuristic is not None and solver.interrupted and heuristic.score() < solver.score():
+            solver = heuristic
+    if validate:
+        solver.validate().check()
+    return solver
+
+def calibrate_cost_models(grids, rules="original rules", solvers=None, max_time: float = None) -> dict:
+    """
+    Fits the cost models of solvers to their running times on sample grids.
+
+    Every solver is timed on every grid, then the coefficients of the features already in
+    its cost model are refitted by non-negative least squares on the relative errors, and
+    stored in the cost model of the solver class.
+
+    Parameters
+    ----------
+    grids : iterable of Grid
+        The sample grids, ideally of varied sizes and structures.
+    rules : str, optional
+        The rules whose cost models are fitted. Default is "original rules".
+    solvers : iterable of type, optional
+        The solver classes to calibrate. Default is every registered solver supporting the rules.
+    max_time : float, optional
+        Grids on which the current model of a solver estimates more than `max_time` seconds
+        are skipped for that solver. Default is no limit.
+
+    Returns
+    -------
+    dict
+        The fitted cost model of each solver class.
+    """
+    grids = list(grids)
+    if solvers is None:
+        solvers = [solver_class for solver_class in solver_registry if rules in solver_class.supported_rules]
+    all_features = [Solver.cost_features(grid, rules) for grid in grids]
+
+    models = {}
+    for solver_class in solvers:
+        names = list(solver_class.cost_model[rules])
+        rows, times = [], []
+        for grid, features in zip(grids, all_features):
+            if max_time is not None and solver_class.estimate_time(grid, rules, features) > max_time:
+                continue
+            solver = solver_class(grid, rules)
+            solver.result_cache = None
+            start = time.perf_counter()
+            solver.run()
+            times.append(time.perf_counter() - start)
+            rows.append([features[name] for name in names])
+        if not rows:
+            continue
+        times = np.array(times)
+        coefficients, _ = nnls(np.array(rows) / times[:, None], np.ones(times.size))
+        models[solver_class] = dict(zip(names, coefficients.tolist()))
+        solver_class.cost_model = {**solver_class.cost_model, rules: models[solver_class]}
+    return models
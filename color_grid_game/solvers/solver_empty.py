@@ -10,7 +10,10 @@ class Solver_Empty(Solver):
     A subclass of Solver that does not implement any solving logic.
     """
 
-    def run(self):
+    # The pairs are set by the caller, not found from the grid
+    cacheable = False
+
+    def run_single(self):
         """
         Placeholder method for running the solver. Does nothing.
 
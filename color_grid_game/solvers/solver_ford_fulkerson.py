@@ -8,23 +8,63 @@ from color_grid_game import *
 class Solver_Ford_Fulkerson(Solver):
     """
     A subclass of Solver that implements a bipartite matching algorithm to find pairs.
+
+    Attributes
+    ----------
+    engine : str
+        The maximum matching algorithm: "hopcroft_karp", the default, or "edmonds_karp".
     """
 
-    def run(self) -> list[tuple[tuple[int, int], tuple[int, int]]]:
+    # Connected components of the pairing graph are solved independently by `run`
+    decompose = True
+
+    # Capabilities and empirical cost model used by `solve`: the bipartite matching maximizes
+    # the number of pairs and ignores their costs
+    supported_rules = ("original rules",)
+    cost_model = {
+        "original rules": {"cells": 5.11e-6, "components": 1.31e-4, "component_cells*edges": 1.67e-10},
+    }
+
+    engine = "hopcroft_karp"
+
+    def cache_name(self) -> str:
+        """
+        Returns the name identifying the solver and its engine in the result cache.
         """
-        Runs the bipartite matching algorithm to find pairs of cells.
+        if self.engine == "hopcroft_karp":
+            return type(self).__name__
+        return f"{type(self).__name__}(engine={self.engine})"
+
+    def run_single(self) -> list[tuple[tuple[int, int], tuple[int, int]]]:
+        """
+        Runs the bipartite matching algorithm to find pairs of cells, starting from the
+        initial pairs of the run as initial flow.
+
+        The "hopcroft_karp" engine works on the flat adjacency structure of the grid, even
+        cells on one side and odd cells on the other. The "edmonds_karp" engine builds a flow
+        network of cells.
 
         Returns
         -------
-        list of tuple
-            A list of pairs of cells, each represented as a tuple of tuples.
+        list of tuple or np.ndarray
+            A list of pairs of cells, each represented as a tuple of tuples, or with the
+            "hopcroft_karp" engine a (k, 2) array of flat cell indices, even cells first.
+
+        Raises
+        ------
+        ValueError
+            If the engine is not recognized.
         """
+        if self.engine == "hopcroft_karp":
+            return self.run_hopcroft_karp()
+        if self.engine != "edmonds_karp":
+            raise ValueError(f"Unrecognized engine {self.engine!r}.")
         graph = defaultdict(list)
         even_cells = set()
         odd_cells = set()
 
         # Add edges between cells (direction: from even to odd)
-        for cell1, cell2 in self.grid.all_pairs(self.rules):
+        for cell1, cell2 in self.grid.adjacency(self.rules).pairs():
             even, odd = (cell1, cell2) if sum(cell1) % 2 == 0 else (cell2, cell1)
             even_cells.add(even)
             odd_cells.add(odd)
@@ -41,10 +81,169 @@ class Solver_Ford_Fulkerson(Solver):
         # Sets of cells for later extraction of the matching
         self.even_cells = even_cells
         self.odd_cells = odd_cells
+        initial_matching = None
+        if self.initial_pairs is not None:
+            i, j = np.divmod(self.initial_pairs.astype(np.int64), self.grid.m)
+            initial_matching = [(even, odd) if sum(even) % 2 == 0 else (odd, even)
+                                for even, odd in zip(zip(i[:, 0].tolist(), j[:, 0].tolist()),
+                                                     zip(i[:, 1].tolist(), j[:, 1].tolist()))]
         # Get optimal pairs
-        self.pairs = self.edmonds_karp(graph, even_cells, odd_cells)
+        self.pairs = self.edmonds_karp(graph, even_cells, odd_cells, self.should_stop, initial_matching)
         return self.pairs
 
+    def run_hopcroft_karp(self) -> np.ndarray:
+        """
+        Computes a maximum matching between the even and odd cells with `hopcroft_karp`,
+        starting from the initial pairs of the run.
+
+        Returns
+        -------
+        np.ndarray
+            A (k, 2) array of pairs of flat cell indices, even cells first.
+        """
+        adjacency = self.grid.adjacency(self.rules)
+        i, j = np.divmod(np.arange(adjacency.n_cells), self.grid.m)
+        even_cells = np.flatnonzero(((i + j) % 2 == 0) & (adjacency.degrees() > 0))
+        mate = [-1] * adjacency.n_cells
+        if self.initial_pairs is not None:
+            for a, b in self.initial_pairs.tolist():
+                mate[a], mate[b] = b, a
+        mate = np.array(self.hopcroft_karp(adjacency.indptr.tolist(), adjacency.indices.tolist(),
+                                           even_cells.tolist(), self.should_stop, mate))
+        matched = even_cells[mate[even_cells] >= 0]
+        return np.stack((matched, mate[matched]), axis=1).astype(np.int32)
+
+    @staticmethod
+    def hopcroft_karp(indptr: list, indices: list, left: list, should_stop: Callable = None,
+                      mate: list = None) -> list:
+        """
+        Computes a maximum matching of a bipartite graph with the Hopcroft-Karp algorithm.
+
+        Each phase runs a BFS from the free left vertices that layers the graph by the length
+        of the shortest augmenting paths, then a DFS that augments along a maximal set of
+        vertex-disjoint shortest paths. There are O(sqrt(V)) phases, each in O(E). The DFS
+        is iterative, so that long augmenting paths do not hit the recursion limit, and the
+        matching is seeded greedily. After the seeding, a reverse search from the free right
+        vertices drops the free left vertices that no augmenting path starts from: they stay
+        free for good, and exploring them again at every phase would dominate the running
+        time on large grids, where many cells cannot be paired.
+
+        Parameters
+        ----------
+        indptr : list of int
+            The CSR row pointers of the neighbors of each vertex, vertices being integers.
+        indices : list of int
+            The CSR neighbors of each vertex. The graph is undirected: each edge is listed at
+            both of its vertices.
+        left : list of int
+            The vertices of the left side.
+        should_stop : Callable, optional
+            A function without arguments called between two phases, which stops the search
+            and returns the current matching when it returns True. Default is None.
+        mate : list of int, optional
+            An initial matching, as the vertex matched with each vertex or -1. It is updated
+            in place. Default is an empty matching.
+
+        Returns
+        -------
+        list of int
+            The vertex matched with each vertex, or -1 for the unmatched vertices.
+
+        Time Complexity: O(E * sqrt(V))
+        """
+        if mate is None:
+            mate = [-1] * (len(indptr) - 1)
+        # Greedy initial matching
+        for u in left:
+            if mate[u] == -1:
+                for entry in range(indptr[u], indptr[u + 1]):
+                    v = indices[entry]
+                    if mate[v] == -1:
+                        mate[u], mate[v] = v, u
+                        break
+
+        right = sorted({v for u in left for v in indices[indptr[u]:indptr[u + 1]]})
+
+        def augmentable(roots):
+            """
+            Returns the roots from which an augmenting path starts, found by a reverse search
+            from the free right vertices. By Berge's lemma, the other roots stay free for good.
+            """
+            reached = set()
+            queue = [v for v in right if mate[v] == -1]
+            seen = set(queue)
+            for v in queue:
+                for entry in range(indptr[v], indptr[v + 1]):
+                    u = indices[entry]
+                    if u in reached:
+                        continue
+                    reached.add(u)
+                    w = mate[u]
+                    if w != -1 and w not in seen:
+                        seen.add(w)
+                        queue.append(w)
+            return [u for u in roots if u in reached]
+
+        unreachable = len(indptr)
+        dist = [unreachable] * (len(indptr) - 1)
+        roots = augmentable([u for u in left if mate[u] == -1])
+        queue = []
+        while roots and not (should_stop is not None and should_stop()):
+            # BFS from the free left vertices, up to the first layer reaching a free vertex
+            for u in queue:
+                dist[u] = unreachable
+            queue = roots
+            for u in queue:
+                dist[u] = 0
+            shortest = unreachable
+            for u in queue:
+                if dist[u] + 1 >= shortest:
+                    continue
+                for entry in range(indptr[u], indptr[u + 1]):
+                    w = mate[indices[entry]]
+                    if w == -1:
+                        shortest = dist[u] + 1
+                    elif dist[w] == unreachable:
+                        dist[w] = dist[u] + 1
+                        queue.append(w)
+            if shortest == unreachable:
+                break
+
+            # DFS along the layers, each edge being tried once per phase
+            position = indptr[:]
+            for root in roots:
+                if dist[root] != 0:
+                    continue
+                stack, via = [root], []
+                while stack:
+                    u = stack[-1]
+                    end = indptr[u + 1]
+                    while position[u] < end:
+                        v = indices[position[u]]
+                        position[u] += 1
+                        w = mate[v]
+                        if w == -1:
+                            if dist[u] + 1 == shortest:
+                                # Augment along the path and retire its vertices for the phase
+                                via.append(v)
+                                for a, b in zip(stack, via):
+                                    mate[a], mate[b] = b, a
+                                    dist[a] = unreachable
+                                stack = []
+                                break
+                        elif dist[w] == dist[u] + 1:
+                            stack.append(w)
+                            via.append(v)
+                            break
+                    else:
+                        # Dead end: the vertex cannot reach a free vertex in this phase
+                        dist[u] = unreachable
+                        stack.pop()
+                        if via:
+                            via.pop()
+            roots = [u for u in roots if mate[u] == -1]
+        return mate
+
     @staticmethod
     def bfs(graph: dict, s: str, t: str) -> dict:
         """
@@ -79,7 +278,9 @@ class Solver_Ford_Fulkerson(Solver):
         return {}
 
     @classmethod
-    def edmonds_karp(cls, graph: dict, even_cells: set, odd_cells: set) -> list[tuple[tuple[int, int], tuple[int, int]]]:
+    def edmonds_karp(cls, graph: dict, even_cells: set, odd_cells: set,
+                     should_stop: Callable = None,
+                     initial_matching: list = None) -> list[tuple[tuple[int, int], tuple[int, int]]]:
         """
         Computes the maximum flow (maximum matching) in the bipartite graph using the Edmonds-Karp method.
 
@@ -91,6 +292,12 @@ class Solver_Ford_Fulkerson(Solver):
             Set of cells with even sum of coordinates.
         odd_cells : set
             Set of cells with odd sum of coordinates.
+        should_stop : Callable, optional
+            A function without arguments called between two augmentations, which stops the
+            search and returns the current matching when it returns True. Default is None.
+        initial_matching : list of tuple, optional
+            Pairs (even, odd) of the graph, no cell being used twice, which form the initial
+            flow: only the augmenting paths missing from it are searched. Default is None.
 
         Returns
         -------
@@ -106,9 +313,23 @@ class Solver_Ford_Fulkerson(Solver):
         for u in graph:
             residual_graph[u] = graph[u].copy()  # .copy() is more explicit than [:]
 
+        if initial_matching:
+            # Saturate the paths s -> even -> odd -> t of the initial pairs
+            matched_even = set()
+            for even, odd in initial_matching:
+                matched_even.add(even)
+                residual_graph[even].remove(odd)
+                residual_graph[even].append("s")
+                residual_graph[odd].remove("t")
+                residual_graph[odd].append(even)
+                residual_graph["t"].append(odd)
+            residual_graph["s"] = [even for even in residual_graph["s"] if even not in matched_even]
+
         parents = cls.bfs(residual_graph, "s", "t")
         # Find augmenting paths and update flow
         while parents:
+            if should_stop is not None and should_stop():
+                break
             # Find an augmenting path
         
             # Augment flow along the path (path_flow is always 1 in this case)
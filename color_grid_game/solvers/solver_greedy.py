@@ -9,48 +9,74 @@ class Solver_Greedy(Solver):
     A subclass of Solver that implements a greedy algorithm to find pairs.
     """
 
-    def run(self) -> list[tuple[tuple[int, int], tuple[int, int]]]:
+    # Capabilities and empirical cost model used by `solve`, in seconds, fitted with
+    # `calibrate_cost_models` on generated grids
+    supported_rules = ("original rules", "new rules")
+    quality = 1
+    cost_model = {
+        "original rules": {"cells": 3.16e-6, "edges": 4.74e-6},
+        "new rules": {"cells": 3.91e-6, "edges": 2.98e-11},
+    }
+
+    def run_single(self) -> np.ndarray:
         """
         Runs the greedy algorithm to find pairs of cells.
 
+        When the run is stopped, the cells that were not visited yet are left unpaired.
+        Under the new rules the closest free white partner of each cell is found by value
+        with a `PartnerSearch`, instead of scanning its O(N) white pairs. Ties in cost are
+        broken as in the order of `all_pairs`: the right and down neighbors of a non-white
+        cell first, then the other cells by ascending flat index.
+
         Returns
         -------
-        list of tuple
-            A list of pairs of cells, each represented as a tuple of tuples.
+        np.ndarray
+            A (k, 2) array of pairs of flat cell indices.
 
         Raises
         ------
         ValueError
             If any cell in pairs is invalid.
         """
-        used = set()  # Cells that have already been visited
+        adjacency = self.grid.adjacency(self.rules)
+        used = np.zeros(adjacency.n_cells, dtype=bool)  # Cells that have already been visited
+        white = adjacency.white
+        if white is not None:
+            value = self.grid.value.array.ravel().tolist()
+            m = self.grid.m
+            search_white, search_allowed = white.partner_searches(used)
         res = []
-        pairs = self.grid.all_pairs(self.rules)
-
-        # Create a dictionary to quickly access pairs by cell
-        pair_dict = defaultdict(list)
-        for pair in pairs:
-            pair_dict[pair[0]].append(pair)
-            pair_dict[pair[1]].append(pair)
-
-        for i in range(self.grid.n):
-            for j in range(self.grid.m):
-                case = (i, j)
-                if case not in used:
-                    used.add(case)
-                    if case in pair_dict:
-                        # Find the neighboring cell that minimizes the cost
-                        try:
-                            best_pair = min(
-                                (pair for pair in pair_dict[case] if pair[0] not in used or pair[1] not in used),
-                                key=lambda x: self.grid.cost(x))
-                            if best_pair[0] == case:
-                                res.append((case, best_pair[1]))
-                                used.add(best_pair[1])
-                            else:
-                                res.append((case, best_pair[0]))
-                                used.add(best_pair[0])
-                        except ValueError:
-                            pass
-        self.pairs = res
-        return res
+
+        for case in range(adjacency.n_cells):
+            # The stop condition is checked once per block of cells
+            if case % 4096 == 0 and self.should_stop():
+                break
+            if not used[case]:
+                used[case] = True
+                start, end = adjacency.indptr[case], adjacency.indptr[case + 1]
+                neighbors = adjacency.indices[start:end]
+                free = np.flatnonzero(~used[neighbors])
+                best = (np.inf, -1)
+                if free.size:
+                    # Find the neighboring cell that minimizes the cost
+                    costs = adjacency.cost[adjacency.edge_ids[start:end][free]]
+                    index = np.argmin(costs)
+                    best = (int(costs[index]), int(neighbors[free[index]]))
+                if white is not None and white._is_allowed[case]:
+                    if white._is_white[case]:
+                        other = search_allowed.closest(value[case])
+                        if other >= 0:
+                            best = (abs(value[other] - value[case]), other)
+                    else:
+                        # As in the order of `all_pairs`, the right and down neighbors win
+                        # ties against the other white cells
+                        for other in (case + 1 if (case + 1) % m else -1, case + m):
+                            if 0 <= other < adjacency.n_cells and white._is_white[other] and not used[other]:
+                                best = min(best, (abs(value[other] - value[case]), other))
+                        other = search_white.closest(value[case])
+                        if other >= 0 and abs(value[other] - value[case]) < best[0]:
+                            best = (abs(value[other] - value[case]), other)
+                if best[1] >= 0:
+                    res.extend((case, best[1]))
+                    used[best[1]] = True
+        return np.array(res, dtype=np.int32).reshape(-1, 2)
@@ -0,0 +1,142 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from color_grid_game import *
+
+class _WhiteSelection:
+    """
+    Selects the white pairs of a grid by decreasing gain, for Solver_Greedy_Sorted.
+
+    A white pair has the gain 2 * min(value[u], value[v]), so a pair of largest gain always
+    contains the free white cell of largest value: it is paired with a free cell of value
+    at least its own, else with the free cell of largest value. Since a white cell only has
+    white pairs, it is marked used as soon as it is drawn, and only its partner is looked up
+    again when an explicit pair takes it first.
+    """
+
+    def __init__(self, white: 'WhitePairs', value: list, used: bytearray):
+        self.value, self.used = value, used
+        self.search_white, self.search_allowed = white.partner_searches(used)
+        self.cell = self.other = -1
+        self.gain = 0
+        self.next_cell()
+
+    def next_cell(self) -> None:
+        """
+        Draws the free white cell of largest value.
+        """
+        self.cell, self.other = self.search_white.highest(), -1
+        if self.cell >= 0:
+            self.used[self.cell] = 1
+
+    def best(self) -> int:
+        """
+        Returns the gain of the best white pair left, 0 if there is none.
+        """
+        if self.cell >= 0 and (self.other < 0 or self.used[self.other]):
+            value = self.value[self.cell]
+            self.other = self.search_allowed.ceiling(value)
+            if self.other < 0:
+                self.other = self.search_allowed.highest()
+            if self.other < 0:
+                # The cell drawn was the last free one: there is no white pair left
+                self.cell, self.gain = -1, 0
+            else:
+                self.gain = 2 * min(value, self.value[self.other])
+        return self.gain if self.cell >= 0 else 0
+
+    def take(self) -> tuple:
+        """
+        Selects the best white pair left, as returned by `best`, and returns it with u < v.
+        """
+        pair = (min(self.cell, self.other), max(self.cell, self.other))
+        self.used[self.other] = 1
+        self.next_cell()
+        return pair
+
+class Solver_Greedy_Sorted(Solver):
+    """
+    A greedy solver that selects the pairs globally, from the most to the least profitable.
+
+    Unlike Solver_Greedy, the result does not depend on the order in which the cells are
+    visited, and it is a 1/2-approximation: the pairs selected lower the score by at least
+    half as much as the pairs of an optimal solution.
+    """
+
+    # Capabilities and empirical cost model used by `solve`, in seconds, fitted with
+    # `calibrate_cost_models` on generated grids
+    supported_rules = ("original rules", "new rules")
+    quality = 2
+    cost_model = {
+        "original rules": {"cells": 0.0, "edges": 5.22e-7},
+        "new rules": {"cells": 8.52e-7, "edges": 1.23e-11},
+    }
+
+    @staticmethod
+    def edge_order(weight: np.ndarray) -> np.ndarray:
+        """
+        Returns the edge ids sorted by ascending weight, i.e. from the pair lowering the score
+        the most, ties being broken by edge id.
+
+        Breaking ties by edge id sweeps the grid row by row within each weight, which pairs
+        the cells more tightly than a random or cost-based tie-break. The weights are small
+        integers: when they fit in 16 bits, the stable sort of NumPy is a radix sort, which
+        makes the order linear in the number of edges.
+
+        Time Complexity: O(E) for 16-bit weights, O(E log E) otherwise
+        """
+        if weight.size and weight.min() >= np.iinfo(np.int16).min and weight.max() <= np.iinfo(np.int16).max:
+            weight = weight.astype(np.int16)
+        return np.argsort(weight, kind="stable")
+
+    # Number of edges scanned between two calls to `should_stop`
+    block_size = 1 << 16
+
+    def run_single(self) -> np.ndarray:
+        """
+        Selects the pairs in ascending weight order, skipping those with a cell already used.
+
+        The edges are scanned once in the order of `edge_order`, an occupancy mask of the
+        cells rejecting the edges with a cell already selected. Under the new rules the
+        implicit white pairs are merged into the scan by decreasing gain, the explicit edges
+        winning the ties. The stop condition is checked every `block_size` edges; when the
+        run is stopped, the pairs selected so far are returned.
+
+        Returns
+        -------
+        np.ndarray
+            A (k, 2) array of pairs of flat cell indices.
+
+        Time Complexity: O(E + N log N) for 16-bit weights, O(E log E + N log N) otherwise, where E is
+        the number of explicit edges and N the number of cells
+        """
+        adjacency = self.grid.adjacency(self.rules)
+        # Pairs with a zero weight do not change the score and are not selected
+        edges = self.edge_order(adjacency.weight)
+        edges = edges[adjacency.weight[edges] < 0]
+        used = bytearray(adjacency.n_cells)
+        white = None
+        if adjacency.white is not None:
+            white = _WhiteSelection(adjacency.white, self.grid.value.array.ravel().tolist(), used)
+        selected = []
+
+        for start in range(0, edges.size, self.block_size):
+            if self.should_stop():
+                break
+            block = edges[start:start + self.block_size]
+            # Lists are faster than arrays for the scalar accesses of the scan
+            for u, v, weight in zip(adjacency.u[block].tolist(), adjacency.v[block].tolist(),
+                                    adjacency.weight[block].tolist()):
+                while white is not None and white.best() > -weight:
+                    selected.extend(white.take())
+                if not used[u] and not used[v]:
+                    used[u] = used[v] = 1
+                    selected.extend((u, v))
+        else:
+            while white is not None and white.best() > 0:
+                if len(selected) % (2 * self.block_size) == 0 and self.should_stop():
+                    break
+                selected.extend(white.take())
+
+        return np.array(selected, dtype=np.int32).reshape(-1, 2)
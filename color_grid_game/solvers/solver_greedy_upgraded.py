@@ -1,68 +1,327 @@
 import sys
 import os
-from collections import defaultdict
+import itertools
+import pickle
+import weakref
+from concurrent.futures import ProcessPoolExecutor
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from color_grid_game import *
 
+# Key and tables of the grid shared by the starts solved in a worker process, set by `_run_starts`
+_worker_tables = (None, None)
+
+# Keys identifying the tables of each run in the worker processes
+_table_keys = itertools.count()
+
+def _white_partner(cell: int, j: int, m: int, value: list, used: list, is_white: list, search_white: 'PartnerSearch',
+                   search_allowed: 'PartnerSearch', best_cost: float, best_other: int) -> tuple:
+    """
+    Returns the cheapest free partner of a non-forbidden cell under the new rules, among its
+    first free explicit neighbor (best_cost, best_other) and the cells it pairs with through
+    a white cell, as (cost, other).
+
+    Ties in cost are broken as in the order of `all_pairs`, which lists the pairs by their
+    first then second cell: a white cell takes the white cells and its up and left
+    neighbors before it first, then every cell by ascending flat index, and a non-white
+    cell takes the cells before it first, then its right and down neighbors, then the
+    other white cells.
+    """
+    v = value[cell]
+    if is_white[cell]:
+        other = search_allowed.closest(v)
+        if other < 0:
+            return best_cost, best_other
+        cost = abs(value[other] - v)
+        if other < cell and (is_white[other] or other == cell - m or (other == cell - 1 and j)):
+            return cost, other
+        # The closest white cell is the first white cell of its cost
+        first = search_white.closest(v)
+        firsts = [first] if 0 <= first < cell and abs(value[first] - v) == cost else []
+        for neighbor in (cell - m, cell - 1 if j else -1):
+            if neighbor >= 0 and not used[neighbor] and abs(value[neighbor] - v) == cost:
+                firsts.append(neighbor)
+        return cost, min(firsts, default=other)
+    best = (best_cost, False, best_other)
+    for neighbor in (cell + 1 if j + 1 < m else -1, cell + m):
+        if 0 <= neighbor < len(used) and is_white[neighbor] and not used[neighbor]:
+            best = min(best, (abs(value[neighbor] - v), False, neighbor))
+    other = search_white.closest(v)
+    if other >= 0:
+        best = min(best, (abs(value[other] - v), other > cell, other))
+    return best[0], best[2]
+
+def _greedy_starts(tables: tuple, starts: list, bound: float, should_stop: Callable = None) -> tuple:
+    """
+    Runs the greedy pass from each starting cell, in order, and keeps the best pairing.
+
+    A pass is abandoned as soon as it cannot beat the best score found, so far or `bound`:
+    the cells visited so far are paired or left unpaired for good, and each free cell adds
+    at least its floor, half the smallest of twice its value and its cheapest pair cost.
+    Under the new rules the closest free white partner of a cell competes with its first
+    free explicit neighbor, ties in cost being broken as in `_white_partner`.
+
+    Parameters
+    ----------
+    tables : tuple
+        (n, m, indptr, neighbors, costs, value, forbidden, floor, white), as built by
+        `Solver_Greedy_Upgraded.greedy_tables`.
+    starts : list of int
+        The flat indices of the starting cells.
+    bound : float
+        The score to beat.
+    should_stop : Callable, optional
+        A function without arguments called between two starts, which stops the search when
+        it returns True. Default is None.
+
+    Returns
+    -------
+    tuple
+        (score, pairs, interrupted): the best score below `bound` and its pairs as a flat list
+        of cell indices, or (bound, None, interrupted) if no start beat `bound`.
+    """
+    n, m, indptr, neighbors, costs, value, forbidden, floor, white = tables
+    if white is not None:
+        is_white, allowed, search_white, search_allowed = white
+    # Scores are doubled so that the floors stay integers
+    total_floor = sum(floor)
+    best_score, best_pairs = bound, None
+    interrupted = False
+
+    for start in starts:
+        if should_stop is not None and should_stop():
+            interrupted = True
+            break
+        k, l = divmod(start, m)
+        rows = list(range(k, n)) + list(range(k))
+        columns = list(range(l, m)) + list(range(l))
+        used = forbidden.copy()
+        if white is not None:
+            search_white.reset(used)
+            search_allowed.reset(used)
+        current_pairs = []
+        score = 0
+        remaining = total_floor
+        for i in rows:
+            base = i * m
+            for j in columns:
+                cell = base + j
+                if used[cell]:
+                    continue
+                used[cell] = True
+                remaining -= floor[cell]
+                # The neighbors are sorted by cost: the first one not yet used is the best
+                best_cost, best_other = float('inf'), -1
+                for entry in range(indptr[cell], indptr[cell + 1]):
+                    other = neighbors[entry]
+                    if not used[other]:
+                        best_cost, best_other = costs[entry], other
+                        break
+                if white is not None and allowed[cell]:
+                    best_cost, best_other = _white_partner(cell, j, m, value, used, is_white, search_white,
+                                                           search_allowed, best_cost, best_other)
+                if best_other >= 0:
+                    used[best_other] = True
+                    remaining -= floor[best_other]
+                    current_pairs.extend((cell, best_other))
+                    score += best_cost
+                else:
+                    score += value[cell]
+            if 2 * score + remaining >= 2 * best_score:
+                break
+        else:
+            best_score, best_pairs = score, current_pairs
+    return best_score, best_pairs, interrupted
+
+def _run_starts(key: int, payload: bytes, starts: list, bound: float, deadline: float = None) -> tuple:
+    """
+    Runs `_greedy_starts` in a worker process, on the pickled tables of `payload`, which are
+    only unpickled by the first chunk of the run `key` that the process solves.
+    """
+    global _worker_tables
+    if _worker_tables[0] != key:
+        _worker_tables = (key, pickle.loads(payload))
+    return _greedy_starts(_worker_tables[1], starts, bound,
+                          lambda: deadline is not None and time.monotonic() >= deadline)
+
 class Solver_Greedy_Upgraded(Solver):
     """
     Improvement of SolverGreedy that tries all possible starting points and keeps the pairing with the minimum score.
+
+    Attributes
+    ----------
+    samples : int or None
+        Number of starting cells tried, the first cell and others drawn at random, or None
+        to try every cell.
+    seed : int
+        Seed of the random draw of the starting cells.
+    chunk_size : int
+        Number of starting cells solved by a worker process at once.
+    workers : int or None
+        Maximum number of worker processes sharing the starting cells, 1 by default: the
+        passes are cheap, and a pool only pays off on large grids with many cores. The pool
+        is created by the first parallel run and reused by the next ones until `close`.
     """
 
-    def run(self) -> list[tuple[tuple[int, int], tuple[int, int]]]:
+    # Capabilities and empirical cost model used by `solve`
+    supported_rules = ("original rules", "new rules")
+    quality = 3
+    cost_model = {
+        "original rules": {"cells^2": 3.08e-7, "cells*edges": 0.0},
+        "new rules": {"cells^2": 7.49e-7, "cells*edges": 0.0},
+    }
+
+    samples = None
+    seed = 0
+    chunk_size = 64
+    workers = 1
+
+    def __init__(self, grid: Grid, rules="original rules"):
+        """
+        Initializes the solver with a grid, without any process pool.
+
+        Parameters
+        ----------
+        grid : Grid
+            The grid to be solved.
+        rules : str, optional
+            The rules to apply for solving the grid. Default is "original rules".
+        """
+        super().__init__(grid, rules)
+        self._executor = None
+        self._executor_workers = 0
+        self._close_executor = None
+
+    def executor(self, workers: int) -> ProcessPoolExecutor:
+        """
+        Returns the process pool of the solver, created with `workers` processes on first use
+        and replaced only when the number of workers changes. The pool is shut down by
+        `close`, or when the solver is garbage collected.
+        """
+        if self._executor is None or self._executor_workers != workers:
+            self.close()
+            self._executor = ProcessPoolExecutor(workers)
+            self._executor_workers = workers
+            self._close_executor = weakref.finalize(self, self._executor.shutdown, cancel_futures=True)
+        return self._executor
+
+    def close(self) -> None:
+        """
+        Shuts down the process pool of the solver, if any.
+        """
+        if self._executor is not None:
+            self._close_executor()
+            self._executor = None
+            self._executor_workers = 0
+
+    def cache_name(self) -> str:
+        """
+        Returns the name identifying the solver and its sampling parameters in the result cache.
+        """
+        if self.samples is None:
+            return type(self).__name__
+        return f"{type(self).__name__}(samples={self.samples}, seed={self.seed})"
+
+    def greedy_tables(self) -> tuple:
+        """
+        Builds the read-only tables of the grid used by every greedy pass.
+
+        The neighbors of each cell are sorted by ascending cost, ties in ascending neighbor
+        order, so that a pass takes the first neighbor not yet used instead of scanning them
+        all. The floor of a cell, the smallest of twice its value and the cost of its
+        cheapest pair, bounds twice its share of any score from below. Plain lists are
+        faster than arrays for the scalar accesses of the passes.
+
+        Under the new rules the white pairs stay implicit: `white` holds the white and
+        non-forbidden flags of the cells and the two `PartnerSearch` of `WhitePairs`, which
+        each pass resets. It is None under the original rules.
+
+        Returns
+        -------
+        tuple
+            (n, m, indptr, neighbors, costs, value, forbidden, floor, white).
+        """
+        adjacency = self.grid.adjacency(self.rules)
+        costs = adjacency.cost[adjacency.edge_ids]
+        cells = np.repeat(np.arange(adjacency.n_cells), np.diff(adjacency.indptr))
+        order = np.lexsort((costs, cells))
+        forbidden = (self.grid.color.array == 4).ravel()
+        value = self.grid.value.array.ravel().astype(np.int64)
+        floor = 2 * value
+        paired = adjacency.degrees() > 0
+        floor[paired] = np.minimum(floor[paired], np.minimum.reduceat(costs, adjacency.indptr[:-1][paired]))
+        white = None
+        if adjacency.white is not None:
+            white_paired = adjacency.white.degrees() > 0
+            floor[white_paired] = np.minimum(floor[white_paired], adjacency.white.min_costs()[white_paired])
+            white = (adjacency.white._is_white.tolist(), adjacency.white._is_allowed.tolist(),
+                     *adjacency.white.partner_searches(forbidden.tolist()))
+        floor[forbidden] = 0
+        return (self.grid.n, self.grid.m, adjacency.indptr.tolist(), adjacency.indices[order].tolist(),
+                costs[order].tolist(), value.tolist(), forbidden.tolist(), floor.tolist(), white)
+
+    def starts(self) -> list:
+        """
+        Returns the flat indices of the starting cells, in the order in which they are tried.
+
+        Every cell is tried in row-major order, unless `samples` is set: the first cell is
+        then followed by a random sample of the others.
+        """
+        n_cells = self.grid.n * self.grid.m
+        if self.samples is None or self.samples >= n_cells:
+            return list(range(n_cells))
+        rng = np.random.default_rng(self.seed)
+        return [0] + (rng.choice(n_cells - 1, size=max(self.samples - 1, 0), replace=False) + 1).tolist()
+
+    def run_single(self) -> np.ndarray:
         """
         Runs the greedy algorithm from all possible starting cells and selects the best pairing.
 
+        The passes share the tables of `greedy_tables`, and each pass is abandoned as soon as
+        it cannot beat the best pairing found. When `workers` is above 1 and the grid has at
+        least `parallel_threshold` cells, the starting cells are spread across the process
+        pool of the solver, by chunks of `chunk_size`; the tables are pickled once per run and
+        unpickled once per process, and the pairing found is the same as in a single process.
+
+        With `samples` set, only a sample of the starting cells is tried, which combined with
+        the deadline of `run` bounds the running time on large grids. When the run is stopped,
+        the best pairing among the starting cells tried so far is returned. The first starting
+        cell is always tried.
+
         Returns
         -------
-        list of tuple
-            List of pairs with the lowest score.
+        np.ndarray
+            The (k, 2) array of pairs of flat cell indices with the lowest score.
 
-        Raises
-        ------
-        ValueError
-            If any cell in pairs is invalid.
+        Time Complexity: O(S * n*m) for S starting cells, less with the pruning of the passes
         """
-        pairs = self.grid.all_pairs(self.rules)
-        pair_dict = defaultdict(list)
-        for pair in pairs:
-            pair_dict[pair[0]].append(pair)
-            pair_dict[pair[1]].append(pair)
-
-        best_score = float('inf')
-        best_pairs = []
-
-        # Iterate over all possible starting cells (k, l)
-        for k in range(self.grid.n):
-            for l in range(self.grid.m):
-                used = set()
-                current_pairs = []
-                # Traverse grid in shifted order based on k and l
-                for row_shift in range(self.grid.n):
-                    for col_shift in range(self.grid.m):
-                        i = (row_shift + k) % self.grid.n
-                        j = (col_shift + l) % self.grid.m
-                        current_cell = (i, j)
-                        if current_cell not in used and not self.grid.is_forbidden(i, j):
-                            used.add(current_cell)
-                            # Find all possible pairs for current_cell not yet used
-                            available_pairs = []
-                            for pair in pair_dict.get(current_cell, []):
-                                other = pair[0] if pair[1] == current_cell else pair[1]
-                                if other not in used and not self.grid.is_forbidden(other[0], other[1]):
-                                    available_pairs.append(pair)
-                            if available_pairs:
-                                best_pair = min(available_pairs, key=lambda p: self.grid.cost(p))
-                                other_cell = best_pair[0] if best_pair[1] == current_cell else best_pair[1]
-                                current_pairs.append((current_cell, other_cell))
-                                used.add(other_cell)
-                # Calculate score for current_pairs
-                self.pairs = current_pairs
-                score = self.score()
-                # Update best if current score is better
-                if score < best_score:
-                    best_score = score
-                    best_pairs = current_pairs.copy()
-        self.pairs = best_pairs
-        return best_pairs
+        tables = self.greedy_tables()
+        starts = self.starts()
+        # The first pass is never stopped, so that a pairing is always found
+        best_score, best_pairs, _ = _greedy_starts(tables, starts[:1], float('inf'))
+        starts = starts[1:]
+
+        workers = os.cpu_count() if self.workers is None else self.workers
+        if workers > 1 and len(starts) > self.chunk_size and self.grid.n * self.grid.m >= self.parallel_threshold:
+            chunks = [starts[k:k + self.chunk_size] for k in range(0, len(starts), self.chunk_size)]
+            executor = self.executor(workers)
+            key, payload = next(_table_keys), pickle.dumps(tables, pickle.HIGHEST_PROTOCOL)
+            pending = [executor.submit(_run_starts, key, payload, chunk, best_score, self.deadline)
+                       for chunk in chunks[:workers]]
+            submitted = len(pending)
+            # Chunks are merged in order, so that ties are won by the earliest start
+            while pending:
+                score, pairs, interrupted = pending.pop(0).result()
+                if interrupted:
+                    self.interrupted = True
+                if pairs is not None and score < best_score:
+                    best_score, best_pairs = score, pairs
+                if submitted < len(chunks) and not self.should_stop():
+                    pending.append(executor.submit(_run_starts, key, payload, chunks[submitted], best_score,
+                                                   self.deadline))
+                    submitted += 1
+        else:
+            score, pairs, _ = _greedy_starts(tables, starts, best_score, self.should_stop)
+            if pairs is not None:
+                best_pairs = pairs
+        return np.array(best_pairs, dtype=np.int32).reshape(-1, 2)
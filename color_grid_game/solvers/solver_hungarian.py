@@ -10,98 +10,171 @@ class Solver_Hungarian(Solver):
     An alternative implementation of the Hungarian algorithm solver.
     """
 
-    def run(self):
+    # Connected components of the pairing graph are solved independently by `run`
+    decompose = True
+
+    # Capabilities and empirical cost model used by `solve`. Under the new rules the white
+    # pairs break the bipartition and the assignment found may use a cell in two pairs
+    supported_rules = ("original rules",)
+    exact_rules = ("original rules",)
+    cost_model = {
+        "original rules": {"cells": 9.91e-6, "components": 1.02e-3, "component_cells^2": 1.9e-6},
+    }
+
+    def run_single(self):
         """
         Builds a bipartite cost matrix using only cells present in valid pairs.
         Applies the Hungarian algorithm to find optimal pairs.
 
+        Under the original rules, the initial pairs of the run seed the assignment, and the
+        duals fitted to them by `fit_matching_duals` seed the dual variables, so that only
+        the rows of the pairs that could not be fitted are augmented.
+
         Returns
         -------
-        list of tuple
-            A list of pairs of cells, each represented as a tuple of tuples.
+        np.ndarray
+            A (k, 2) array of pairs of flat cell indices.
 
         Raises
         ------
         ValueError
             If the cost matrix is empty or if pairs are invalid.
         """
-        pairs = self.grid.all_pairs(self.rules)  # O(P) where P is the number of pairs
-        all_cells = list(set(cell for pair in pairs for cell in pair)) 
+        m = self.grid.m
+        adjacency = self.grid.adjacency(self.rules)  # Shared with the other solvers of the grid
+        u, v, weight = adjacency.u, adjacency.v, adjacency.weight
+        if adjacency.white is not None:
+            # The cost matrix of the new rules is dense anyway: the white pairs are added to it
+            value = self.grid.value.array.ravel().astype(np.int64)
+            chunks = list(adjacency.white.iter_chunks())
+            u = np.concatenate([u] + [chunk[0] for chunk in chunks])
+            v = np.concatenate([v] + [chunk[1] for chunk in chunks])
+            weight = np.concatenate([weight] + [cost - value[cu] - value[cv] for cu, cv, cost in chunks])
+        # Cells of at least one pair, by ascending flat index. The order of the cells is the
+        # order of the rows and columns of the matrix, in which the rows are augmented
+        cell_ids = np.unique(np.concatenate((u, v))).astype(np.int32)
+        # Matrix index of each cell, by flat index
+        index = np.zeros(adjacency.n_cells, dtype=np.int64)
 
         if self.rules == "original rules":
-            even_cells = []
-            odd_cells = []
-            for cell in all_cells:  
-                if (cell[0] + cell[1]) % 2 == 0:
-                    even_cells.append(cell)
-                else:
-                    odd_cells.append(cell)
+            # Even cells (i + j even) are the rows, odd cells the columns
+            even = (cell_ids // m + cell_ids % m) % 2 == 0
+            even_ids, odd_ids = cell_ids[even], cell_ids[~even]
+            index[even_ids] = np.arange(even_ids.size)
+            index[odd_ids] = np.arange(odd_ids.size)
 
-            # Create mappings for matrix indices
-            even_to_idx = {cell: i for i, cell in enumerate(even_cells)}  
-            odd_to_idx = {cell: j for j, cell in enumerate(odd_cells)}  
+            # Orient every pair from its even cell to its odd cell
+            u_is_even = (u // m + u % m) % 2 == 0
+            even_ends = np.where(u_is_even, u, v)
+            odd_ends = np.where(u_is_even, v, u)
 
             # Build cost matrix with valid pairs only and pad to square
-            even_count = len(even_cells)
-            odd_count = len(odd_cells)
+            even_count = even_ids.size
+            odd_count = odd_ids.size
             max_dim = max(even_count, odd_count)
             cost_matrix = np.zeros((max_dim, max_dim))
+            cost_matrix[index[even_ends], index[odd_ends]] = weight
 
-            for u, v in pairs:
-
-                if (u[0] + u[1]) % 2 != 0:
-                    u, v = v, u
-                if u in even_to_idx and v in odd_to_idx:
-                    cost = self.grid.cost((u, v)) 
-                    weight = cost - self.grid.value[u[0]][u[1]] - self.grid.value[v[0]][v[1]]  
-                    cost_matrix[even_to_idx[u], odd_to_idx[v]] = weight 
+            initial = None
+            if self.initial_pairs is not None and len(self.initial_pairs):
+                initial = self.initial_assignment(cost_matrix, index, odd_ids)
 
             # Apply Hungarian algorithm on the padded square matrix
-            row_ind, col_ind = self.hungarian_algorithm(cost_matrix)  # O(max_dim^3)
+            row_ind, col_ind = self.hungarian_algorithm(cost_matrix, initial)  # O(max_dim^3)
 
             # Rebuild pairs from matrix indices, filtering valid entries
-            self.pairs = []
-            for i, j in zip(row_ind, col_ind):  # O(max_dim)
-                if i < even_count and j < odd_count and cost_matrix[i][j] != 0:
-                    self.pairs.append((even_cells[i], odd_cells[j]))  
+            valid = (row_ind < even_count) & (col_ind < odd_count)
+            row_ind, col_ind = row_ind[valid], col_ind[valid]
+            valid = cost_matrix[row_ind, col_ind] != 0
+            pairs = np.stack((even_ids[row_ind[valid]], odd_ids[col_ind[valid]]), axis=1)
 
         elif self.rules == "new rules":
-            num_cells = len(all_cells) 
-            cost_matrix = np.zeros((num_cells, num_cells))  
-
-            # Create a mapping from cell to matrix index
-            cell_to_idx = {cell: i for i, cell in enumerate(all_cells)}
-
-            for u, v in pairs: 
-                if u in cell_to_idx and v in cell_to_idx:
-                    cost = self.grid.cost((u, v)) 
-                    weight = cost - self.grid.value[u[0]][u[1]] - self.grid.value[v[0]][v[1]] 
-                    cost_matrix[cell_to_idx[u], cell_to_idx[v]] = weight
+            num_cells = cell_ids.size
+            cost_matrix = np.zeros((num_cells, num_cells))
+            index[cell_ids] = np.arange(num_cells)
+
+            # Matrix entries follow the orientation of the pairs: a white cell is paired towards
+            # every cell, a non-white cell towards its right and bottom neighbors
+            flat_color = self.grid.color.array.ravel()
+            adjacent = (v - u == m) | ((v - u == 1) & (v % m != 0))
+            forward = (flat_color[u] == 0) | adjacent
+            backward = flat_color[v] == 0
+            cost_matrix[index[u[forward]], index[v[forward]]] = weight[forward]
+            cost_matrix[index[v[backward]], index[u[backward]]] = weight[backward]
 
             # Apply Hungarian algorithm on the square matrix
             row_ind, col_ind = self.hungarian_algorithm(cost_matrix)  # O(C^3)
 
             # Rebuild pairs from matrix indices, filtering valid entries
-            self.pairs = []
-            for i, j in zip(row_ind, col_ind):
-                if cost_matrix[i][j] != 0:
-                    self.pairs.append((all_cells[i], all_cells[j]))
+            valid = cost_matrix[row_ind, col_ind] != 0
+            pairs = np.stack((cell_ids[row_ind[valid]], cell_ids[col_ind[valid]]), axis=1)
+
+        return pairs.reshape(-1, 2)
+
+    def initial_assignment(self, cost, index, odd_ids):
+        """
+        Translates the initial pairs of the run into a partial assignment of the cost matrix
+        of the original rules, with dual variables for which it is optimal.
 
-        return self.pairs
+        The duals y >= 0 of `fit_matching_duals` give u = -y on the rows and v = -y on the
+        columns, so that every reduced cost cost - u - v is nonnegative and the fitted pairs
+        are tight. The rows that are not seeded get the largest dual keeping their reduced
+        costs nonnegative.
 
-    def hungarian_algorithm(self, cost):
+        Parameters
+        ----------
+        cost : np.ndarray
+            The padded square cost matrix, rows for the even cells and columns for the odd cells.
+        index : np.ndarray
+            The matrix index of each cell, by flat index.
+        odd_ids : np.ndarray
+            The flat index of the odd cell of each column.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+            The rows and columns of the seeded pairs, and the dual variables u and v.
+        """
+        m = self.grid.m
+        duals, fitted, _ = fit_matching_duals(self.grid, self.initial_pairs)
+        pairs = self.initial_pairs[fitted].astype(np.int64)
+        first_is_even = (pairs[:, 0] // m + pairs[:, 0] % m) % 2 == 0
+        even_ends = np.where(first_is_even, pairs[:, 0], pairs[:, 1])
+        rows = index[even_ends]
+        cols = index[np.where(first_is_even, pairs[:, 1], pairs[:, 0])]
+
+        n = cost.shape[0]
+        seeded = np.zeros(n, dtype=bool)
+        seeded[rows] = True
+        u = np.zeros(n)
+        v = np.zeros(n)
+        u[rows] = -duals[even_ends]
+        v[:len(odd_ids)] = -duals[odd_ids]
+        # The seeded pairs are exactly tight, whatever the rounding of the duals
+        v[cols] = cost[rows, cols] - u[rows]
+        u[~seeded] = (cost[~seeded] - v).min(axis=1)
+        return rows, cols, u, v
+
+    def hungarian_algorithm(self, cost, initial=None):
         """
         Solve the linear sum assignment problem using the Hungarian algorithm.
 
+        The stop condition of the run is checked between two augmentations. When the run
+        is stopped, only the rows assigned so far are returned.
+
         Parameters
         ----------
         cost : np.ndarray
             The cost matrix of the bipartite graph.
+        initial : tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray], optional
+            A partial assignment to start from, as its rows and columns, with dual variables
+            u and v for which every reduced cost is nonnegative and the assigned entries are
+            tight. Only the other rows are augmented. Default is an empty assignment.
 
         Returns
         -------
         row_ind : np.ndarray
-            An array of row indices giving the optimal assignment.
+            An array of row indices giving the optimal assignment, every row when complete.
         col_ind : np.ndarray
             An array of corresponding column indices giving the optimal assignment.
         """
@@ -113,6 +186,11 @@ class Solver_Hungarian(Solver):
         path = np.full(n, -1, dtype=int)
         col_to_row = np.full(n, -1, dtype=int) 
         row_to_col = np.full(n, -1, dtype=int) 
+        if initial is not None:
+            rows, cols, u0, v0 = initial
+            u[:], v[:] = u0, v0
+            col_to_row[rows] = cols
+            row_to_col[cols] = rows
 
         def find_augmenting_path(current_row):
             """
@@ -173,6 +251,10 @@ class Solver_Hungarian(Solver):
 
         # Iterate over each row to find the optimal assignment
         for current_row in range(n):  # O(n)
+            if col_to_row[current_row] >= 0:
+                continue
+            if self.should_stop():
+                break
             sink, min_value, visited_rows, visited_columns, shortest_path_costs = find_augmenting_path(current_row)  # O(n^2)
 
             # Update the dual variables u and v
@@ -191,8 +273,9 @@ class Solver_Hungarian(Solver):
                 if i == current_row: 
                     break
 
-        # Return the optimal assignment
-        return np.arange(n), col_to_row  # O(n)
+        # Return the optimal assignment, restricted to the rows assigned so far
+        assigned = np.flatnonzero(col_to_row >= 0)
+        return assigned, col_to_row[assigned]  # O(n)
 
 # Overall Complexity:
 # The overall time complexity is dominated by the Hungarian algorithm, which is O(n^3).
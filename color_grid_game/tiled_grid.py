@@ -0,0 +1,504 @@
+import sys
+import os
+import struct
+from collections import OrderedDict
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from color_grid_game import *
+
+class TiledGrid:
+    """
+    A grid stored on disk in fixed-size tiles, for grids that do not fit in memory.
+
+    The file starts with a header (magic number, format version, n, m, the tile shape and
+    the dtypes of both planes), followed by every color tile then every value tile, in
+    row-major tile order. Each tile is a C-ordered block of `tile_shape` cells; tiles on
+    the bottom and right borders are padded with black cells of value 0.
+
+    Tiles are memory-mapped on demand and only the `max_tiles` most recently used ones
+    stay mapped, so walking a grid tile by tile keeps the resident memory bounded
+    whatever the grid size.
+
+    Attributes
+    ----------
+    file_name : str
+        Name of the tiled grid file.
+    mode : str
+        The `np.memmap` mode used to map the tiles.
+    n : int
+        Number of rows in the grid.
+    m : int
+        Number of columns in the grid.
+    tile_shape : tuple[int, int]
+        Number of rows and columns of a tile.
+    color_dtype : np.dtype
+        The dtype of the color plane.
+    value_dtype : np.dtype
+        The dtype of the value plane.
+    max_tiles : int
+        Maximum number of tiles mapped at the same time.
+    """
+
+    tiled_magic = b"CGRT"
+    tiled_version = 1
+    tiled_header = struct.Struct("<4sHxxQQII4s4s")
+    # Planes start on page boundaries so that tiles map onto whole pages
+    page_size = 4096
+
+    def __init__(self, file_name: str, mode: str = "r", max_tiles: int = 64):
+        """
+        Opens a tiled grid file written by `create` or `from_grid`.
+
+        Parameters
+        ----------
+        file_name : str
+            Name of the file to open.
+        mode : str, optional
+            The `np.memmap` mode. Default is "r" (read-only grid). Use "c" for a
+            copy-on-write grid, or "r+" to write changes back to the file.
+        max_tiles : int, optional
+            Maximum number of tiles mapped at the same time. Default is 64.
+
+        Raises
+        ------
+        FileNotFoundError
+            If the file does not exist.
+        ValueError
+            If the file is not a valid tiled grid file, or if `max_tiles` is not positive.
+        """
+        if max_tiles <= 0:
+            raise ValueError("max_tiles must be a positive integer.")
+        try:
+            with open(file_name, "rb") as file:
+                header = file.read(self.tiled_header.size)
+                file_size = os.fstat(file.fileno()).st_size
+        except FileNotFoundError:
+            raise FileNotFoundError(f"The file {file_name} does not exist.")
+
+        if len(header) != self.tiled_header.size:
+            raise ValueError("Incorrect format")
+        magic, version, n, m, tile_rows, tile_cols, color_dtype, value_dtype = self.tiled_header.unpack(header)
+        if magic != self.tiled_magic or version != self.tiled_version:
+            raise ValueError("Incorrect format")
+        if n <= 0 or m <= 0 or tile_rows <= 0 or tile_cols <= 0:
+            raise ValueError("Incorrect format")
+
+        self.file_name = file_name
+        self.mode = mode
+        self.n = n
+        self.m = m
+        self.tile_shape = (tile_rows, tile_cols)
+        self.color_dtype = np.dtype(color_dtype.rstrip(b"\0").decode("ascii"))
+        self.value_dtype = np.dtype(value_dtype.rstrip(b"\0").decode("ascii"))
+        self.max_tiles = max_tiles
+        self._color_offset, self._value_offset, size = self._offsets(
+            n, m, self.tile_shape, self.color_dtype, self.value_dtype)
+        if file_size < size:
+            raise ValueError("Incorrect format")
+        self._tiles = OrderedDict()
+
+    @classmethod
+    def _offsets(cls, n: int, m: int, tile_shape: tuple[int, int], color_dtype: np.dtype,
+                 value_dtype: np.dtype) -> tuple[int, int, int]:
+        """
+        Returns the offsets of the color and value planes and the total file size.
+        """
+        tile_rows, tile_cols = tile_shape
+        n_tiles = -(-n // tile_rows) * -(-m // tile_cols)
+        tile_size = tile_rows * tile_cols
+        color_offset = cls.page_size
+        value_offset = color_offset + n_tiles * tile_size * np.dtype(color_dtype).itemsize
+        value_offset = -(-value_offset // cls.page_size) * cls.page_size
+        return color_offset, value_offset, value_offset + n_tiles * tile_size * np.dtype(value_dtype).itemsize
+
+    @classmethod
+    def create(cls, file_name: str, n: int, m: int, tile_shape: tuple[int, int] = (256, 256),
+               max_tiles: int = 64) -> 'TiledGrid':
+        """
+        Creates a tiled grid file of white cells of value 1, like an empty `Grid`.
+
+        The file is filled tile by tile, so the grid never needs to fit in memory.
+
+        Parameters
+        ----------
+        file_name : str
+            Name of the file to create.
+        n : int
+            Number of rows in the grid.
+        m : int
+            Number of columns in the grid.
+        tile_shape : tuple[int, int], optional
+            Number of rows and columns of a tile. Default is (256, 256).
+        max_tiles : int, optional
+            Maximum number of tiles mapped at the same time. Default is 64.
+
+        Returns
+        -------
+        TiledGrid
+            The new grid, opened in "r+" mode.
+
+        Raises
+        ------
+        ValueError
+            If `n`, `m` or the tile dimensions are not positive integers.
+        """
+        if n <= 0 or m <= 0:
+            raise ValueError("Number of rows and columns must be positive integers.")
+        tile_rows, tile_cols = tile_shape
+        if tile_rows <= 0 or tile_cols <= 0:
+            raise ValueError("Tile dimensions must be positive integers.")
+
+        header = cls.tiled_header.pack(
+            cls.tiled_magic, cls.tiled_version, n, m, tile_rows, tile_cols,
+            np.dtype(Grid.color_dtype).str.encode("ascii"), np.dtype(Grid.value_dtype).str.encode("ascii"))
+        size = cls._offsets(n, m, tile_shape, Grid.color_dtype, Grid.value_dtype)[2]
+        with open(file_name, "wb") as file:
+            file.write(header)
+            # The planes are zero-filled (white cells) without being written
+            file.truncate(size)
+
+        grid = cls(file_name, mode="r+", max_tiles=max_tiles)
+        for ti, tj in grid.tile_indices():
+            i0, i1, j0, j1 = grid.tile_bounds(ti, tj)
+            color, value = grid._tile_maps(ti, tj)
+            value[:i1 - i0, :j1 - j0] = 1
+            color[i1 - i0:, :] = 4
+            color[:, j1 - j0:] = 4
+        grid.flush()
+        return grid
+
+    @classmethod
+    def from_grid(cls, grid: 'Grid', file_name: str, tile_shape: tuple[int, int] = (256, 256),
+                  max_tiles: int = 64) -> 'TiledGrid':
+        """
+        Writes a Grid to a tiled grid file.
+
+        Parameters
+        ----------
+        grid : Grid
+            The grid to write.
+        file_name : str
+            Name of the file to create.
+        tile_shape : tuple[int, int], optional
+            Number of rows and columns of a tile. Default is (256, 256).
+        max_tiles : int, optional
+            Maximum number of tiles mapped at the same time. Default is 64.
+
+        Returns
+        -------
+        TiledGrid
+            The new grid, opened in "r+" mode.
+        """
+        tiled = cls.create(file_name, grid.n, grid.m, tile_shape, max_tiles)
+        for i0, j0, color, value in tiled.iter_tiles():
+            color[...] = grid.color.array[i0:i0 + color.shape[0], j0:j0 + color.shape[1]]
+            value[...] = grid.value.array[i0:i0 + value.shape[0], j0:j0 + value.shape[1]]
+        tiled.flush()
+        return tiled
+
+    def __repr__(self) -> str:
+        """
+        Returns a formal string representation of the grid.
+
+        Returns
+        -------
+        str
+            A string representation of the grid with the number of rows, columns and the tile shape.
+        """
+        return f"<tiled_grid.TiledGrid: n={self.n}, m={self.m}, tile_shape={self.tile_shape}>"
+
+    @property
+    def n_tiles(self) -> tuple[int, int]:
+        """
+        The number of tile rows and tile columns.
+        """
+        tile_rows, tile_cols = self.tile_shape
+        return -(-self.n // tile_rows), -(-self.m // tile_cols)
+
+    def tile_indices(self):
+        """
+        Yields the (ti, tj) index of every tile, in row-major order.
+        """
+        n_tile_rows, n_tile_cols = self.n_tiles
+        for ti in range(n_tile_rows):
+            for tj in range(n_tile_cols):
+                yield ti, tj
+
+    def tile_bounds(self, ti: int, tj: int) -> tuple[int, int, int, int]:
+        """
+        Returns the cells covered by a tile.
+
+        Parameters
+        ----------
+        ti : int
+            Row index of the tile.
+        tj : int
+            Column index of the tile.
+
+        Returns
+        -------
+        tuple[int, int, int, int]
+            (i0, i1, j0, j1) such that the tile covers the rows i0 to i1 - 1 and the columns j0 to j1 - 1.
+        """
+        tile_rows, tile_cols = self.tile_shape
+        i0, j0 = ti * tile_rows, tj * tile_cols
+        return i0, min(i0 + tile_rows, self.n), j0, min(j0 + tile_cols, self.m)
+
+    def _tile_maps(self, ti: int, tj: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the padded color and value blocks of a tile, mapping it if needed.
+
+        The least recently used tile is unmapped when more than `max_tiles` tiles are mapped.
+        """
+        key = (ti, tj)
+        maps = self._tiles.get(key)
+        if maps is not None:
+            self._tiles.move_to_end(key)
+            return maps
+
+        tile_rows, tile_cols = self.tile_shape
+        tile = ti * self.n_tiles[1] + tj
+        tile_size = tile_rows * tile_cols
+        maps = (
+            np.memmap(self.file_name, dtype=self.color_dtype, mode=self.mode,
+                      offset=self._color_offset + tile * tile_size * self.color_dtype.itemsize,
+                      shape=self.tile_shape),
+            np.memmap(self.file_name, dtype=self.value_dtype, mode=self.mode,
+                      offset=self._value_offset + tile * tile_size * self.value_dtype.itemsize,
+                      shape=self.tile_shape),
+        )
+        self._tiles[key] = maps
+        if len(self._tiles) > self.max_tiles:
+            self._tiles.popitem(last=False)
+        return maps
+
+    def tile(self, ti: int, tj: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the color and value blocks of a tile, without the padding.
+
+        The blocks are views of the memory-mapped file: they are writable unless the grid
+        was opened in "r" mode, and changes are written back in "r+" mode.
+
+        Parameters
+        ----------
+        ti : int
+            Row index of the tile.
+        tj : int
+            Column index of the tile.
+
+        Returns
+        -------
+        color : np.ndarray
+            The colors of the cells covered by the tile.
+        value : np.ndarray
+            The values of the cells covered by the tile.
+
+        Raises
+        ------
+        IndexError
+            If the tile index is out of bounds.
+        """
+        n_tile_rows, n_tile_cols = self.n_tiles
+        if not (0 <= ti < n_tile_rows and 0 <= tj < n_tile_cols):
+            raise IndexError("Tile index out of grid boundaries.")
+        i0, i1, j0, j1 = self.tile_bounds(ti, tj)
+        color, value = self._tile_maps(ti, tj)
+        return color[:i1 - i0, :j1 - j0], value[:i1 - i0, :j1 - j0]
+
+    def iter_tiles(self):
+        """
+        Yields every tile of the grid, in row-major order.
+
+        Yields
+        ------
+        tuple[int, int, np.ndarray, np.ndarray]
+            (i0, j0, color, value), where (i0, j0) is the top-left cell of the tile and
+            color and value are the blocks returned by `tile`. A block can be turned into
+            a standalone grid with `Grid(*color.shape, color, value)`.
+        """
+        for ti, tj in self.tile_indices():
+            i0, _, j0, _ = self.tile_bounds(ti, tj)
+            color, value = self.tile(ti, tj)
+            yield i0, j0, color, value
+
+    def _is_within_bounds(self, i: int, j: int) -> bool:
+        """
+        Checks if a cell index is within the grid boundaries.
+        """
+        return 0 <= i < self.n and 0 <= j < self.m
+
+    def _cell(self, i: int, j: int) -> tuple[int, int]:
+        """
+        Returns the color and value of the cell (i, j).
+
+        Raises
+        ------
+        IndexError
+            If the cell (i, j) is out of the grid boundaries.
+        """
+        if not self._is_within_bounds(i, j):
+            raise IndexError("Cell index out of grid boundaries.")
+        tile_rows, tile_cols = self.tile_shape
+        color, value = self._tile_maps(i // tile_rows, j // tile_cols)
+        return int(color[i % tile_rows, j % tile_cols]), int(value[i % tile_rows, j % tile_cols])
+
+    def is_forbidden(self, i: int, j: int) -> bool:
+        """
+        Checks if a cell is forbidden (black).
+
+        Parameters
+        ----------
+        i : int
+            Row index of the cell.
+        j : int
+            Column index of the cell.
+
+        Returns
+        -------
+        bool
+            True if the cell (i, j) is black, False otherwise.
+
+        Raises
+        ------
+        IndexError
+            If the cell (i, j) is out of the grid boundaries.
+        """
+        return self._cell(i, j)[0] == 4
+
+    def cost(self, pair: tuple[tuple[int, int], tuple[int, int]]) -> int:
+        """
+        Returns the cost of a pair of cells.
+
+        Parameters
+        ----------
+        pair : tuple[tuple[int, int], tuple[int, int]]
+            A pair of cells in the format ((i1, j1), (i2, j2)).
+
+        Returns
+        -------
+        int
+            The cost of the pair, defined as the absolute value of the difference between their values.
+
+        Raises
+        ------
+        IndexError
+            If any of the cells in the pair is out of the grid boundaries.
+        """
+        (i1, j1), (i2, j2) = pair
+        return abs(self._cell(i1, j1)[1] - self._cell(i2, j2)[1])
+
+    def vois(self, i: int, j: int) -> list[tuple[int, int]]:
+        """
+        Returns the list of neighbors of the cell (i, j).
+
+        Parameters
+        ----------
+        i : int
+            Row index of the cell.
+        j : int
+            Column index of the cell.
+
+        Returns
+        -------
+        list[tuple[int, int]]
+            A list of neighboring cell coordinates.
+
+        Raises
+        ------
+        IndexError
+            If the cell (i, j) is out of the grid boundaries.
+        """
+        if not self._is_within_bounds(i, j):
+            raise IndexError("Cell index out of grid boundaries.")
+        return [(i + di, j + dj) for di, dj in [(-1, 0), (1, 0), (0, -1), (0, 1)]
+                if self._is_within_bounds(i + di, j + dj)]
+
+    def iter_edge_arrays(self, rules="original rules", implicit_white: bool = False):
+        """
+        Yields the allowed pairs of cells tile by tile, as parallel arrays of flat cell indices.
+
+        Each chunk holds the pairs whose first cell lies in one tile, including the pairs
+        crossing its bottom and right borders, with the same (u, v, cost) layout and flat
+        indices i * m + j as `Grid.edge_arrays`. Only a tile and its two neighbors need to
+        be mapped at a time.
+
+        Parameters
+        ----------
+        rules : str, optional
+            The rules to apply for determining allowed pairs. Default is "original rules".
+        implicit_white : bool, optional
+            Under the new rules, leaves out every pair involving a white cell, as in
+            `Grid.edge_arrays`. Required for the new rules, whose white pairs are too many
+            to enumerate on a tiled grid. Default is False.
+
+        Yields
+        ------
+        tuple[np.ndarray, np.ndarray, np.ndarray]
+            The (u, v, cost) arrays of a tile, sorted by u then v.
+
+        Raises
+        ------
+        ValueError
+            If the rules parameter is not recognized, or if the new rules are requested without `implicit_white`.
+        """
+        if rules not in ["original rules", "new rules"]:
+            raise ValueError("Unrecognized rules parameter.")
+        if rules == "new rules" and not implicit_white:
+            raise ValueError("New rules white pairs must be left implicit on a tiled grid.")
+        n_tile_rows, n_tile_cols = self.n_tiles
+
+        for ti, tj in self.tile_indices():
+            i0, i1, j0, j1 = self.tile_bounds(ti, tj)
+            color, value = self.tile(ti, tj)
+            # Extend the tile with the first column of its right neighbor and the first row of the one below
+            right_color, right_value = color, value
+            if tj + 1 < n_tile_cols:
+                next_color, next_value = self.tile(ti, tj + 1)
+                right_color = np.hstack((color, next_color[:, :1]))
+                right_value = np.hstack((value, next_value[:, :1]))
+            down_color, down_value = color, value
+            if ti + 1 < n_tile_rows:
+                next_color, next_value = self.tile(ti + 1, tj)
+                down_color = np.vstack((color, next_color[:1, :]))
+                down_value = np.vstack((value, next_value[:1, :]))
+
+            right = Grid.color_compatibility[right_color[:, :-1], right_color[:, 1:]]
+            down = Grid.color_compatibility[down_color[:-1, :], down_color[1:, :]]
+            if rules == "new rules":
+                right &= (right_color[:, :-1] != 0) & (right_color[:, 1:] != 0)
+                down &= (down_color[:-1, :] != 0) & (down_color[1:, :] != 0)
+
+            ids = np.arange(i0, i1, dtype=np.int64)[:, None] * self.m + np.arange(j0, j1, dtype=np.int64)
+            right_cost = np.abs(right_value[:, :-1].astype(np.int64) - right_value[:, 1:])[right]
+            down_cost = np.abs(down_value[:-1, :].astype(np.int64) - down_value[1:, :])[down]
+            u_right = ids[:, :right.shape[1]][right]
+            u_down = ids[:down.shape[0], :][down]
+            u = np.concatenate((u_right, u_down))
+            v = np.concatenate((u_right + 1, u_down + self.m))
+            cost = np.concatenate((right_cost, down_cost))
+            order = np.lexsort((v, u))
+            yield u[order], v[order], cost[order]
+
+    def to_grid(self) -> 'Grid':
+        """
+        Loads the whole grid in memory.
+
+        Returns
+        -------
+        Grid
+            A Grid object with the same colors and values.
+        """
+        color = np.empty((self.n, self.m), dtype=self.color_dtype)
+        value = np.empty((self.n, self.m), dtype=self.value_dtype)
+        for i0, j0, tile_color, tile_value in self.iter_tiles():
+            color[i0:i0 + tile_color.shape[0], j0:j0 + tile_color.shape[1]] = tile_color
+            value[i0:i0 + tile_value.shape[0], j0:j0 + tile_value.shape[1]] = tile_value
+        return Grid(self.n, self.m, color, value)
+
+    def flush(self) -> None:
+        """
+        Writes the changes made to the mapped tiles back to the file.
+        """
+        for color, value in self._tiles.values():
+            color.flush()
+            value.flush()
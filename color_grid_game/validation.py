@@ -0,0 +1,149 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from color_grid_game import *
+
+class PairValidation:
+    """
+    Result of the validation of a set of pairs, listing the offending pairs by violated rule.
+
+    Attributes
+    ----------
+    pairs : np.ndarray
+        The validated pairs, as a (k, 2) array of flat cell indices i * m + j. The cells out
+        of the grid are replaced by -1.
+    errors : dict[str, np.ndarray]
+        For each violated rule, the sorted positions in the pairs of the pairs violating it:
+        "out_of_bounds" (a cell is out of the grid), "black_cell" (a cell is black),
+        "same_cell" (a cell is paired with itself), "not_adjacent" (the cells are not adjacent
+        and none of them is white under the new rules), "incompatible_colors" (the colors
+        cannot be paired) and "reused_cell" (a cell belongs to several pairs, all of which
+        are reported).
+    invalid : np.ndarray
+        The sorted positions of every offending pair.
+    """
+
+    __slots__ = ("grid", "pairs", "errors", "invalid")
+
+    def __init__(self, grid: Grid, pairs: np.ndarray, errors: dict[str, np.ndarray]):
+        """
+        Gathers the offending pairs found by `validate_pairs`.
+        """
+        self.grid = grid
+        self.pairs = pairs
+        self.errors = {reason: positions for reason, positions in errors.items() if positions.size}
+        self.invalid = np.unique(np.concatenate([np.zeros(0, dtype=np.int64)] + list(self.errors.values())))
+
+    @property
+    def valid(self) -> bool:
+        """
+        Whether every pair is legal.
+        """
+        return self.invalid.size == 0
+
+    def __bool__(self) -> bool:
+        return self.valid
+
+    def offending_pairs(self, reason: str = None) -> list[tuple[tuple[int, int], tuple[int, int]]]:
+        """
+        Returns the offending pairs in the format ((i1, j1), (i2, j2)).
+
+        Parameters
+        ----------
+        reason : str, optional
+            Only returns the pairs violating this rule. Default is every offending pair.
+        """
+        positions = self.invalid if reason is None else self.errors.get(reason, np.zeros(0, dtype=np.int64))
+        pairs = self.pairs[positions]
+        i, j = np.divmod(pairs, self.grid.m)
+        # Cells out of the grid are reported as (-1, -1)
+        i[pairs < 0] = j[pairs < 0] = -1
+        return list(zip(zip(i[:, 0].tolist(), j[:, 0].tolist()), zip(i[:, 1].tolist(), j[:, 1].tolist())))
+
+    def check(self) -> None:
+        """
+        Raises an error describing the offending pairs, if any.
+
+        Raises
+        ------
+        ValueError
+            If a pair is not legal.
+        """
+        if not self.valid:
+            details = ", ".join(f"{positions.size} {reason.replace('_', ' ')} (first: {self.offending_pairs(reason)[0]})"
+                                for reason, positions in self.errors.items())
+            raise ValueError(f"{self.invalid.size} invalid pairs: {details}.")
+
+def validate_pairs(grid: Grid, pairs, rules="original rules") -> PairValidation:
+    """
+    Checks that a set of pairs is a legal solution of a grid, in one vectorized pass.
+
+    Every cell must be in the grid, not black and used at most once, and the two cells of a
+    pair must be distinct, adjacent and of compatible colors. Under the new rules, a pair
+    with a white cell may join any two cells.
+
+    Parameters
+    ----------
+    grid : Grid
+        The grid.
+    pairs : list[tuple[tuple[int, int], tuple[int, int]]] or np.ndarray
+        The pairs, in the format ((i1, j1), (i2, j2)), or as a (k, 2) array of flat cell indices.
+    rules : str, optional
+        The rules to apply for determining allowed pairs. Default is "original rules".
+
+    Returns
+    -------
+    PairValidation
+        The offending pairs, by violated rule.
+
+    Raises
+    ------
+    ValueError
+        If the rules parameter is not recognized.
+
+    Time Complexity: O(n*m + k) for k pairs
+    """
+    if rules not in ["original rules", "new rules"]:
+        raise ValueError("Unrecognized rules parameter.")
+    n, m = grid.n, grid.m
+    if isinstance(pairs, np.ndarray):
+        flat = pairs.astype(np.int64).reshape(-1, 2)
+        inside = (flat >= 0) & (flat < n * m)
+    else:
+        cells = np.array(pairs, dtype=np.int64).reshape(-1, 2, 2)
+        i, j = cells[:, :, 0], cells[:, :, 1]
+        inside = (i >= 0) & (i < n) & (j >= 0) & (j < m)
+        flat = i * m + j
+    flat = np.where(inside, flat, -1)
+    in_bounds = inside.all(axis=1)
+    # Cells out of the grid are read as cell 0 and their pairs are excluded from the other checks
+    cell = np.where(inside, flat, 0)
+
+    color = grid.color.array.ravel()[cell]
+    i, j = np.divmod(cell, m)
+    adjacent = np.abs(i[:, 0] - i[:, 1]) + np.abs(j[:, 0] - j[:, 1]) == 1
+    compatible = Grid.color_compatibility[color[:, 0], color[:, 1]]
+    if rules == "new rules":
+        white = (color == 0).any(axis=1)
+        adjacent |= white
+        compatible |= white
+
+    black = in_bounds & (color == 4).any(axis=1)
+    same = in_bounds & (cell[:, 0] == cell[:, 1])
+    checked = in_bounds & ~black & ~same
+
+    # A pair of a cell with itself only uses the cell once
+    used = cell[in_bounds]
+    used = np.concatenate((used[:, 0], used[used[:, 0] != used[:, 1], 1]))
+    count = np.bincount(used, minlength=n * m)
+    reused = in_bounds & ((count[cell[:, 0]] > 1) | (count[cell[:, 1]] > 1))
+
+    return PairValidation(grid, flat, {
+        "out_of_bounds": np.flatnonzero(~in_bounds),
+        "black_cell": np.flatnonzero(black),
+        "same_cell": np.flatnonzero(same),
+        "not_adjacent": np.flatnonzero(checked & ~adjacent),
+        "incompatible_colors": np.flatnonzero(checked & ~compatible),
+        "reused_cell": np.flatnonzero(reused),
+    })
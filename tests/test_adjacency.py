@@ -0,0 +1,73 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from color_grid_game import *
+import unittest
+
+class TestAdjacency(unittest.TestCase):
+
+    def test_csr_structure(self):
+        grid = Grid.grid_from_file("input/grid00.in", read_values=True)
+        adjacency = grid.adjacency("original rules")
+        self.assertEqual(len(adjacency), 7)
+        self.assertEqual(adjacency.indptr.tolist(), [0, 2, 5, 7, 9, 12, 14])
+        self.assertEqual(adjacency.neighbors(1).tolist(), [0, 2, 4])
+        self.assertEqual(adjacency.degrees().tolist(), [2, 3, 2, 2, 3, 2])
+        for cell in range(adjacency.n_cells):
+            for edge, other in zip(adjacency.incident_edges(cell).tolist(), adjacency.neighbors(cell).tolist()):
+                self.assertEqual({adjacency.u[edge], adjacency.v[edge]}, {cell, other})
+
+    def test_costs_and_weights(self):
+        grid = Grid.grid_from_file("input/grid00.in", read_values=True)
+        adjacency = grid.adjacency("original rules")
+        self.assertEqual(adjacency.pairs(), grid.all_pairs("original rules"))
+        for pair, cost, weight in zip(adjacency.pairs(), adjacency.cost.tolist(), adjacency.weight.tolist()):
+            (i1, j1), (i2, j2) = pair
+            self.assertEqual(cost, grid.cost(pair))
+            self.assertEqual(weight, cost - grid.value[i1][j1] - grid.value[i2][j2])
+
+    def test_new_rules_pairs_are_unique(self):
+        grid = Grid.grid_from_file("input/grid01.in", read_values=True)
+        adjacency = grid.adjacency("new rules")
+        # The white pairs are left implicit, the explicit pairs are the others
+        pairs = adjacency.pairs()
+        white = [(divmod(int(u), grid.m), divmod(int(v), grid.m)) for u, v in adjacency.white]
+        expected = set(tuple(sorted(pair)) for pair in grid.all_pairs("new rules"))
+        self.assertEqual(len(pairs) + len(white), len(set(pairs) | set(white)))
+        self.assertEqual(set(pairs) | set(white), expected)
+        self.assertFalse(any(grid.color[i][j] == 0 for pair in pairs for i, j in pair))
+
+    def test_cached(self):
+        grid = Grid.grid_from_file("input/grid01.in", read_values=True)
+        self.assertIs(grid.adjacency("original rules"), grid.adjacency("original rules"))
+        self.assertIsNot(grid.adjacency("original rules"), grid.adjacency("new rules"))
+
+    def test_invalidated_on_color_change(self):
+        grid = Grid.grid_from_file("input/grid00.in", read_values=True)
+        adjacency = grid.adjacency("original rules")
+        grid.color[0][0] = 4
+        self.assertIsNot(grid.adjacency("original rules"), adjacency)
+        self.assertEqual(len(grid.adjacency("original rules")), 5)
+
+    def test_invalidated_on_value_change(self):
+        grid = Grid.grid_from_file("input/grid00.in", read_values=True)
+        self.assertEqual(grid.adjacency("original rules").cost[0], 3)
+        grid.value[0, 1] = 5
+        self.assertEqual(grid.adjacency("original rules").cost[0], 0)
+
+    def test_invalidated_on_plane_assignment(self):
+        grid = Grid.grid_from_file("input/grid00.in", read_values=True)
+        grid.adjacency("original rules")
+        grid.color = [[4, 4, 4], [4, 4, 4]]
+        self.assertEqual(len(grid.adjacency("original rules")), 0)
+
+    def test_views_are_read_only(self):
+        grid = Grid(2, 2)
+        with self.assertRaises(ValueError):
+            grid.color[0:1][0, 0] = 4
+        with self.assertRaises(ValueError):
+            grid.adjacency().cost[:] = 0
+
+if __name__ == '__main__':
+    unittest.main()
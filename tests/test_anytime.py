@@ -0,0 +1,77 @@
+import sys
+import os
+import threading
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from color_grid_game import *
+import unittest
+
+class TestAnytime(unittest.TestCase):
+
+    def setUp(self):
+        self.grid = Grid.grid_from_file("input/grid19.in", read_values=True)
+
+    def run_solver(self, solver_class, grid=None, deadline=None, cancel=None):
+        solver = solver_class(self.grid if grid is None else grid)
+        solver.result_cache = None
+        solver.run(deadline, cancel)
+        return solver
+
+    def test_complete_runs(self):
+        self.assertTrue(self.run_solver(Solver_Hungarian).optimal)
+        self.assertTrue(self.run_solver(Solver_Blossom).optimal)
+        greedy = self.run_solver(Solver_Greedy)
+        self.assertFalse(greedy.optimal)
+        self.assertFalse(greedy.interrupted)
+        self.assertIsNone(Solver_Greedy(self.grid).optimal)
+
+    def test_expired_deadline(self):
+        deadline = time.monotonic()
+        for solver_class in (Solver_Greedy, Solver_Hungarian, Solver_Blossom, Solver_Ford_Fulkerson):
+            solver = self.run_solver(solver_class, deadline=deadline)
+            self.assertTrue(solver.interrupted)
+            self.assertFalse(solver.optimal)
+            self.assertTrue(solver.validate())
+            self.assertEqual(solver.pairs, [])
+
+    def test_greedy_upgraded_keeps_first_start(self):
+        grid = Grid.grid_from_file("input/grid13.in", read_values=True)
+        solver = self.run_solver(Solver_Greedy_Upgraded, grid, deadline=time.monotonic())
+        self.assertTrue(solver.interrupted)
+        self.assertEqual(solver.pairs, self.run_solver(Solver_Greedy, grid).pairs)
+
+    def test_cancel_from_thread(self):
+        grid = Grid.grid_from_file("input/grid21.in", read_values=True)
+        cancel = threading.Event()
+        timer = threading.Timer(0.05, cancel.set)
+        timer.start()
+        start = time.monotonic()
+        solver = self.run_solver(Solver_Hungarian, grid, cancel=cancel)
+        timer.join()
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertTrue(solver.interrupted)
+        self.assertTrue(solver.validate())
+
+    def test_interrupted_not_cached(self):
+        solver = Solver_Greedy(self.grid)
+        solver.result_cache = ResultCache()
+        solver.run(deadline=time.monotonic())
+        self.assertEqual(len(solver.result_cache), 0)
+        solver.run()
+        self.assertEqual(len(solver.result_cache), 1)
+        solver.run(deadline=time.monotonic())
+        self.assertFalse(solver.interrupted)
+        self.assertFalse(solver.optimal)
+
+    def test_edmonds_karp_stop(self):
+        graph = {"s": ["a"], "a": ["b"], "b": ["t"]}
+        self.assertEqual(Solver_Ford_Fulkerson.edmonds_karp(graph, {"a"}, {"b"}, lambda: True), [])
+        self.assertEqual(Solver_Ford_Fulkerson.edmonds_karp(graph, {"a"}, {"b"}, lambda: False), [("a", "b")])
+
+    def test_solve_deadline(self):
+        solver = solve(self.grid, deadline=time.monotonic())
+        self.assertTrue(solver.validate())
+        self.assertFalse(solver.optimal)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import sys
+import os
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from color_grid_game import *
+from color_grid_game.convert_grids import convert_grid_file
+import unittest
+
+class Test_BinaryGrid(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.file_name = os.path.join(self.tmp_dir.name, "grid.bin")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_round_trip(self):
+        grid = Grid.grid_from_file("input/grid05.in", read_values=True)
+        grid.to_binary(self.file_name)
+        loaded = Grid.from_binary(self.file_name)
+        self.assertEqual((loaded.n, loaded.m), (4, 8))
+        self.assertEqual(loaded.color, grid.color)
+        self.assertEqual(loaded.value, grid.value)
+        self.assertEqual(loaded.all_pairs(), grid.all_pairs())
+
+    def test_read_only_by_default(self):
+        Grid(2, 3).to_binary(self.file_name)
+        grid = Grid.from_binary(self.file_name)
+        with self.assertRaises(ValueError):
+            grid.color[0][0] = 4
+
+    def test_copy_on_write(self):
+        Grid(2, 3).to_binary(self.file_name)
+        grid = Grid.from_binary(self.file_name, mode="c")
+        grid.color[0][0] = 4
+        self.assertEqual(Grid.from_binary(self.file_name).color[0][0], 0)
+
+    def test_convert_grid_file(self):
+        output_name = convert_grid_file("input/grid01.in", self.file_name)
+        grid = Grid.from_binary(output_name)
+        self.assertEqual(grid.color, [[0, 4, 3], [2, 1, 0]])
+        self.assertEqual(grid.value, [[5, 8, 4], [11, 1, 3]])
+
+    def test_invalid_file(self):
+        with open(self.file_name, "wb") as file:
+            file.write(b"2 3\n0 0 0\n")
+        with self.assertRaises(ValueError):
+            Grid.from_binary(self.file_name)
+
+    def test_file_not_found(self):
+        with self.assertRaises(FileNotFoundError):
+            Grid.from_binary(os.path.join(self.tmp_dir.name, "missing.bin"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from color_grid_game import *
+import unittest
+
+class TestComponents(unittest.TestCase):
+
+    def test_labels(self):
+        grid = Grid(3, 4, [[0, 4, 0, 0], [0, 4, 4, 4], [4, 0, 3, 1]])
+        n_components, labels = grid.adjacency("original rules").components()
+        self.assertEqual(n_components, 3)
+        self.assertEqual(labels.tolist(), [0, -1, 1, 1, 0, -1, -1, -1, -1, 2, 2, -1])
+
+    def test_new_rules(self):
+        # A white cell joins every non-forbidden cell into a single component
+        grid = Grid(3, 4, [[0, 4, 1, 1], [4, 4, 4, 4], [4, 3, 3, 2]])
+        n_components, labels = grid.adjacency("new rules").components()
+        self.assertEqual(n_components, 1)
+        self.assertEqual(labels.tolist(), [0, -1, 0, 0, -1, -1, -1, -1, -1, 0, 0, 0])
+        grid.color[0][0] = 1
+        self.assertEqual(grid.adjacency("new rules").components()[0], 2)
+
+    def test_component_grids(self):
+        grid = Grid.grid_from_file("input/grid05.in", read_values=True)
+        solver = Solver_Hungarian(grid)
+        n_components, _ = grid.adjacency("original rules").components()
+        components = list(solver.component_grids())
+        self.assertEqual(len(components), n_components)
+        for i0, j0, size, component in components:
+            self.assertEqual((i0 + j0) % 2, 0)
+            self.assertEqual(component.adjacency("original rules").components()[0], 1)
+            self.assertEqual(int((component.adjacency("original rules").degrees() > 0).sum()), size)
+
+    def test_same_score(self):
+        grid = Grid.grid_from_file("input/grid17.in", read_values=True)
+        for solver_class in (Solver_Hungarian, Solver_Blossom):
+            decomposed = solver_class(grid)
+            decomposed.run()
+            single = solver_class(grid)
+            single.decompose = False
+            single.run()
+            self.assertEqual(decomposed.score(), single.score())
+
+    def test_process_pool(self):
+        grid = Grid.grid_from_file("input/grid05.in", read_values=True)
+        solver = Solver_Blossom(grid)
+        solver.workers = 2
+        solver.parallel_threshold = 1
+        solver.run()
+        single = Solver_Blossom(grid)
+        single.workers = 1
+        single.run()
+        self.assertEqual(sorted(map(sorted, solver.pairs)), sorted(map(sorted, single.pairs)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -33,6 +33,20 @@ class Test_Cost(unittest.TestCase):
         # in practice since black cells are excluded from pairs)
         pair = ((0, 1), (3, 0))
         self.assertEqual(grid.cost(pair), 4) 
+
+    def test_flat_indices(self):
+        grid = Grid.grid_from_file("input/grid00.in", read_values=True)
+        self.assertEqual(grid.cost((0, 1)), 3)
+        self.assertEqual(grid.cost((np.int32(0), np.int32(3))), 6)
+        with self.assertRaises(ValueError):
+            grid.cost((0, 6))
+
+    def test_pair_array(self):
+        grid = Grid.grid_from_file("input/grid00.in", read_values=True)
+        costs = grid.cost(np.array([[0, 1], [0, 3], [4, 5]], dtype=np.int32))
+        self.assertEqual(costs.tolist(), [3, 6, 2])
+        with self.assertRaises(ValueError):
+            grid.cost(np.array([[0, -1]]))
         
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
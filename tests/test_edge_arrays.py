@@ -0,0 +1,40 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from color_grid_game import *
+import unittest
+
+class TestEdgeArrays(unittest.TestCase):
+
+    def test_simple_grid(self):
+        grid = Grid.grid_from_file("input/grid00.in", read_values=True)
+        u, v, cost = grid.edge_arrays("original rules")
+        self.assertEqual(u.tolist(), [0, 0, 1, 1, 2, 3, 4])
+        self.assertEqual(v.tolist(), [1, 3, 2, 4, 5, 4, 5])
+        self.assertEqual(cost.tolist(), [3, 6, 4, 7, 1, 10, 2])
+
+    def test_costs_match_cost(self):
+        grid = Grid.grid_from_file("input/grid05.in", read_values=True)
+        u, v, cost = grid.edge_arrays("original rules")
+        for a, b, c in zip(u.tolist(), v.tolist(), cost.tolist()):
+            self.assertEqual(grid.cost((divmod(a, grid.m), divmod(b, grid.m))), c)
+
+    def test_color_compatibility(self):
+        grid = Grid(1, 5, [[3, 1, 2, 4, 0]], [[1, 2, 3, 4, 5]])
+        u, v, _ = grid.edge_arrays("original rules")
+        self.assertEqual(list(zip(u.tolist(), v.tolist())), [(1, 2)])
+
+    def test_new_rules_matches_all_pairs(self):
+        grid = Grid.grid_from_file("input/grid01.in", read_values=True)
+        u, v, _ = grid.edge_arrays("new rules")
+        pairs = [(divmod(a, grid.m), divmod(b, grid.m)) for a, b in zip(u.tolist(), v.tolist())]
+        self.assertEqual(pairs, grid.all_pairs("new rules"))
+
+    def test_unrecognized_rules(self):
+        grid = Grid(2, 2)
+        with self.assertRaises(ValueError):
+            grid.edge_arrays("other rules")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import sys
+import os
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from color_grid_game import *
+from color_grid_game.generate import generate_grid, write_grid
+import unittest
+
+class TestGenerate(unittest.TestCase):
+
+    def test_reproducible(self):
+        self.assertEqual(generate_grid(20, 30, seed=5), generate_grid(20, 30, seed=5))
+        self.assertNotEqual(generate_grid(20, 30, seed=5), generate_grid(20, 30, seed=6))
+        self.assertEqual(generate_grid(20, 30, seed=5, correlation=4), generate_grid(20, 30, seed=5, correlation=4))
+
+    def test_distribution(self):
+        grid = generate_grid(200, 300, seed=1, color_weights=(0, 1, 0, 3), black_density=0.5, value_range=(3, 7))
+        color = grid.color.array
+        value = grid.value.array
+        self.assertEqual((grid.n, grid.m), (200, 300))
+        self.assertFalse(((color == 0) | (color == 2)).any())
+        self.assertAlmostEqual((color == 4).mean(), 0.5, delta=0.02)
+        self.assertAlmostEqual((color == 3).mean() / (color == 1).mean(), 3, delta=0.2)
+        self.assertEqual((value.min(), value.max()), (3, 7))
+
+    def test_correlation(self):
+        independent = generate_grid(100, 100, seed=2, black_density=0)
+        correlated = generate_grid(100, 100, seed=2, black_density=0, correlation=8)
+        def same_as_right(grid):
+            color = grid.color.array
+            return (color[:, 1:] == color[:, :-1]).mean()
+        self.assertGreater(same_as_right(correlated), same_as_right(independent) + 0.3)
+        self.assertAlmostEqual((correlated.color.array == 0).mean(), 0.25, delta=0.01)
+
+    def test_invalid_parameters(self):
+        with self.assertRaises(ValueError):
+            generate_grid(0, 5)
+        with self.assertRaises(ValueError):
+            generate_grid(5, 5, color_weights=(1, 1, 1))
+        with self.assertRaises(ValueError):
+            generate_grid(5, 5, black_density=1.5)
+        with self.assertRaises(ValueError):
+            generate_grid(5, 5, value_range=(4, 2))
+
+    def test_write_grid(self):
+        grid = generate_grid(15, 25, seed=3)
+        with tempfile.TemporaryDirectory() as directory:
+            base_name = os.path.join(directory, "grid")
+            file_names = write_grid(grid, base_name, formats=("in", "bin", "tiles"))
+            self.assertEqual(file_names, [base_name + ".in", base_name + ".bin", base_name + ".tiles"])
+            self.assertEqual(Grid.grid_from_file(base_name + ".in", read_values=True), grid)
+            self.assertEqual(Grid.from_binary(base_name + ".bin"), grid)
+            self.assertEqual(TiledGrid(base_name + ".tiles").to_grid(), grid)
+            with self.assertRaises(ValueError):
+                write_grid(grid, base_name, formats=("csv",))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import sys
+import os
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from color_grid_game import *
+import unittest
+
+class TestGridFingerprint(unittest.TestCase):
+
+    def test_equal_content(self):
+        grid = Grid.grid_from_file("input/grid02.in", read_values=True)
+        grid_copy = Grid(grid.n, grid.m, grid.color.tolist(), grid.value.tolist())
+        self.assertEqual(grid.fingerprint(), grid_copy.fingerprint())
+        self.assertEqual(len(grid.fingerprint()), 32)
+        self.assertEqual(grid, grid_copy)
+        self.assertEqual(hash(grid), hash(grid_copy))
+        self.assertEqual(len({grid, grid_copy}), 1)
+
+    def test_binary_grid(self):
+        grid = Grid.grid_from_file("input/grid05.in", read_values=True)
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "grid05.bin")
+            grid.to_binary(file_name)
+            self.assertEqual(Grid.from_binary(file_name).fingerprint(), grid.fingerprint())
+
+    def test_different_content(self):
+        grid = Grid(2, 3)
+        self.assertNotEqual(grid.fingerprint(), Grid(3, 2).fingerprint())
+        self.assertNotEqual(grid, Grid(3, 2))
+        self.assertNotEqual(grid, Grid(2, 3, value=[[1, 1, 1], [1, 1, 2]]))
+        self.assertNotEqual(grid, "grid")
+
+    def test_invalidated_on_mutation(self):
+        grid = Grid(2, 3)
+        fingerprint = grid.fingerprint()
+        self.assertIs(grid.fingerprint(), fingerprint)
+        grid.color[0][1] = 2
+        self.assertNotEqual(grid.fingerprint(), fingerprint)
+        grid.color[0][1] = 0
+        self.assertEqual(grid.fingerprint(), fingerprint)
+        grid.value = [[1, 1, 1], [1, 1, 5]]
+        self.assertNotEqual(grid.fingerprint(), fingerprint)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,6 @@
 import sys
 import os
+import tempfile
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from color_grid_game import *
@@ -35,5 +36,53 @@ class Test_GridLoading(unittest.TestCase):
         self.assertEqual(grid.color, [[0, 4, 3], [2, 1, 0]])
         self.assertEqual(grid.value, [[1, 1, 1], [1, 1, 1]])
 
+    def load_text(self, text, read_values=True):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_name = os.path.join(tmp_dir, "grid.in")
+            with open(file_name, "w") as file:
+                file.write(text)
+            return Grid.grid_from_file(file_name, read_values=read_values)
+
+    def test_grid21(self):
+        grid = Grid.grid_from_file("input/grid21.in", read_values=True)
+        self.assertEqual(grid.n, 100)
+        self.assertEqual(grid.m, 200)
+        self.assertEqual(grid.color[0][:5].tolist(), [0, 4, 4, 0, 4])
+
+    def test_no_trailing_newline(self):
+        grid = self.load_text("2 2\n0 1\n2 3\n5 6\n7 8")
+        self.assertEqual(grid.value, [[5, 6], [7, 8]])
+
+    def test_invalid_color(self):
+        with self.assertRaisesRegex(ValueError, "Invalid color"):
+            self.load_text("2 2\n0 5\n2 3\n5 6\n7 8\n")
+
+    def test_incorrect_format(self):
+        with self.assertRaisesRegex(ValueError, "Incorrect format"):
+            self.load_text("2 2\n0 1 2\n2 3\n5 6\n7 8\n")
+        with self.assertRaisesRegex(ValueError, "Incorrect format"):
+            self.load_text("2 2\n0 1\n2 3\n5 6\n")
+
+    def test_invalid_color_before_incorrect_format(self):
+        with self.assertRaisesRegex(ValueError, "Invalid color"):
+            self.load_text("2 2\n0 7\n2\n")
+
+    def test_missing_values_ignored(self):
+        grid = self.load_text("2 2\n0 1\n2 3\n", read_values=False)
+        self.assertEqual(grid.value, [[1, 1], [1, 1]])
+
+    def test_to_file(self):
+        with open("input/grid11.in", "rb") as file:
+            content = file.read()
+        grid = Grid.grid_from_file("input/grid11.in", read_values=True)
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "grid.in")
+            grid.to_file(file_name)
+            with open(file_name, "rb") as file:
+                self.assertEqual(file.read(), content)
+            grid = Grid(2, 3, [[0, 4, 3], [2, 1, 0]], [[-5, 0, 123456789], [7, -100, 99]])
+            grid.to_file(file_name)
+            self.assertEqual(Grid.grid_from_file(file_name, read_values=True), grid)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,65 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from color_grid_game import *
+import unittest
+import copy
+import pickle
+
+class Test_GridStorage(unittest.TestCase):
+
+    def test_compact_dtypes(self):
+        grid = Grid.grid_from_file("input/grid21.in", read_values=True)
+        self.assertEqual(grid.color.dtype, np.int8)
+        self.assertEqual(grid.value.dtype, np.int32)
+        self.assertEqual(grid.color.shape, (100, 200))
+        self.assertTrue(grid.color.array.flags['C_CONTIGUOUS'])
+
+    def test_list_compatible_access(self):
+        grid = Grid.grid_from_file("input/grid01.in", read_values=True)
+        self.assertEqual(grid.color[0][1], 4)
+        self.assertEqual(grid.color[1, 0], 2)
+        self.assertEqual(grid.value[1][0], 11)
+        self.assertEqual(grid.value.tolist(), [[5, 8, 4], [11, 1, 3]])
+
+    def test_write_access(self):
+        grid = Grid(2, 2, [[0, 1], [2, 3]], [[5, 6], [7, 8]])
+        grid.color[0][0] = 4
+        grid.value[1, 1] = 2
+        self.assertTrue(grid.is_forbidden(0, 0))
+        self.assertEqual(grid.value, [[5, 6], [7, 2]])
+
+    def test_copy_is_independent(self):
+        grid = Grid(2, 2, [[0, 1], [2, 3]], [[5, 6], [7, 8]])
+        grid_copy = Grid(grid.n, grid.m, [row.copy() for row in grid.color], [row.copy() for row in grid.value])
+        grid_copy.color[0][0] = 4
+        self.assertEqual(grid.color[0][0], 0)
+        self.assertNotEqual(grid.color, grid_copy.color)
+
+    def test_pickle_and_deepcopy(self):
+        # The copies keep reading their own array after a write
+        grid = Grid(2, 2, [[0, 1], [2, 1]], [[5, 6], [7, 8]])
+        grid.adjacency()
+        for grid_copy in (pickle.loads(pickle.dumps(grid)), copy.deepcopy(grid)):
+            grid_copy.color[0][0] = 4
+            grid_copy.value[1, 1] = 2
+            self.assertEqual(grid_copy.color[0][0], 4)
+            self.assertEqual(grid_copy.color[0, 0], 4)
+            self.assertEqual(list(grid_copy.value[1]), [7, 2])
+            self.assertTrue(grid_copy.is_forbidden(0, 0))
+            fresh = Grid(2, 2, [[4, 1], [2, 1]], [[5, 6], [7, 2]])
+            self.assertEqual(grid_copy.adjacency().pairs(), fresh.adjacency().pairs())
+            self.assertEqual(grid.color[0][0], 0)
+
+    def test_wrong_shape(self):
+        with self.assertRaises(ValueError):
+            Grid(2, 2, [[0, 1, 2], [2, 3, 0]])
+
+    def test_no_instance_dict(self):
+        grid = Grid(2, 2)
+        with self.assertRaises(AttributeError):
+            grid.extra = 1
+
+if __name__ == '__main__':
+    unittest.main()
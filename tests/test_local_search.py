@@ -0,0 +1,79 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from color_grid_game import *
+import unittest
+
+class TestLocalSearch(unittest.TestCase):
+
+    def run_solver(self, solver_class, grid, rules="original rules"):
+        solver = solver_class(grid, rules)
+        solver.result_cache = None
+        solver.run()
+        return solver
+
+    def test_improves_heuristics(self):
+        for name in ("grid05", "grid17", "grid19"):
+            grid = Grid.grid_from_file(f"input/{name}.in", read_values=True)
+            for rules in ("original rules", "new rules"):
+                optimum = self.run_solver(Solver_Blossom, grid, rules).score()
+                solver = self.run_solver(Solver_Greedy, grid, rules)
+                score = solver.score()
+                solver.improve(max_length=3)
+                self.assertTrue(solver.validate())
+                self.assertLessEqual(solver.score(), score)
+                self.assertGreaterEqual(solver.score(), optimum)
+
+    def test_reaches_optimum(self):
+        # Under the new rules the white cells need more than the default number of neighbors
+        grid = Grid.grid_from_file("input/grid17.in", read_values=True)
+        for rules, max_neighbors in (("original rules", 8), ("new rules", grid.n * grid.m)):
+            solver = self.run_solver(Solver_Greedy, grid, rules)
+            solver.improve(max_neighbors=max_neighbors)
+            self.assertEqual(solver.score(), self.run_solver(Solver_Blossom, grid, rules).score())
+
+    def test_max_neighbors(self):
+        # Every cell is white: each cell has 99 pairs, a path may only use the 2 best ones
+        grid = Grid(10, 10, np.zeros((10, 10), dtype=int), np.arange(100).reshape(10, 10) % 7 + 1)
+        pairs = self.run_solver(Solver_Greedy, grid, "new rules").pairs_array
+        score = ScoreTracker(grid, "new rules", pairs.tolist()).score
+        for max_neighbors in (1, 2):
+            improved = improve_pairs(grid, pairs, "new rules", max_neighbors=max_neighbors)
+            self.assertTrue(validate_pairs(grid, improved, "new rules").valid)
+            self.assertLessEqual(ScoreTracker(grid, "new rules", improved.tolist()).score, score)
+
+    def test_cycle(self):
+        # Swapping the two vertical pairs for the two horizontal ones lowers the score by 8
+        grid = Grid(2, 2, [[0, 0], [0, 0]], [[5, 5], [1, 1]])
+        vertical = [((0, 0), (1, 0)), ((0, 1), (1, 1))]
+        for max_length in (3, 4):
+            pairs = improve_pairs(grid, vertical, max_length=max_length)
+            self.assertEqual(sorted(pairs.tolist()), [[0, 1], [2, 3]])
+
+    def test_optimal_unchanged(self):
+        grid = Grid.grid_from_file("input/grid19.in", read_values=True)
+        pairs = self.run_solver(Solver_Blossom, grid).pairs_array
+        improved = improve_pairs(grid, pairs)
+        self.assertEqual(sorted(map(sorted, improved.tolist())), sorted(map(sorted, pairs.tolist())))
+
+    def test_stopped(self):
+        grid = Grid.grid_from_file("input/grid17.in", read_values=True)
+        pairs = self.run_solver(Solver_Greedy, grid).pairs_array
+        improved = improve_pairs(grid, pairs, should_stop=lambda: True)
+        self.assertEqual(sorted(map(sorted, improved.tolist())), sorted(map(sorted, pairs.tolist())))
+
+    def test_invalid_pairs(self):
+        grid = Grid.grid_from_file("input/grid00.in", read_values=True)
+        with self.assertRaises(ValueError):
+            improve_pairs(grid, [((0, 0), (1, 1))])
+
+    def test_solve(self):
+        grid = Grid.grid_from_file("input/grid17.in", read_values=True)
+        plain = solve(grid, budget=0, improve=False)
+        improved = solve(grid, budget=0)
+        self.assertIs(type(improved), type(plain))
+        self.assertLess(improved.score(), plain.score())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from color_grid_game import *
+from color_grid_game.generate import generate_grid
+import unittest
+
+class TestLowerBound(unittest.TestCase):
+
+    def test_below_optimum(self):
+        for seed in range(4):
+            grid = generate_grid(12, 15, seed=seed, black_density=0.15, correlation=seed)
+            for rules in ("original rules", "new rules"):
+                solver = Solver_Blossom(grid, rules)
+                solver.run()
+                self.assertLessEqual(lower_bound(grid, rules), solver.score())
+                self.assertGreaterEqual(solver.gap, 0)
+
+    def test_close_to_optimum(self):
+        grid = Grid.grid_from_file("input/grid19.in", read_values=True)
+        solver = solve(grid)
+        self.assertLessEqual(solver.gap, 0.05 * solver.score())
+
+    def test_duals_feasible(self):
+        grid = Grid.grid_from_file("input/grid17.in", read_values=True)
+        for rules in ("original rules", "new rules"):
+            adjacency = grid.adjacency(rules)
+            duals = matching_duals(grid, rules)
+            self.assertTrue((duals >= 0).all())
+            self.assertTrue((duals[adjacency.u] + duals[adjacency.v] >= -adjacency.weight - 1e-9).all())
+
+    def test_without_pairs(self):
+        grid = Grid(2, 2, [[4, 1], [3, 4]], [[5, 2], [7, 1]])
+        self.assertEqual(lower_bound(grid), 9)
+        solver = Solver_Empty(grid)
+        solver.run()
+        self.assertEqual(solver.lower_bound, 9)
+        self.assertEqual(solver.gap, 0)
+
+    def test_cached(self):
+        grid = Grid.grid_from_file("input/grid05.in", read_values=True)
+        bound = lower_bound(grid)
+        self.assertTrue(grid._has_cached(("lower_bound", "original rules", 200)))
+        self.assertEqual(lower_bound(grid), bound)
+        grid.value[0][0] = grid.value[0][0] + 1
+        self.assertFalse(grid._has_cached(("lower_bound", "original rules", 200)))
+
+    def test_solve_tolerance(self):
+        # The sorted greedy pairing of grid13 reaches the lower bound
+        grid = Grid.grid_from_file("input/grid13.in", read_values=True)
+        solver = solve(grid, tolerance=0)
+        self.assertIsInstance(solver, Solver_Greedy_Sorted)
+        self.assertEqual(solver.gap, 0)
+        grid = Grid.grid_from_file("input/grid19.in", read_values=True)
+        solver = solve(grid, tolerance=0)
+        self.assertIn("original rules", type(solver).exact_rules)
+
+if __name__ == '__main__':
+    unittest.main()
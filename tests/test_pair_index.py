@@ -0,0 +1,86 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from color_grid_game import *
+import unittest
+
+class TestPairIndex(unittest.TestCase):
+
+    def blackened(self, grid, cells):
+        copy = Grid(grid.n, grid.m, [row.tolist() for row in grid.color], [row.tolist() for row in grid.value])
+        for i, j in cells:
+            copy.color[i][j] = 4
+        return copy
+
+    def test_initial_state(self):
+        grid = Grid.grid_from_file("input/grid00.in", read_values=True)
+        index = grid.pair_index("original rules")
+        self.assertEqual(len(index), 7)
+        self.assertEqual(index.available_pairs(), grid.all_pairs("original rules"))
+
+    def test_block_and_unblock(self):
+        grid = Grid.grid_from_file("input/grid01.in", read_values=True)
+        index = grid.pair_index("original rules")
+        total = len(index)
+        index.block_pair(((0, 0), (0, 1)))
+        self.assertEqual(index.available_pairs(), self.blackened(grid, [(0, 0), (0, 1)]).all_pairs("original rules"))
+        self.assertFalse(index.is_available(((0, 0), (1, 0))))
+        index.unblock_pair(((0, 0), (0, 1)))
+        self.assertEqual(len(index), total)
+
+    def test_set_blocked(self):
+        grid = Grid.grid_from_file("input/grid02.in", read_values=True)
+        for rules in ("original rules", "new rules"):
+            index = grid.pair_index(rules)
+            index.set_blocked([(0, 0), (1, 1)])
+            # Cells blocked directly are unblocked by the next sync
+            index.block_cell((0, 1))
+            index.set_blocked([(1, 1), (1, 2)])
+            self.assertEqual(np.flatnonzero(index.blocked).tolist(), [grid.m + 1, grid.m + 2])
+            expected = set(tuple(sorted(pair)) for pair in self.blackened(grid, [(1, 1), (1, 2)]).all_pairs(rules))
+            self.assertEqual(set(tuple(sorted(pair)) for pair in index.available_pairs()), expected)
+            self.assertEqual(len(index), len(expected))
+
+    def test_min_cost_pair(self):
+        grid = Grid.grid_from_file("input/grid01.in", read_values=True)
+        index = grid.pair_index("original rules")
+        pairs = grid.all_pairs("original rules")
+        self.assertEqual(index.min_cost_pair(), min(pairs, key=grid.cost))
+        index.set_blocked([cell for pair in pairs for cell in pair])
+        self.assertIsNone(index.min_cost_pair())
+
+    def test_new_rules(self):
+        # The implicit white pairs are counted and searched like the explicit ones
+        grid = Grid.grid_from_file("input/grid05.in", read_values=True)
+        index = grid.pair_index("new rules")
+        pairs = sorted(set(tuple(sorted(pair)) for pair in grid.all_pairs("new rules")))
+        rng = np.random.default_rng(0)
+        blocked = set()
+        for _ in range(40):
+            cell = divmod(int(rng.integers(grid.n * grid.m)), grid.m)
+            if cell in blocked:
+                index.unblock_cell(cell)
+                blocked.discard(cell)
+            else:
+                index.block_cell(cell)
+                blocked.add(cell)
+            available = [pair for pair in pairs if pair[0] not in blocked and pair[1] not in blocked]
+            self.assertEqual(len(index), len(available))
+            self.assertEqual(index.available_pairs(), available)
+            self.assertEqual(index.min_cost_pair(), min(available, key=grid.cost, default=None))
+            self.assertTrue(all(index.is_available(pair) == (pair in available) for pair in pairs[:20]))
+
+    def test_errors(self):
+        grid = Grid.grid_from_file("input/grid00.in", read_values=True)
+        index = grid.pair_index("original rules")
+        with self.assertRaises(IndexError):
+            index.block_cell((5, 0))
+        with self.assertRaises(ValueError):
+            index.unblock_cell((0, 0))
+        index.block_cell((0, 0))
+        with self.assertRaises(ValueError):
+            index.block_cell((0, 0))
+
+if __name__ == '__main__':
+    unittest.main()
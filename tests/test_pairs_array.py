@@ -0,0 +1,56 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from color_grid_game import *
+import unittest
+
+class TestPairsArray(unittest.TestCase):
+
+    def test_conversions(self):
+        grid = Grid.grid_from_file("input/grid02.in", read_values=True)
+        pairs = [((0, 0), (1, 0)), ((1, 1), (1, 2))]
+        array = grid.pairs_to_array(pairs)
+        self.assertEqual(array.dtype, np.int32)
+        self.assertEqual(array.tolist(), [[0, 3], [4, 5]])
+        self.assertEqual(grid.array_to_pairs(array), pairs)
+        self.assertEqual(grid.pairs_to_array([]).shape, (0, 2))
+        with self.assertRaises(ValueError):
+            grid.pairs_to_array([((0, 0), (2, 0))])
+
+    def test_solver_forms(self):
+        grid = Grid.grid_from_file("input/grid02.in", read_values=True)
+        solver = Solver_Empty(grid)
+        solver.pairs_array = np.array([[0, 3], [4, 5]])
+        self.assertEqual(solver.score(), 1)
+        self.assertEqual(solver.pairs, [((0, 0), (1, 0)), ((1, 1), (1, 2))])
+        # The list can then be modified in place
+        solver.pairs.pop()
+        self.assertEqual(solver.pairs_array.tolist(), [[0, 3]])
+        self.assertEqual(solver.score(), 3)
+
+    def test_run_array(self):
+        grid = Grid.grid_from_file("input/grid17.in", read_values=True)
+        for solver_class in (Solver_Greedy, Solver_Greedy_Upgraded, Solver_Ford_Fulkerson, Solver_Hungarian, Solver_Blossom):
+            solver = solver_class(grid)
+            array = solver.run_array()
+            self.assertEqual(array.shape[1], 2)
+            self.assertEqual(array.dtype, np.int32)
+            score = solver.score()
+            reference = solver_class(grid)
+            self.assertEqual(reference.run(), grid.array_to_pairs(array))
+            self.assertEqual(reference.score(), score)
+
+    def test_hungarian_order(self):
+        # The rows of the assignment are the even cells by ascending flat index, whatever the
+        # hash seed of the interpreter
+        grid = Grid.grid_from_file("input/grid17.in", read_values=True)
+        solver = Solver_Hungarian(grid)
+        solver.result_cache = None
+        solver.decompose = False
+        array = solver.run_array()
+        self.assertTrue(np.all((array[:, 0] // grid.m + array[:, 0] % grid.m) % 2 == 0))
+        self.assertTrue(np.all(np.diff(array[:, 0]) > 0))
+
+if __name__ == '__main__':
+    unittest.main()
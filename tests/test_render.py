@@ -0,0 +1,44 @@
+import sys
+import os
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from color_grid_game import *
+import unittest
+
+class TestRender(unittest.TestCase):
+
+    def test_to_rgb(self):
+        grid = Grid(2, 3, [[0, 1, 2], [3, 4, 0]])
+        rgb = grid.to_rgb()
+        self.assertEqual(rgb.shape, (2, 3, 3))
+        self.assertEqual(rgb.dtype, np.uint8)
+        self.assertEqual(rgb[0].tolist(), [[255, 255, 255], [255, 0, 0], [0, 0, 255]])
+        self.assertEqual(rgb[1].tolist(), [[0, 128, 0], [0, 0, 0], [255, 255, 255]])
+        self.assertEqual(grid.to_rgb(scale=4).shape, (8, 12, 3))
+
+    def test_labels(self):
+        grid = Grid(1, 2, [[0, 4]], [[7, 12]])
+        rgb = grid.to_rgb(scale=10, labels=True)
+        white_cell, black_cell = rgb[:, :10], rgb[:, 10:]
+        self.assertTrue((white_cell == 0).any())
+        self.assertTrue((black_cell == 255).any())
+        self.assertEqual(white_cell[0, 0].tolist(), [255, 255, 255])
+        # Labels that do not fit in the cells are skipped
+        self.assertTrue((grid.to_rgb(scale=3, labels=True) == grid.to_rgb(scale=3)).all())
+
+    def test_png(self):
+        grid = Grid.grid_from_file("input/grid05.in", read_values=True)
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "grid05.png")
+            grid.to_png(file_name, scale=9)
+            image = plt.imread(file_name)
+        self.assertEqual(image.shape, (grid.n * 9, grid.m * 9, 3))
+        self.assertTrue(((image * 255).round().astype(np.uint8) == grid.to_rgb(scale=9, labels=True)).all())
+
+    def test_png_shape(self):
+        with self.assertRaises(ValueError):
+            write_png(os.devnull, np.zeros((2, 2), dtype=np.uint8))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import sys
+import os
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from color_grid_game import *
+import unittest
+
+class Solver_Counting(Solver_Greedy):
+    """
+    Greedy solver counting the grids it actually solves.
+    """
+
+    calls = 0
+
+    def run_single(self):
+        Solver_Counting.calls += 1
+        return super().run_single()
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.grid = Grid.grid_from_file("input/grid05.in", read_values=True)
+        self.pairs = np.array([[0, 1], [2, 3]], dtype=np.int32)
+
+    def test_memory(self):
+        cache = ResultCache(max_entries=2)
+        self.assertIsNone(cache.get(self.grid, "original rules", "A"))
+        cache.put(self.grid, "original rules", "A", self.pairs)
+        cache.put(self.grid, "new rules", "A", self.pairs)
+        pairs = cache.get(self.grid, "original rules", "A")
+        np.testing.assert_array_equal(pairs, self.pairs)
+        self.assertFalse(pairs.flags.writeable)
+        # "new rules" is now the least recently used result
+        cache.put(self.grid, "original rules", "B", self.pairs)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get(self.grid, "new rules", "A"))
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_key(self):
+        key = ResultCache.key(self.grid, "original rules", "A")
+        self.assertNotEqual(key, ResultCache.key(self.grid, "new rules", "A"))
+        self.assertNotEqual(key, ResultCache.key(self.grid, "original rules", "B"))
+        grid = Grid.grid_from_file("input/grid05.in", read_values=True)
+        self.assertEqual(key, ResultCache.key(grid, "original rules", "A"))
+        grid.value[0][0] = grid.value[0][0] + 1
+        self.assertNotEqual(key, ResultCache.key(grid, "original rules", "A"))
+
+    def test_disk(self):
+        with tempfile.TemporaryDirectory() as directory:
+            ResultCache(directory).put(self.grid, "original rules", "A", self.pairs)
+            cache = ResultCache(directory)
+            np.testing.assert_array_equal(cache.get(self.grid, "original rules", "A"), self.pairs)
+            cache.clear()
+            self.assertIsNone(ResultCache(directory).get(self.grid, "original rules", "A"))
+
+    def test_disk_corrupted(self):
+        with tempfile.TemporaryDirectory() as directory:
+            ResultCache(directory).put(self.grid, "original rules", "A", self.pairs)
+            key = ResultCache.key(self.grid, "original rules", "A")
+            with open(os.path.join(directory, key + ResultCache.suffix), "r+b") as file:
+                file.seek(20)
+                file.write(b"garbage")
+            self.assertIsNone(ResultCache(directory).get(self.grid, "original rules", "A"))
+
+    def test_disk_eviction(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ResultCache(directory, max_bytes=100)
+            pairs = np.arange(40, dtype=np.int32).reshape(-1, 2)
+            cache.put(self.grid, "original rules", "A", pairs)
+            os.utime(os.path.join(directory, ResultCache.key(self.grid, "original rules", "A") + ResultCache.suffix), (0, 0))
+            cache.put(self.grid, "original rules", "B", pairs)
+            files = os.listdir(directory)
+            self.assertEqual(files, [ResultCache.key(self.grid, "original rules", "B") + ResultCache.suffix])
+
+    def test_solver_run(self):
+        with tempfile.TemporaryDirectory() as directory:
+            Solver_Counting.calls = 0
+            for cache in (ResultCache(directory), ResultCache(directory)):
+                solver = Solver_Counting(self.grid)
+                solver.result_cache = cache
+                pairs = solver.run()
+                self.assertEqual(Solver_Counting.calls, 1)
+            reference = Solver_Greedy(self.grid)
+            reference.result_cache = None
+            self.assertEqual(pairs, reference.run())
+            self.assertEqual(solver.score(), reference.score())
+
+    def test_components_not_cached(self):
+        grid = Grid.grid_from_file("input/grid13.in", read_values=True)
+        self.assertGreater(grid.adjacency().components()[0], 1)
+        solver = Solver_Hungarian(grid)
+        solver.result_cache = ResultCache()
+        solver.run()
+        self.assertEqual(len(solver.result_cache), 1)
+
+    def test_empty_not_cached(self):
+        solver = Solver_Empty(self.grid)
+        solver.result_cache = ResultCache()
+        solver.run()
+        self.assertEqual(len(solver.result_cache), 0)
+
+    def test_disabled_by_default(self):
+        # Caching is enabled by the applications, a solver does not share results by default
+        solver = Solver_Greedy(self.grid)
+        self.assertIsNone(solver.result_cache)
+        solver.run()
+        self.assertIsNone(Solver.result_cache)
+
+if __name__ == '__main__':
+    unittest.main()
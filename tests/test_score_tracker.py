@@ -0,0 +1,106 @@
+import sys
+import os
+import random
+import importlib.util
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from color_grid_game import *
+import unittest
+
+class TestScoreTracker(unittest.TestCase):
+
+    def test_empty(self):
+        grid = Grid.grid_from_file("input/grid01.in", read_values=True)
+        tracker = ScoreTracker(grid)
+        self.assertEqual(tracker.score, 24)
+        self.assertEqual(tracker.unpaired_value, 24)
+        self.assertEqual(len(tracker), 0)
+
+    def test_add_and_remove(self):
+        grid = Grid.grid_from_file("input/grid01.in", read_values=True)
+        tracker = ScoreTracker(grid)
+        self.assertEqual(tracker.add_pair(((0, 0), (1, 0))), 14)
+        self.assertEqual(tracker.add_pair((4, 5)), 12)
+        self.assertEqual(tracker.unpaired_value, 4)
+        self.assertTrue(tracker.is_occupied((1, 1)))
+        self.assertEqual(tracker.partner((1, 0)), (0, 0))
+        self.assertEqual(tracker.occupied.tolist(), [True, False, False, True, True, True])
+        self.assertEqual(tracker.remove_pair(((1, 0), (0, 0))), 22)
+        self.assertIsNone(tracker.partner((0, 0)))
+        self.assertEqual(len(tracker), 1)
+
+    def test_matches_solver_score(self):
+        grid = Grid.grid_from_file("input/grid17.in", read_values=True)
+        random.seed(0)
+        for rules in ("original rules", "new rules"):
+            pairs = grid.all_pairs(rules)
+            random.shuffle(pairs)
+            tracker = ScoreTracker(grid, rules)
+            solver = Solver(grid, rules)
+            for pair in pairs[:300]:
+                if not tracker.is_occupied(pair[0]) and not tracker.is_occupied(pair[1]):
+                    tracker.add_pair(pair)
+                    solver.pairs.append(pair)
+            for pair in solver.pairs[::3]:
+                tracker.remove_pair(pair)
+            solver.pairs = [pair for pair in solver.pairs if tracker.partner(pair[0]) == pair[1]]
+            self.assertEqual(tracker.score, solver.score())
+            self.assertEqual(ScoreTracker(grid, rules, solver.pairs).score, tracker.score)
+
+    def test_validation(self):
+        grid = Grid.grid_from_file("input/grid01.in", read_values=True)
+        tracker = ScoreTracker(grid)
+        with self.assertRaises(ValueError):
+            tracker.add_pair(((0, 0), (0, 1)))  # Black cell
+        with self.assertRaises(ValueError):
+            tracker.add_pair(((0, 0), (1, 1)))  # Not adjacent
+        with self.assertRaises(ValueError):
+            tracker.add_pair(((0, 0), (2, 0)))  # Out of the grid
+        tracker.add_pair(((0, 0), (1, 0)))
+        with self.assertRaises(ValueError):
+            tracker.add_pair(((1, 0), (1, 1)))  # Already paired
+        with self.assertRaises(ValueError):
+            tracker.remove_pair(((1, 1), (1, 2)))
+        self.assertEqual(tracker.score, 14)
+        ScoreTracker(grid, "new rules").add_pair(((0, 0), (1, 1)))
+
+    def test_self_pair(self):
+        grid = Grid.grid_from_file("input/grid01.in", read_values=True)
+        tracker = ScoreTracker(grid, "new rules")
+        with self.assertRaises(ValueError):
+            tracker.add_pair(((0, 0), (0, 0)))  # White cell paired with itself
+        self.assertEqual((tracker.score, len(tracker)), (24, 0))
+        self.assertFalse(tracker.is_occupied((0, 0)))
+
+    def test_clear(self):
+        grid = Grid.grid_from_file("input/grid01.in", read_values=True)
+        tracker = ScoreTracker(grid, pairs=[((0, 0), (1, 0))])
+        tracker.clear()
+        self.assertEqual(tracker.score, 24)
+        self.assertFalse(tracker.occupied.any())
+
+@unittest.skipUnless(importlib.util.find_spec("pygame"), "pygame is not installed")
+class TestSolverManagerPairs(unittest.TestCase):
+
+    def test_self_pair(self):
+        from color_grid_game.run_game import SolverManager
+        grid = Grid.grid_from_file("input/grid01.in", read_values=True)
+        manager = SolverManager(grid, "new rules")
+        self.assertFalse(manager.add_player_pair(((0, 0), (0, 0))))
+        self.assertEqual(manager.solver.pairs, [])
+        self.assertEqual(len(manager.score_tracker), 0)
+        self.assertTrue(manager.add_player_pair(((0, 0), (1, 1))))
+        self.assertEqual(manager.solver.pairs, [((0, 0), (1, 1))])
+        self.assertEqual(manager.score_tracker.score, manager.solver.score())
+
+    def test_optimal_reference(self):
+        # The score of the one player game is compared with the optimum of the grid
+        from color_grid_game.run_game import SolverManager
+        grid = Grid.grid_from_file("input/grid13.in", read_values=True)
+        for rules in ("original rules", "new rules"):
+            manager = SolverManager(grid, rules)
+            self.assertTrue(manager.solver_general.optimal)
+            self.assertIn(rules, type(manager.solver_general).exact_rules)
+
+if __name__ == '__main__':
+    unittest.main()
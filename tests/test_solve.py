@@ -0,0 +1,75 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from color_grid_game import *
+import unittest
+
+class TestSolve(unittest.TestCase):
+
+    def test_cost_features(self):
+        grid = Grid.grid_from_file("input/grid01.in", read_values=True)
+        features = Solver.cost_features(grid)
+        n_components, labels = grid.adjacency().components()
+        self.assertEqual(features["cells"], grid.n * grid.m)
+        self.assertEqual(features["edges"], len(grid.adjacency()))
+        self.assertEqual(features["components"], n_components)
+        self.assertEqual(features["cells^2"], (grid.n * grid.m) ** 2)
+        sizes = np.bincount(labels[labels >= 0])
+        self.assertEqual(features["component_cells^2"], (sizes ** 2).sum())
+
+    def test_estimate_time(self):
+        grid = Grid.grid_from_file("input/grid05.in", read_values=True)
+        for solver_class in solver_registry:
+            for rules in solver_class.supported_rules:
+                self.assertGreater(solver_class.estimate_time(grid, rules), 0)
+        self.assertEqual(Solver_Ford_Fulkerson.estimate_time(grid, "new rules"), float("inf"))
+        self.assertEqual(Solver_Empty.estimate_time(grid), float("inf"))
+
+    def test_exact_without_budget(self):
+        for file_name in ("input/grid05.in", "input/grid13.in"):
+            grid = Grid.grid_from_file(file_name, read_values=True)
+            for rules in ("original rules", "new rules"):
+                solver_class = select_solver(grid, rules)
+                self.assertIn(rules, solver_class.exact_rules)
+                solver = solve(grid, rules)
+                self.assertIsInstance(solver, solver_class)
+                reference = Solver_Blossom(grid, rules)
+                reference.run()
+                self.assertEqual(solver.score(), reference.score())
+
+    def test_budget(self):
+        grid = Grid.grid_from_file("input/grid13.in", read_values=True)
+        for rules in ("original rules", "new rules"):
+            # No solver fits: the fastest one is chosen, the white pairs of the new rules
+            # being merged into the scan of the sorted greedy solver without being listed
+            self.assertIs(select_solver(grid, rules, budget=0), Solver_Greedy_Sorted)
+            self.assertIn(rules, select_solver(grid, rules, budget=1e9).exact_rules)
+            # Callers needing the optimum get an exact solver whatever the budget
+            self.assertIn(rules, select_solver(grid, rules, budget=0, exact=True).exact_rules)
+
+    def test_unsupported_rules(self):
+        grid = Grid.grid_from_file("input/grid00.in", read_values=True)
+        with self.assertRaises(ValueError):
+            solve(grid, "other rules")
+
+    def test_register_solver(self):
+        class Solver_Unmodelled(Solver_Greedy):
+            cost_model = {}
+        with self.assertRaises(ValueError):
+            register_solver(Solver_Unmodelled)
+        self.assertNotIn(Solver_Unmodelled, solver_registry)
+
+    def test_calibrate_cost_models(self):
+        class Solver_Calibrated(Solver_Greedy):
+            cost_model = {"original rules": {"cells": 1.0, "edges": 1.0}}
+        grids = [Grid.grid_from_file(f"input/grid0{k}.in", read_values=True) for k in range(1, 6)]
+        models = calibrate_cost_models(grids, solvers=[Solver_Calibrated])
+        self.assertEqual(set(models[Solver_Calibrated]), {"cells", "edges"})
+        self.assertTrue(all(coefficient >= 0 for coefficient in models[Solver_Calibrated].values()))
+        self.assertEqual(Solver_Calibrated.cost_model["original rules"], models[Solver_Calibrated])
+        self.assertEqual(set(Solver_Calibrated.cost_model), {"original rules"})
+        self.assertIsNot(Solver_Greedy.cost_model, Solver_Calibrated.cost_model)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,27 +6,82 @@ from color_grid_game import *
 import unittest
 
 class TestSolverFordFulkersonRun(unittest.TestCase):
-    
-    def test_fordfulkerson_run_grid00(self):
-        grid = Grid.grid_from_file("input/grid00.in", read_values=False)
+
+    # Pairs calculated by hand, a maximum matching of each grid
+    hand_pairs = {
+        "grid00": [((0, 0), (1, 0)), ((0, 2), (1, 2)), ((1, 1), (0, 1))],
+        "grid01": [((0, 2), (1, 2)), ((1, 1), (1, 0))],
+        "grid02": [((0, 2), (1, 2)), ((1, 1), (1, 0))],
+    }
+
+    def check_maximum_matching(self, name):
+        # Any maximum matching may be returned: its size, validity and orientation are checked
+        grid = Grid.grid_from_file(f"input/{name}.in", read_values=False)
         solver = Solver_Ford_Fulkerson(grid)
         pairs = solver.run()
-        expected_pairs = [((0, 0), (1, 0)), ((0, 2), (1, 2)), ((1, 1), (0, 1))] #Calculated by hand
-        self.assertEqual(sorted(pairs), sorted(expected_pairs))
+        self.assertTrue(solver.validate().valid)
+        self.assertEqual(len(pairs), len(self.hand_pairs[name]))
+        self.assertTrue(all((i + j) % 2 == 0 for (i, j), _ in pairs))
+
+    def test_fordfulkerson_run_grid00(self):
+        self.check_maximum_matching("grid00")
 
     def test_fordfulkerson_run_grid01(self):
-        grid = Grid.grid_from_file("input/grid01.in", read_values=False)
-        solver = Solver_Ford_Fulkerson(grid)
-        pairs = solver.run()
-        expected_pairs = [((0, 2), (1, 2)), ((1, 1), (1, 0))] #Calculated by hand
-        self.assertEqual(sorted(pairs), sorted(expected_pairs))
+        self.check_maximum_matching("grid01")
 
     def test_fordfulkerson_run_grid02(self):
-        grid = Grid.grid_from_file("input/grid02.in", read_values=False)
+        self.check_maximum_matching("grid02")
+
+    def test_edmonds_karp_hand_pairs(self):
+        # The Edmonds-Karp engine finds the same pairs as the ones calculated by hand
+        for name, expected_pairs in self.hand_pairs.items():
+            grid = Grid.grid_from_file(f"input/{name}.in", read_values=False)
+            solver = Solver_Ford_Fulkerson(grid)
+            solver.engine = "edmonds_karp"
+            self.assertEqual(sorted(solver.run()), sorted(expected_pairs))
+
+class TestSolverFordFulkersonHopcroftKarp(unittest.TestCase):
+
+    def run_solver(self, grid, engine):
         solver = Solver_Ford_Fulkerson(grid)
-        pairs = solver.run()
-        expected_pairs = [((0, 2), (1, 2)), ((1, 1), (1, 0))] #Calculated by hand
-        self.assertEqual(sorted(pairs), sorted(expected_pairs))
+        solver.engine = engine
+        solver.result_cache = None
+        solver.run()
+        return solver
+
+    def test_maximum_matching(self):
+        for name in ("grid00", "grid01", "grid05", "grid13", "grid17"):
+            grid = Grid.grid_from_file(f"input/{name}.in", read_values=True)
+            solver = self.run_solver(grid, "hopcroft_karp")
+            self.assertTrue(solver.validate())
+            self.assertEqual(len(solver.pairs), len(self.run_solver(grid, "edmonds_karp").pairs))
+            # Even cells first, as with the flow network
+            self.assertTrue(all((i + j) % 2 == 0 for (i, j), _ in solver.pairs))
+
+    def test_long_augmenting_paths(self):
+        # A path of cells matched greedily from the wrong end needs one long augmenting path
+        n_cells = 3000
+        indptr = [0] + [min(k, 1) + (k < n_cells - 1) for k in range(n_cells)]
+        indptr = np.cumsum(indptr).tolist()
+        indices = [other for k in range(n_cells) for other in (k - 1, k + 1) if 0 <= other < n_cells]
+        left = list(range(0, n_cells, 2))
+        mate = [-1] * n_cells
+        for k in range(1, n_cells - 1, 2):
+            mate[k], mate[k + 1] = k + 1, k
+        mate = Solver_Ford_Fulkerson.hopcroft_karp(indptr, indices, left, mate=mate)
+        self.assertEqual(sum(other >= 0 for other in mate), n_cells)
+
+    def test_stop(self):
+        grid = Grid.grid_from_file("input/grid17.in", read_values=True)
+        adjacency = grid.adjacency()
+        mate = Solver_Ford_Fulkerson.hopcroft_karp(adjacency.indptr.tolist(), adjacency.indices.tolist(), [0],
+                                                   lambda: True)
+        self.assertEqual(mate.count(-1), len(mate) - 2 * (mate[0] >= 0))
+
+    def test_unknown_engine(self):
+        grid = Grid.grid_from_file("input/grid00.in", read_values=True)
+        with self.assertRaises(ValueError):
+            self.run_solver(grid, "simplex")
 
 if __name__ == '__main__':
     unittest.main()
@@ -28,6 +28,21 @@ class TestSolverGreedyRun(unittest.TestCase):
         expected_pairs = [((0, 0), (1, 0)), ((0, 2), (1, 2))]
         self.assertEqual(sorted(pairs), sorted(expected_pairs))
 
+class TestSolverGreedyNewRules(unittest.TestCase):
+
+    def test_tie_order(self):
+        # Ties in cost are broken in the order of all_pairs: the right and down neighbors
+        # of a non-white cell come before the other white cells
+        grids = [
+            (Grid(2, 2, [[4, 1], [0, 0]], [[4, 2], [3, 1]]), [((0, 1), (1, 1))]),
+            (Grid(2, 3, [[3, 0, 0], [3, 0, 2]], [[2, 4, 1], [1, 4, 1]]),
+             [((0, 0), (1, 0)), ((0, 1), (1, 1)), ((0, 2), (1, 2))]),
+        ]
+        for grid, expected_pairs in grids:
+            solver = Solver_Greedy(grid, "new rules")
+            solver.result_cache = None
+            self.assertEqual(solver.run(), expected_pairs)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,79 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from color_grid_game import *
+from color_grid_game.generate import generate_grid
+from color_grid_game.benchmark import gradient_grid
+import unittest
+
+class TestSolverGreedySorted(unittest.TestCase):
+
+    def run_solver(self, solver_class, grid, rules="original rules"):
+        solver = solver_class(grid, rules)
+        solver.result_cache = None
+        solver.run()
+        return solver
+
+    def test_grid00(self):
+        grid = Grid.grid_from_file("input/grid00.in", read_values=True)
+        solver = self.run_solver(Solver_Greedy_Sorted, grid)
+        self.assertTrue(solver.validate().valid)
+        self.assertEqual(solver.score(), 14)
+
+    def test_sequential_scan(self):
+        # The selected pairs are those of the scan of the sorted edges
+        grid = generate_grid(15, 20, seed=2, black_density=0.1, correlation=2)
+        adjacency = grid.adjacency()
+        used = np.zeros(adjacency.n_cells, dtype=bool)
+        expected = []
+        for edge in Solver_Greedy_Sorted.edge_order(adjacency.weight).tolist():
+            u, v = adjacency.u[edge], adjacency.v[edge]
+            if adjacency.weight[edge] < 0 and not used[u] and not used[v]:
+                used[u] = used[v] = True
+                expected.append((u, v))
+        pairs = self.run_solver(Solver_Greedy_Sorted, grid).pairs_array
+        self.assertEqual(sorted(map(tuple, pairs.tolist())), sorted(expected))
+
+    def test_white_pairs_by_gain(self):
+        # Under the new rules, each pair has the largest gain among the pairs of cells that
+        # were still free when it was selected
+        grid = generate_grid(15, 20, seed=2, black_density=0.1, correlation=2)
+        value = grid.value.array.ravel()
+        pairs = self.run_solver(Solver_Greedy_Sorted, grid, "new rules").pairs_array
+        u, v, _ = grid.edge_arrays("new rules")
+        gain = value[u] + value[v] - np.abs(value[u] - value[v])
+        selected = value[pairs[:, 0]] + value[pairs[:, 1]] - np.abs(value[pairs[:, 0]] - value[pairs[:, 1]])
+        self.assertTrue(np.all(np.diff(selected) <= 0))
+        free = np.ones(grid.n * grid.m, dtype=bool)
+        for (a, b), best in zip(pairs.tolist(), selected.tolist()):
+            self.assertEqual(gain[free[u] & free[v]].max(), best)
+            free[a] = free[b] = False
+        self.assertFalse(np.any(free[u] & free[v] & (gain > 0)))
+
+    def test_gradient(self):
+        # Values increasing along the rows chain the best pairs of the cells: each cell is
+        # paired with its successor. The running time is measured by benchmark.py
+        for n, m in ((1, 20000), (150, 150)):
+            grid = gradient_grid(n, m)
+            expected = np.arange(n * m).reshape(-1, 2)
+            for rules in ("original rules", "new rules"):
+                solver = self.run_solver(Solver_Greedy_Sorted, grid, rules)
+                self.assertTrue(solver.validate().valid)
+                pairs = np.sort(solver.pairs_array, axis=1)
+                np.testing.assert_array_equal(pairs[np.argsort(pairs[:, 0])], expected)
+                self.assertEqual(solver.score(), n * m // 2)
+
+    def test_half_approximation(self):
+        for seed in range(4):
+            grid = generate_grid(12, 15, seed=seed, black_density=0.15, correlation=seed)
+            unpaired = int(grid.value.array.sum(where=grid.color.array != 4))
+            for rules in ("original rules", "new rules"):
+                solver = self.run_solver(Solver_Greedy_Sorted, grid, rules)
+                self.assertTrue(solver.validate().valid)
+                optimum = self.run_solver(Solver_Blossom, grid, rules).score()
+                self.assertLessEqual(unpaired - solver.score(), unpaired - optimum)
+                self.assertGreaterEqual(2 * (unpaired - solver.score()), unpaired - optimum)
+
+if __name__ == '__main__':
+    unittest.main()
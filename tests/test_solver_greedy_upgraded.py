@@ -28,6 +28,75 @@ class TestSolverGreedyRun(unittest.TestCase):
         expected_pairs = [((0, 0), (1, 0)), ((0, 2), (1, 2))]
         self.assertEqual(sorted(pairs), sorted(expected_pairs))
 
+class TestSolverGreedyUpgradedStarts(unittest.TestCase):
+
+    def run_solver(self, grid, rules="original rules", **attributes):
+        solver = Solver_Greedy_Upgraded(grid, rules)
+        solver.result_cache = None
+        for name, value in attributes.items():
+            setattr(solver, name, value)
+        solver.run()
+        return solver
+
+    def test_best_start(self):
+        # The pruned passes keep the best of the passes from every starting cell
+        grid = Grid.grid_from_file("input/grid05.in", read_values=True)
+        for rules in ("original rules", "new rules"):
+            best = None
+            for start in range(grid.n * grid.m):
+                solver = Solver_Greedy_Upgraded(grid, rules)
+                solver.starts = lambda start=start: [start]
+                solver.result_cache = None
+                solver.run()
+                best = solver.score() if best is None else min(best, solver.score())
+            self.assertEqual(self.run_solver(grid, rules).score(), best)
+
+    def test_tie_order(self):
+        # Ties in cost are broken in the order of all_pairs, as in the baseline passes
+        grids = [
+            (Grid(2, 2, [[4, 1], [0, 0]], [[4, 2], [3, 1]]), [((1, 0), (0, 1))]),
+            (Grid(2, 3, [[3, 0, 0], [3, 0, 2]], [[2, 4, 1], [1, 4, 1]]),
+             [((0, 0), (1, 0)), ((0, 1), (1, 1)), ((0, 2), (1, 2))]),
+        ]
+        for grid, expected_pairs in grids:
+            self.assertEqual(self.run_solver(grid, "new rules").pairs, expected_pairs)
+
+    def test_process_pool(self):
+        grid = Grid.grid_from_file("input/grid17.in", read_values=True)
+        for rules in ("original rules", "new rules"):
+            sequential = self.run_solver(grid, rules, workers=1)
+            parallel = self.run_solver(grid, rules, workers=2, parallel_threshold=0, chunk_size=8)
+            np.testing.assert_array_equal(parallel.pairs_array, sequential.pairs_array)
+
+    def test_process_pool_reused(self):
+        # One pool serves every run of a solver, even after the grid is modified
+        grid = Grid.grid_from_file("input/grid17.in", read_values=True)
+        solver = self.run_solver(grid, workers=2, parallel_threshold=0, chunk_size=8)
+        executor = solver._executor
+        self.assertIsNotNone(executor)
+        grid.color[0][0] = 4
+        solver.run()
+        self.assertIs(solver._executor, executor)
+        np.testing.assert_array_equal(solver.pairs_array, self.run_solver(grid, workers=1).pairs_array)
+        solver.close()
+        self.assertIsNone(solver._executor)
+
+    def test_serial_by_default(self):
+        grid = Grid.grid_from_file("input/grid17.in", read_values=True)
+        solver = self.run_solver(grid, parallel_threshold=0)
+        self.assertIsNone(solver._executor)
+
+    def test_samples(self):
+        grid = Grid.grid_from_file("input/grid17.in", read_values=True)
+        solver = self.run_solver(grid, samples=10)
+        starts = solver.starts()
+        self.assertEqual(len(starts), 10)
+        self.assertEqual(starts[0], 0)
+        self.assertEqual(len(set(starts)), 10)
+        self.assertTrue(solver.validate())
+        self.assertLessEqual(self.run_solver(grid).score(), solver.score())
+        self.assertLessEqual(solver.score(), self.run_solver(grid, samples=1).score())
+        self.assertNotEqual(solver.cache_name(), Solver_Greedy_Upgraded(grid).cache_name())
 
 if __name__ == '__main__':
     unittest.main()
@@ -24,6 +24,26 @@ class TestSolverScore(unittest.TestCase):
         solver.pairs = [((0, 0), (1, 0)), ((1, 1), (1, 2))]
         self.assertEqual(solver.score(), 1)  # Correct score calculation
 
+    def test_score_shared_and_black_cells(self):
+        grid = Grid.grid_from_file("input/grid01.in", read_values=True)
+        solver = Solver(grid)
+        solver.pairs = [((0, 0), (1, 0)), ((1, 0), (1, 1)), ((0, 1), (0, 2))]
+        # Costs 6 + 10 + 4, plus the value 3 of the only unpaired cell
+        self.assertEqual(solver.score(), 23)
+
+    def test_score_batch(self):
+        grid = Grid.grid_from_file("input/grid01.in", read_values=True)
+        solver = Solver(grid)
+        pairings = [
+            [],
+            [((0, 0), (1, 0)), ((1, 1), (1, 2))],
+            np.array([[0, 3], [3, 4], [1, 2]]),
+            [((0, 0), (1, 0)), ((1, 1), (1, 2))],
+        ]
+        self.assertEqual(solver.score_batch(pairings).tolist(), [24, 12, 23, 12])
+        self.assertEqual(solver.score_batch(np.array([[[0, 3], [4, 5]]])).tolist(), [12])
+        self.assertEqual(solver.score_batch([]).tolist(), [])
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,85 @@
+import sys
+import os
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from color_grid_game import *
+import unittest
+
+class TestTiledGrid(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_name = os.path.join(self.directory.name, "grid.tiles")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_create(self):
+        tiled = TiledGrid.create(self.file_name, 5, 7, tile_shape=(2, 3))
+        self.assertEqual(tiled.n_tiles, (3, 3))
+        self.assertEqual(tiled.to_grid(), Grid(5, 7))
+        self.assertEqual(repr(tiled), "<tiled_grid.TiledGrid: n=5, m=7, tile_shape=(2, 3)>")
+
+    def test_round_trip(self):
+        grid = Grid.grid_from_file("input/grid05.in", read_values=True)
+        TiledGrid.from_grid(grid, self.file_name, tile_shape=(3, 4))
+        tiled = TiledGrid(self.file_name)
+        self.assertEqual((tiled.n, tiled.m), (grid.n, grid.m))
+        self.assertEqual(tiled.to_grid(), grid)
+
+    def test_cell_interface(self):
+        grid = Grid.grid_from_file("input/grid05.in", read_values=True)
+        tiled = TiledGrid.from_grid(grid, self.file_name, tile_shape=(3, 4))
+        for i in range(grid.n):
+            for j in range(grid.m):
+                self.assertEqual(tiled.is_forbidden(i, j), grid.is_forbidden(i, j))
+                self.assertEqual(tiled.vois(i, j), grid.vois(i, j))
+        for pair in grid.all_pairs():
+            self.assertEqual(tiled.cost(pair), grid.cost(pair))
+        with self.assertRaises(IndexError):
+            tiled.is_forbidden(grid.n, 0)
+        with self.assertRaises(IndexError):
+            tiled.tile(*tiled.n_tiles)
+
+    def test_edge_arrays(self):
+        grid = Grid.grid_from_file("input/grid05.in", read_values=True)
+        tiled = TiledGrid.from_grid(grid, self.file_name, tile_shape=(3, 4))
+        for rules in ("original rules", "new rules"):
+            expected = set(zip(*(array.tolist() for array in grid.edge_arrays(rules, implicit_white=True))))
+            found = set()
+            for u, v, cost in tiled.iter_edge_arrays(rules, implicit_white=True):
+                found.update(zip(u.tolist(), v.tolist(), cost.tolist()))
+            self.assertEqual(found, expected)
+        with self.assertRaises(ValueError):
+            next(tiled.iter_edge_arrays("new rules"))
+
+    def test_bounded_mapping(self):
+        grid = Grid.grid_from_file("input/grid05.in", read_values=True)
+        TiledGrid.from_grid(grid, self.file_name, tile_shape=(2, 2))
+        tiled = TiledGrid(self.file_name, max_tiles=3)
+        for _ in tiled.iter_edge_arrays():
+            self.assertLessEqual(len(tiled._tiles), 3)
+        self.assertEqual(tiled.to_grid(), grid)
+
+    def test_write_back(self):
+        TiledGrid.create(self.file_name, 4, 4, tile_shape=(3, 3))
+        tiled = TiledGrid(self.file_name, mode="r+")
+        color, value = tiled.tile(1, 1)
+        color[0, 0] = 4
+        value[0, 0] = 9
+        tiled.flush()
+        tiled = TiledGrid(self.file_name)
+        self.assertTrue(tiled.is_forbidden(3, 3))
+        self.assertEqual(tiled.cost(((3, 3), (3, 2))), 8)
+
+    def test_invalid_file(self):
+        with open(self.file_name, "wb") as file:
+            file.write(b"not a tiled grid")
+        with self.assertRaises(ValueError):
+            TiledGrid(self.file_name)
+        with self.assertRaises(FileNotFoundError):
+            TiledGrid(self.file_name + ".missing")
+
+if __name__ == '__main__':
+    unittest.main()
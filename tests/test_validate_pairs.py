@@ -0,0 +1,75 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from color_grid_game import *
+import unittest
+
+class TestValidatePairs(unittest.TestCase):
+
+    def test_valid_solutions(self):
+        grid = Grid.grid_from_file("input/grid13.in", read_values=True)
+        for rules in ("original rules", "new rules"):
+            for solver_class in solver_registry:
+                if rules not in solver_class.supported_rules:
+                    continue
+                solver = solver_class(grid, rules)
+                solver.run()
+                validation = solver.validate()
+                self.assertTrue(validation.valid)
+                self.assertTrue(validation)
+                self.assertEqual(validation.errors, {})
+                validation.check()
+
+    def test_hungarian_new_rules(self):
+        # The assignment of the Hungarian solver may use a cell in two pairs under the new rules
+        grid = Grid.grid_from_file("input/grid13.in", read_values=True)
+        solver = Solver_Hungarian(grid, "new rules")
+        solver.run()
+        self.assertEqual(list(solver.validate().errors), ["reused_cell"])
+
+    def test_empty(self):
+        grid = Grid.grid_from_file("input/grid00.in", read_values=True)
+        self.assertTrue(validate_pairs(grid, []))
+        self.assertTrue(validate_pairs(grid, np.zeros((0, 2), dtype=np.int32)))
+
+    def test_offending_pairs(self):
+        grid = Grid.grid_from_file("input/grid01.in", read_values=True)
+        # Colors: 0 4 3 / 2 1 0, i.e. white, black, green / blue, red, white
+        pairs = [((0, 0), (1, 0)), ((1, 1), (1, 2)), ((0, 0), (0, 1)), ((2, 0), (1, 0)),
+                 ((1, 2), (1, 2)), ((0, 2), (1, 1)), ((1, 0), (1, 2))]
+        validation = validate_pairs(grid, pairs)
+        self.assertFalse(validation)
+        self.assertEqual(validation.errors["out_of_bounds"].tolist(), [3])
+        self.assertEqual(validation.errors["black_cell"].tolist(), [2])
+        self.assertEqual(validation.errors["same_cell"].tolist(), [4])
+        self.assertEqual(validation.errors["not_adjacent"].tolist(), [5, 6])
+        self.assertEqual(validation.errors["incompatible_colors"].tolist(), [5])
+        self.assertEqual(validation.errors["reused_cell"].tolist(), [0, 1, 2, 4, 5, 6])
+        self.assertEqual(validation.invalid.tolist(), [0, 1, 2, 3, 4, 5, 6])
+        self.assertEqual(validation.offending_pairs("out_of_bounds"), [((-1, -1), (1, 0))])
+        self.assertEqual(validation.offending_pairs("same_cell"), [((1, 2), (1, 2))])
+        with self.assertRaises(ValueError):
+            validation.check()
+
+    def test_new_rules_white_pairs(self):
+        grid = Grid.grid_from_file("input/grid01.in", read_values=True)
+        pairs = np.array([[0, 5], [2, 4]])
+        self.assertEqual(validate_pairs(grid, pairs, "original rules").errors["not_adjacent"].tolist(), [0, 1])
+        validation = validate_pairs(grid, pairs, "new rules")
+        self.assertEqual(list(validation.errors), ["not_adjacent", "incompatible_colors"])
+        self.assertEqual(validation.invalid.tolist(), [1])
+
+    def test_flat_out_of_bounds(self):
+        grid = Grid.grid_from_file("input/grid01.in", read_values=True)
+        validation = validate_pairs(grid, np.array([[0, 3], [5, 6]]))
+        self.assertEqual(validation.errors, {"out_of_bounds": validation.errors["out_of_bounds"]})
+        self.assertEqual(validation.invalid.tolist(), [1])
+
+    def test_unrecognized_rules(self):
+        grid = Grid.grid_from_file("input/grid00.in", read_values=True)
+        with self.assertRaises(ValueError):
+            validate_pairs(grid, [], "other rules")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from color_grid_game import *
+from color_grid_game.generate import generate_grid
+import unittest
+
+class TestWarmStart(unittest.TestCase):
+
+    def setUp(self):
+        self.grid = generate_grid(14, 17, seed=3, black_density=0.1, correlation=3)
+        solver = Solver_Blossom(self.grid)
+        solver.result_cache = None
+        self.pairs = solver.run_array()
+        # The same grid after an edit: a value raised and a paired cell blackened
+        self.edited = generate_grid(14, 17, seed=3, black_density=0.1, correlation=3)
+        self.edited.value[5][6] = self.edited.value[5][6] + 7
+        i, j = divmod(int(self.pairs[0, 0]), self.edited.m)
+        self.edited.color[i][j] = 4
+
+    def run_solver(self, solver_class, grid, initial_pairs=None):
+        solver = solver_class(grid)
+        solver.result_cache = None
+        solver.run(initial_pairs=initial_pairs)
+        self.assertTrue(solver.validate().valid)
+        return solver
+
+    def test_fit_optimal_pairs(self):
+        duals, fitted, optimal = fit_matching_duals(self.grid, self.pairs)
+        self.assertTrue(fitted.all())
+        self.assertTrue(optimal)
+        adjacency = self.grid.adjacency()
+        self.assertTrue((duals >= 0).all())
+        self.assertTrue((duals[adjacency.u] + duals[adjacency.v] >= -adjacency.weight - 1e-9).all())
+
+    def test_fit_suboptimal_pairs(self):
+        solver = self.run_solver(Solver_Greedy, self.grid)
+        self.assertGreater(solver.score(), self.run_solver(Solver_Blossom, self.grid).score())
+        self.assertFalse(fit_matching_duals(self.grid, solver.pairs_array)[2])
+
+    def test_exact_solvers(self):
+        score = self.run_solver(Solver_Blossom, self.edited).score()
+        for solver_class in (Solver_Hungarian, Solver_Blossom):
+            self.assertEqual(self.run_solver(solver_class, self.edited, self.pairs).score(), score)
+        self.assertEqual(self.run_solver(Solver_Hungarian, self.grid, self.pairs).score(),
+                         self.run_solver(Solver_Blossom, self.grid).score())
+
+    def test_ford_fulkerson(self):
+        cold = self.run_solver(Solver_Ford_Fulkerson, self.edited)
+        warm = self.run_solver(Solver_Ford_Fulkerson, self.edited, self.pairs)
+        self.assertEqual(len(warm.pairs), len(cold.pairs))
+
+    def test_blossom_certified(self):
+        solver = self.run_solver(Solver_Blossom, self.grid, self.pairs)
+        self.assertEqual(sorted(map(tuple, solver.pairs_array.tolist())), sorted(map(tuple, self.pairs.tolist())))
+
+    def test_illegal_initial_pairs_dropped(self):
+        i, j = divmod(int(self.pairs[0, 0]), self.edited.m)
+        pairs = Solver_Greedy(self.edited).run() + [((i, j), (i, j)), ((-1, 0), (0, 0))]
+        solver = self.run_solver(Solver_Hungarian, self.edited, pairs)
+        self.assertEqual(len(solver.initial_pairs), len(pairs) - 2)
+        self.assertEqual(solver.score(), self.run_solver(Solver_Blossom, self.edited).score())
+
+if __name__ == '__main__':
+    unittest.main()
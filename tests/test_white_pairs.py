@@ -0,0 +1,110 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from color_grid_game import *
+import unittest
+
+class TestWhitePairs(unittest.TestCase):
+
+    def setUp(self):
+        # grid01: colors [[0, 4, 3], [2, 1, 0]]
+        self.grid = Grid.grid_from_file("input/grid01.in", read_values=True)
+        self.white_pairs = self.grid.white_pairs()
+
+    def test_count(self):
+        # 2 white cells, 5 non-forbidden cells: 2 * 4 - 1 white-white pair counted twice
+        self.assertEqual(len(self.white_pairs), 7)
+        self.assertEqual(len(list(self.white_pairs)), 7)
+
+    def test_pairs_are_unique(self):
+        pairs = list(self.white_pairs)
+        self.assertEqual(len(pairs), len(set(pairs)))
+        self.assertTrue(all(u < v for u, v in pairs))
+
+    def test_neighbors_and_degrees(self):
+        self.assertEqual(self.white_pairs.neighbors(0).tolist(), [2, 3, 4, 5])
+        self.assertEqual(self.white_pairs.neighbors(2).tolist(), [0, 5])
+        self.assertEqual(self.white_pairs.neighbors(1).tolist(), [])
+        self.assertEqual(self.white_pairs.degrees().tolist(), [4, 0, 2, 2, 2, 4])
+
+    def test_contains(self):
+        self.assertIn((0, 5), self.white_pairs)
+        self.assertIn((4, 0), self.white_pairs)
+        self.assertNotIn((0, 1), self.white_pairs)
+        self.assertNotIn((3, 4), self.white_pairs)
+
+    def test_union_with_implicit_edge_arrays(self):
+        u, v, _ = self.grid.edge_arrays("new rules", implicit_white=True)
+        implicit = set(self.white_pairs) | set(zip(u.tolist(), v.tolist()))
+        expected = set(tuple(sorted((i1 * self.grid.m + j1, i2 * self.grid.m + j2)))
+                       for (i1, j1), (i2, j2) in self.grid.all_pairs("new rules"))
+        self.assertEqual(implicit, expected)
+
+    def test_chunk_costs(self):
+        for u, v, cost in self.white_pairs.iter_chunks(max_pairs=2):
+            for a, b, c in zip(u.tolist(), v.tolist(), cost.tolist()):
+                self.assertEqual(self.grid.cost((divmod(a, self.grid.m), divmod(b, self.grid.m))), c)
+
+    def random_grids(self):
+        rng = np.random.default_rng(0)
+        for _ in range(20):
+            n, m = rng.integers(1, 6, size=2)
+            yield Grid(int(n), int(m), rng.choice([0, 0, 1, 2, 3, 4], size=(n, m)), rng.integers(1, 6, size=(n, m)))
+
+    def partners(self, grid, cell):
+        white_pairs = grid.white_pairs()
+        return [other for other in range(grid.n * grid.m) if other != cell and (cell, other) in white_pairs]
+
+    def test_best_gains_and_min_costs(self):
+        for grid in self.random_grids():
+            white_pairs = grid.white_pairs()
+            value = grid.value.array.ravel().tolist()
+            best_gains, min_costs = white_pairs.best_gains(), white_pairs.min_costs()
+            for cell in range(grid.n * grid.m):
+                partners = self.partners(grid, cell)
+                self.assertEqual(best_gains[cell], max((2 * min(value[cell], value[p]) for p in partners), default=0))
+                self.assertEqual(min_costs[cell], min((abs(value[cell] - value[p]) for p in partners), default=0))
+
+    def test_demands(self):
+        rng = np.random.default_rng(1)
+        for grid in self.random_grids():
+            value = grid.value.array.ravel().tolist()
+            duals = rng.random(grid.n * grid.m) * 5
+            demands = grid.white_pairs().demands(duals)
+            for cell in range(grid.n * grid.m):
+                expected = max((2 * min(value[cell], value[p]) - duals[p] for p in self.partners(grid, cell)),
+                               default=-np.inf)
+                self.assertAlmostEqual(demands[cell], expected)
+
+    def test_best_partners(self):
+        for grid in self.random_grids():
+            value = grid.value.array.ravel().tolist()
+            indptr, partners = grid.white_pairs().best_partners(2)
+            for cell in range(grid.n * grid.m):
+                def key(p):
+                    return -min(value[cell], value[p]), abs(value[cell] - value[p])
+                expected = sorted(self.partners(grid, cell), key=key)[:2]
+                self.assertEqual([key(p) for p in partners[indptr[cell]:indptr[cell + 1]].tolist()],
+                                 [key(p) for p in expected])
+
+    def test_partner_search(self):
+        rng = np.random.default_rng(2)
+        grid = Grid(6, 7, rng.choice([0, 0, 1, 3, 4], size=(6, 7)), rng.integers(1, 8, size=(6, 7)))
+        white_pairs = grid.white_pairs()
+        value = grid.value.array.ravel().tolist()
+        used = [False] * (grid.n * grid.m)
+        search = white_pairs.partner_searches(used)[1]
+        cells = white_pairs.allowed.tolist()
+        for cell in rng.permutation(grid.n * grid.m).tolist():
+            free = [c for c in cells if not used[c]]
+            for target in range(0, 9):
+                self.assertEqual(search.closest(target),
+                                 min(free, key=lambda c: (abs(value[c] - target), c), default=-1))
+                self.assertEqual(search.ceiling(target),
+                                 min((c for c in free if value[c] >= target), key=lambda c: (value[c], c), default=-1))
+            self.assertEqual(search.highest(), min(free, key=lambda c: (-value[c], c), default=-1))
+            used[cell] = True
+
+if __name__ == '__main__':
+    unittest.main()